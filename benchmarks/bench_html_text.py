@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'extraction de texte HTML.
+
+Compare l'ancien nettoyage par expressions régulières (``<[^>]+>`` puis
+``\\s+``) à ``html_text.html_to_text``, sans budget et avec le budget par défaut
+de l'agent (4000 caractères), sur des chapitres XHTML synthétiques de grande taille.
+
+Usage typique :
+    python benchmarks/bench_html_text.py --sizes 0.1 1 5 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from html_text import html_to_text  # noqa: E402
+
+PARAGRAPH = (
+    "<p class=\"texte\">Il &eacute;tait une fois, dans un pays lointain, un <em>roi</em> "
+    "qui ne savait pas lire&#160;; chaque matin, ses ministres lui racontaient "
+    "l&#8217;histoire du royaume &amp; les nouvelles des provinces.</p>\n"
+)
+
+
+def legacy_strip_html(raw_html: str) -> str:
+    """Regex-based stripper used before ``html_text`` (reference implementation)."""
+    text = re.sub(r"<[^>]+>", " ", raw_html, flags=re.IGNORECASE)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def build_chapter(size_bytes: int) -> str:
+    """Return an XHTML chapter of about ``size_bytes`` characters."""
+    head = (
+        '<?xml version="1.0" encoding="utf-8"?>\n<html xmlns="http://www.w3.org/1999/xhtml">\n'
+        "<head><title>Chapitre</title><style>p { text-indent: 1em; }</style></head>\n<body>\n"
+    )
+    count = max(1, size_bytes // len(PARAGRAPH))
+    return head + PARAGRAPH * count + "</body></html>\n"
+
+
+def _best_time(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes_mb: list[float], repeat: int, budget: int) -> list[dict[str, object]]:
+    results: list[dict[str, object]] = []
+
+    for size_mb in sizes_mb:
+        chapter = build_chapter(int(size_mb * 1024 * 1024))
+        cases = {
+            "regex": lambda: legacy_strip_html(chapter),
+            "html_text": lambda: html_to_text(chapter),
+            f"html_text_budget_{budget}": lambda: html_to_text(chapter, budget=budget),
+        }
+        for name, func in cases.items():
+            seconds = _best_time(func, repeat)
+            results.append(
+                {
+                    "case": name,
+                    "size_mb": size_mb,
+                    "seconds": round(seconds, 6),
+                    "mb_per_s": round(len(chapter) / 1024 / 1024 / seconds, 1) if seconds else None,
+                }
+            )
+
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de l'extraction de texte HTML.")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[0.1, 1.0, 5.0], help="Tailles des chapitres (Mo).")
+    parser.add_argument("--repeat", type=int, default=5, help="Nombre de mesures par cas (meilleur temps retenu).")
+    parser.add_argument("--budget", type=int, default=4000, help="Budget de caractères du cas avec budget.")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON au lieu d'un tableau.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    results = run(args.sizes, args.repeat, args.budget)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for result in results:
+        print(f"{result['size_mb']:>6} Mo  {result['case']:<24} {result['seconds'] * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Générateur de corpus EPUB synthétiques pour les benchmarks.
+
+Chaque livre est reproductible (graine) et paramétrable :
+
+- taille totale du texte XHTML et nombre de chapitres ;
+- forme de l'OPF : ``full`` (titre, auteur, éditeur, langue, identifiant,
+  description), ``minimal`` (titre seul) ou ``none`` (pas d'OPF) ;
+- emplacement de l'ISBN : ``opf`` (``dc:identifier``), ``copyright`` (page
+  de copyright, lue en premier), ``last`` (fin du dernier chapitre, pire cas
+  du scan de texte) ou ``none``.
+
+Usage typique :
+    python benchmarks/epub_corpus.py --out /tmp/corpus --count 50 --size-kb 300 --members 12 --isbn last
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import zipfile
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+OPF_SHAPES = ("full", "minimal", "none")
+ISBN_PLACEMENTS = ("opf", "copyright", "last", "none")
+
+WORDS = (
+    "le la les un une des et en dans pour sur avec sans sous vers chez "
+    "roi reine château forêt rivière montagne village ville route chemin maison jardin "
+    "soir matin nuit jour hiver été automne printemps lettre livre histoire secret "
+    "marchait regardait disait pensait attendait revenait partait écrivait lisait "
+    "ancien nouveau sombre clair lointain silencieux fidèle étrange heureux triste "
+    "&amp; l&#8217;ombre d&#8217;été"
+).split()
+
+CHAPTER_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head><title>{title}</title><link rel="stylesheet" type="text/css" href="style.css"/>
+<style>p {{ text-indent: 1em; margin: 0; }}</style></head>
+<body>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+
+@dataclass
+class BookSpec:
+    """Shape of a synthetic EPUB."""
+
+    size_bytes: int = 200_000
+    members: int = 10
+    opf: str = "full"
+    isbn: str = "copyright"
+    seed: int = 0
+
+
+def make_isbn13(rng: random.Random) -> str:
+    """Return a random valid ISBN-13 (préfixe 978-2, éditeurs francophones)."""
+    digits = "9782" + "".join(str(rng.randrange(10)) for _ in range(8))
+    total = sum(int(digit) * (1 if index % 2 == 0 else 3) for index, digit in enumerate(digits))
+    return digits + str((10 - total % 10) % 10)
+
+
+def _format_isbn(isbn: str) -> str:
+    return f"{isbn[:3]}-{isbn[3]}-{isbn[4:8]}-{isbn[8:12]}-{isbn[12]}"
+
+
+def _paragraphs(rng: random.Random, size: int) -> str:
+    """Return ``<p>`` paragraphs totalling about ``size`` characters."""
+    parts: list[str] = []
+    length = 0
+    while length < size:
+        words = rng.choices(WORDS, k=rng.randint(25, 90))
+        if rng.random() < 0.3:
+            index = rng.randrange(len(words))
+            words[index] = f"<em>{words[index]}</em>"
+        attrs = ' class="dialogue"' if rng.random() < 0.2 else ""
+        paragraph = f"<p{attrs}>" + " ".join(words) + ".</p>\n"
+        parts.append(paragraph)
+        length += len(paragraph)
+    return "".join(parts)
+
+
+def _opf(spec: BookSpec, title: str, isbn: str) -> str:
+    identifier = f"urn:isbn:{isbn}" if spec.isbn == "opf" else f"urn:uuid:bench-{spec.seed}"
+    if spec.opf == "minimal":
+        metadata = f"<dc:title>{title}</dc:title>"
+    else:
+        metadata = (
+            f"<dc:title>{title}</dc:title>\n    <dc:creator>Auteur {spec.seed}</dc:creator>\n"
+            "    <dc:publisher>Éditions Synthétiques</dc:publisher>\n    <dc:language>fr</dc:language>\n"
+            f"    <dc:identifier>{identifier}</dc:identifier>\n"
+            "    <dc:description>&lt;p&gt;Un livre généré pour les benchmarks.&lt;/p&gt;</dc:description>\n"
+            '    <meta name="calibre:series" content="Bench"/>'
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<package xmlns="http://www.idpf.org/2007/opf" version="2.0">\n'
+        f'  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">\n    {metadata}\n  </metadata>\n'
+        "</package>\n"
+    )
+
+
+def build_epub(path: Path, spec: BookSpec) -> Path:
+    """Write a synthetic EPUB described by ``spec`` to ``path``."""
+    rng = random.Random(spec.seed)
+    isbn = make_isbn13(rng)
+    title = f"Livre de test {spec.seed}"
+    members = max(1, spec.members)
+    chapter_size = max(1, spec.size_bytes // members)
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(zipfile.ZipInfo("mimetype"), "application/epub+zip")
+        zf.writestr(
+            "META-INF/container.xml",
+            '<?xml version="1.0"?><container version="1.0" '
+            'xmlns="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles>'
+            '<rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>'
+            "</rootfiles></container>",
+        )
+        if spec.opf != "none":
+            zf.writestr("OEBPS/content.opf", _opf(spec, title, isbn))
+
+        copyright_text = "<p>Tous droits réservés.</p>"
+        if spec.isbn == "copyright":
+            copyright_text += f"<p>ISBN {_format_isbn(isbn)}</p>"
+        zf.writestr("OEBPS/copyright.xhtml", CHAPTER_TEMPLATE.format(title="Copyright", body=copyright_text))
+
+        for index in range(1, members + 1):
+            body = _paragraphs(rng, chapter_size)
+            if spec.isbn == "last" and index == members:
+                body += f"<p>Achevé d'imprimer. ISBN {_format_isbn(isbn)}</p>\n"
+            zf.writestr(
+                f"OEBPS/chapter{index:03d}.xhtml",
+                CHAPTER_TEMPLATE.format(title=f"Chapitre {index}", body=body),
+            )
+
+    return path
+
+
+def build_corpus(folder: Path, count: int, spec: BookSpec) -> list[Path]:
+    """Build ``count`` books in ``folder`` (graines ``spec.seed``, ``spec.seed + 1``...)."""
+    folder.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for offset in range(count):
+        book = replace(spec, seed=spec.seed + offset)
+        paths.append(build_epub(folder / f"bench_{book.seed:05d}.epub", book))
+    return paths
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Génère un corpus d'EPUB synthétiques.")
+    parser.add_argument("--out", type=Path, required=True, help="Dossier de sortie.")
+    parser.add_argument("--count", type=int, default=20, help="Nombre de livres.")
+    parser.add_argument("--size-kb", type=int, default=200, help="Taille du texte XHTML par livre (Ko).")
+    parser.add_argument("--members", type=int, default=10, help="Nombre de chapitres par livre.")
+    parser.add_argument("--opf", choices=OPF_SHAPES, default="full", help="Forme de l'OPF.")
+    parser.add_argument("--isbn", choices=ISBN_PLACEMENTS, default="copyright", help="Emplacement de l'ISBN.")
+    parser.add_argument("--seed", type=int, default=0, help="Graine du premier livre.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    spec = BookSpec(args.size_kb * 1024, args.members, args.opf, args.isbn, args.seed)
+    paths = build_corpus(args.out, args.count, spec)
+    print(f"{len(paths)} EPUB générés dans {args.out}")
+
+
+if __name__ == "__main__":
+    main()
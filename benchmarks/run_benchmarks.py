@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks de l'extraction et du traitement de bout en bout.
+
+Génère des corpus synthétiques (voir ``epub_corpus.py``), mesure chaque
+fonction sur tous les livres d'un corpus (meilleur temps sur ``--repeat``
+passes) puis ``process_folder`` de bout en bout contre le webhook simulé
+(``src/n8n_stub.py``, sans latence), et écrit les résultats en JSON. ``--compare`` confronte ces résultats à une
+exécution précédente (régression si plus lent que la tolérance).
+
+Usage typique :
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --output bench-new.json --compare bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from epub_corpus import BookSpec, build_corpus  # noqa: E402
+
+from epub_metadata import (  # noqa: E402
+    Config,
+    _extract_full_text,
+    _find_first_isbn,
+    extract_metadata_from_epub,
+    extract_text_from_epub,
+    process_folder,
+)
+from isbn_scan import scan_epub_for_isbn  # noqa: E402
+from n8n_stub import N8nStub  # noqa: E402
+
+RESULTS_VERSION = 1
+
+# Corpus de référence : nombre de livres (multiplié par --scale) et forme.
+CORPORA: dict[str, tuple[int, BookSpec]] = {
+    # Livre « courant » : une dizaine de chapitres, ISBN sur la page de copyright.
+    "chapitres": (20, BookSpec(size_bytes=200_000, members=10, opf="full", isbn="copyright")),
+    # Pire cas du scan : OPF minimal, ISBN à la fin du dernier chapitre.
+    "isbn_fin": (10, BookSpec(size_bytes=400_000, members=20, opf="minimal", isbn="last")),
+    # Un seul gros chapitre, sans ISBN : coût de la décompression.
+    "gros_chapitre": (3, BookSpec(size_bytes=5_000_000, members=1, opf="full", isbn="none")),
+}
+
+
+def _measure(func: Callable[[], object], repeat: int) -> dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {"best_s": min(timings), "median_s": statistics.median(timings)}
+
+
+def _result(name: str, corpus: str, paths: list[Path], timing: dict[str, float]) -> dict[str, Any]:
+    size_mb = sum(path.stat().st_size for path in paths) / 1024 / 1024
+    best = timing["best_s"]
+    return {
+        "name": name,
+        "corpus": corpus,
+        "files": len(paths),
+        "best_s": round(best, 6),
+        "median_s": round(timing["median_s"], 6),
+        "per_file_ms": round(best / len(paths) * 1000, 3),
+        "epub_mb_per_s": round(size_mb / best, 2) if best else None,
+    }
+
+
+def _end_to_end(folder: Path, work_dir: Path, webhook_url: str) -> None:
+    config = Config.load()
+    config.webhook_url = webhook_url
+    config.log_path = work_dir / f"n8n_response_{time.monotonic_ns()}.json"
+    config.manifest_path = None
+    config.cache_path = None
+    config.result_index_path = None
+    config.retries = 0
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        process_folder(folder, config)
+
+
+def run(scale: float, repeat: int, only: Optional[set[str]] = None) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory(prefix="sortbook-bench-") as tmp, N8nStub() as stub:
+        work_dir = Path(tmp)
+
+        for corpus, (count, spec) in CORPORA.items():
+            folder = work_dir / corpus
+            paths = build_corpus(folder, max(1, round(count * scale)), spec)
+            full_texts = [_extract_full_text(path) for path in paths]
+
+            cases: dict[str, Callable[[], object]] = {
+                "extract_text_from_epub": lambda: [extract_text_from_epub(path) for path in paths],
+                "extract_metadata_from_epub": lambda: [extract_metadata_from_epub(path) for path in paths],
+                "_extract_full_text": lambda: [_extract_full_text(path) for path in paths],
+                "_find_first_isbn": lambda: [_find_first_isbn([text]) for text in full_texts],
+                "scan_epub_for_isbn": lambda: [scan_epub_for_isbn(path) for path in paths],
+                "process_folder": lambda: _end_to_end(folder, work_dir, stub.url),
+            }
+            for name, func in cases.items():
+                if only and name not in only:
+                    continue
+                results.append(_result(name, corpus, paths, _measure(func, repeat)))
+                print(f"  {corpus:<14} {name:<28} {results[-1]['per_file_ms']:>10.2f} ms/livre", file=sys.stderr)
+
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def compare(current: list[dict[str, Any]], baseline_path: Path, tolerance: float) -> int:
+    """Print per-benchmark ratios against a previous run; return the number of regressions."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {(row["name"], row["corpus"]): row for row in baseline.get("results", [])}
+
+    regressions = 0
+    print(f"Comparaison avec {baseline_path} ({baseline.get('git') or 'version inconnue'}) :")
+    for row in current:
+        before = previous.get((row["name"], row["corpus"]))
+        if before is None or not before.get("per_file_ms"):
+            continue
+        ratio = row["per_file_ms"] / before["per_file_ms"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  RÉGRESSION"
+            regressions += 1
+        print(
+            f"  {row['corpus']:<14} {row['name']:<28} {before['per_file_ms']:>10.2f} -> "
+            f"{row['per_file_ms']:>10.2f} ms/livre  x{ratio:.2f}{flag}"
+        )
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks d'extraction et de traitement de bout en bout.")
+    parser.add_argument("--output", type=Path, help="Fichier JSON des résultats (défaut : sortie standard).")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre de passes par mesure (meilleur temps retenu).")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplie le nombre de livres de chaque corpus.")
+    parser.add_argument("--only", nargs="+", help="Ne lancer que ces benchmarks (noms de fonctions).")
+    parser.add_argument("--compare", type=Path, help="Résultats JSON d'une exécution précédente.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="Ralentissement toléré avant de signaler une régression (0.10 = 10 %%).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    results = run(args.scale, max(1, args.repeat), set(args.only) if args.only else None)
+
+    document = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(document, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Résultats écrits dans {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(document, indent=2, ensure_ascii=False))
+
+    if args.compare is not None and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
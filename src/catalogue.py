@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Catalogue local (base OpenLibrary importée par `openlibrary_import`).
+
+Permet de résoudre un ISBN sans passer par n8n : l'ISBN est cherché sous
+ses deux formes (ISBN-10 et ISBN-13), les éditions trouvées donnent le titre
+et les auteurs (ceux de l'édition, sinon ceux de l'œuvre). Le résultat n'est
+retenu que s'il est sans ambiguïté : toutes les éditions désignent le même
+titre et les mêmes auteurs, et ni le titre ni l'auteur ne sont vides.
+
+Sans ISBN, `LocalCatalogue.search` interroge l'index plein texte des titres
+(FTS5) puis reclasse les candidats avec le score du workflow n8n :
+``0.6 × recouvrement de mots + 0.4 × similarité de Levenshtein`` sur les
+chaînes normalisées, candidats sous ``MIN_SCORE`` écartés.
+
+Usage typique :
+    python src/catalogue.py search --title "Mémoires d'Hadrien" --author Yourcenar
+    python src/catalogue.py search --filename "Camus, Albert - La Peste.epub"
+    python src/catalogue.py build-index   # base importée sans index de recherche
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from openlibrary_import import DEFAULT_DB_PATH, LIST_SEPARATOR, build_search_index, normalize_text
+
+# Même seuil que le nœud de scoring du workflow (« Code in JavaScript »).
+MIN_SCORE = 0.3
+# Un titre n'est résolu sans n8n que si le meilleur candidat est quasi certain
+# et nettement devant le suivant ; les autres cas restent arbitrés par le LLM.
+ACCEPT_SCORE = 0.9
+ACCEPT_MARGIN = 0.1
+# Candidats lus dans l'index plein texte avant le calcul des scores.
+CANDIDATE_POOL = 50
+
+# Mots trop fréquents pour départager des titres (ignorés dans la requête FTS).
+_STOPWORDS = frozenset(
+    "a an and au aux de des du en et la le les of on the to un une".split()
+)
+
+
+def token_overlap(a: str, b: str) -> float:
+    """Jaccard index of the word sets of two normalized strings."""
+    words_a, words_b = set(a.split()), set(b.split())
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def levenshtein_similarity(a: str, b: str) -> float:
+    """``1 - distance / longueur max`` (deux lignes de programmation dynamique)."""
+    if not a and not b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return 1 - previous[-1] / max(len(a), len(b))
+
+
+def similarity(a: str, b: str) -> float:
+    """Score of the n8n workflow on two normalized strings (0 à 1)."""
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    return 0.6 * token_overlap(a, b) + 0.4 * levenshtein_similarity(a, b)
+
+
+def author_similarity(query: str, name: str) -> float:
+    """Similarity of two normalized author names, insensible à l'ordre des mots.
+
+    « camus albert » et « albert camus » sont identiques ; un nom réduit au
+    patronyme (« camus ») correspond pleinement à « albert camus ».
+    """
+    query_words, name_words = query.split(), name.split()
+    if query_words and set(query_words) <= set(name_words):
+        return 1.0
+    return similarity(" ".join(sorted(query_words)), " ".join(sorted(name_words)))
+
+
+def split_filename(filename: str) -> list[tuple[str, str]]:
+    """Plausible ``(titre, auteur)`` readings of an EPUB file name.
+
+    ``Camus, Albert - L'Étranger (1942).epub`` donne les deux ordres possibles
+    autour du tiret ; un nom sans séparateur est pris comme titre seul.
+    """
+    stem = re.sub(r"\.epub$", "", Path(filename).name, flags=re.IGNORECASE)
+    stem = re.sub(r"[\[(][^\])]*[\])]", " ", stem)
+    stem = " ".join(re.sub(r"[_.]+", " ", stem).split())
+
+    parts = [part.strip() for part in re.split(r"\s+-\s+|\s*--\s*", stem) if part.strip()]
+    if len(parts) >= 2:
+        first, rest = parts[0], " ".join(parts[1:])
+        return [(rest, first), (first, rest)]
+    return [(stem, "")] if stem else []
+
+
+def isbn10_to_13(isbn10: str) -> str:
+    """``2070360024`` → ``9782070360024`` (sans validation de la clé d'entrée)."""
+    core = "978" + isbn10[:9]
+    total = sum(int(digit) * (1 if index % 2 == 0 else 3) for index, digit in enumerate(core))
+    return core + str((10 - total % 10) % 10)
+
+
+def isbn13_to_10(isbn13: str) -> Optional[str]:
+    """``978…`` → ISBN-10 ; ``None`` pour les ISBN-13 en 979 (sans équivalent)."""
+    if not isbn13.startswith("978"):
+        return None
+
+    core = isbn13[3:12]
+    total = sum((10 - index) * int(digit) for index, digit in enumerate(core))
+    check = (11 - total % 11) % 11
+    return core + ("X" if check == 10 else str(check))
+
+
+def isbn_forms(isbn: str) -> tuple[Optional[str], Optional[str]]:
+    """Return ``(isbn10, isbn13)`` for a normalized ISBN of either length."""
+    isbn = isbn.strip().upper()
+    if len(isbn) == 10:
+        return isbn, isbn10_to_13(isbn)
+    if len(isbn) == 13:
+        return isbn13_to_10(isbn), isbn
+    return None, None
+
+
+@dataclass(frozen=True)
+class SearchCandidate:
+    """A fuzzy search hit with its similarity score."""
+
+    work_key: str
+    title: str
+    authors: tuple[str, ...]
+    score: float
+
+    @property
+    def author(self) -> str:
+        return ", ".join(self.authors)
+
+
+@dataclass(frozen=True)
+class CatalogueEntry:
+    """One edition of the catalogue, with resolved author names."""
+
+    edition_key: str
+    title: str
+    authors: tuple[str, ...]
+
+    @property
+    def author(self) -> str:
+        return ", ".join(self.authors)
+
+
+class LocalCatalogue:
+    """Read-only access to the OpenLibrary SQLite catalogue."""
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+        if not self.db_path.is_file():
+            raise FileNotFoundError(f"Catalogue introuvable : {self.db_path}")
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        tables = {row[0] for row in self._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if not {"editions", "isbn10", "isbn13", "authors", "works"} <= tables:
+            self._conn.close()
+            raise ValueError(f"Catalogue vide ou incomplet (importer les dumps OpenLibrary) : {self.db_path}")
+        self.has_search_index = "title_search" in tables
+
+    def __enter__(self) -> LocalCatalogue:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def lookup_isbn(self, isbn: str) -> list[CatalogueEntry]:
+        """Every edition carrying ``isbn`` (cherché sous ses formes ISBN-10 et ISBN-13)."""
+        isbn10, isbn13 = isbn_forms(isbn)
+        if isbn13 is None:
+            return []
+
+        with self._lock:
+            keys = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT edition_key FROM isbn13 WHERE isbn = ? UNION SELECT edition_key FROM isbn10 WHERE isbn = ?",
+                    (isbn13, isbn10 or ""),
+                )
+            ]
+            return [entry for entry in (self._edition(key) for key in keys) if entry is not None]
+
+    def resolve_isbn(self, isbn: str) -> Optional[CatalogueEntry]:
+        """Return the edition of ``isbn`` if the catalogue is unambiguous, else ``None``."""
+        entries = [entry for entry in self.lookup_isbn(isbn) if entry.title and entry.authors]
+        if not entries:
+            return None
+
+        identities = {
+            (normalize_text(entry.title), tuple(sorted(map(normalize_text, entry.authors)))) for entry in entries
+        }
+        return entries[0] if len(identities) == 1 else None
+
+    def search(self, title: str, author: str = "", limit: int = 10) -> list[SearchCandidate]:
+        """Ranked catalogue candidates for an OPF ``title``/``creator`` (score ≥ `MIN_SCORE`).
+
+        Avec un auteur, le score combine titre (70 %) et meilleur auteur (30 %).
+        Les requêtes FTS vont de la plus sélective à la plus large (tous les mots
+        du titre, puis n'importe lequel ; avec puis sans l'auteur) : un mot
+        fréquent ne force ainsi le classement de milliers de lignes qu'en
+        dernier recours.
+        """
+        if not self.has_search_index:
+            return []
+
+        query_title, query_author = normalize_text(title), normalize_text(author)
+        if not _match_expression(query_title, "AND"):
+            return []
+
+        expressions: list[str] = []
+        author_match = _match_expression(query_author, "OR")
+        for operator in ("AND", "OR"):
+            title_match = f"title : ({_match_expression(query_title, operator)})"
+            if author_match:
+                expressions.append(f"{title_match} AND authors : ({author_match})")
+            expressions.append(title_match)
+
+        rows: list[tuple] = []
+        with self._lock:
+            for expression in dict.fromkeys(expressions):
+                rows = self._fts(expression)
+                if rows:
+                    break
+
+        candidates: dict[tuple[str, tuple[str, ...]], SearchCandidate] = {}
+        for normalized_title, work_key, display_title, display_authors in rows:
+            authors = tuple(filter(None, display_authors.split(LIST_SEPARATOR)))
+            score = similarity(query_title, normalized_title)
+            if query_author:
+                author_score = max(
+                    (author_similarity(query_author, normalize_text(name)) for name in authors),
+                    default=0.0,
+                )
+                score = 0.7 * score + 0.3 * author_score
+            if score < MIN_SCORE:
+                continue
+
+            identity = (normalized_title, tuple(map(normalize_text, authors)))
+            if identity not in candidates or candidates[identity].score < score:
+                candidates[identity] = SearchCandidate(work_key, display_title, authors, round(score, 4))
+
+        return sorted(candidates.values(), key=lambda candidate: -candidate.score)[:limit]
+
+    def search_filename(self, filename: str, limit: int = 10) -> list[SearchCandidate]:
+        """Search using the title/author readings of an EPUB file name (meilleur score par candidat)."""
+        best: dict[tuple[str, str], SearchCandidate] = {}
+        for title, author in split_filename(filename):
+            for candidate in self.search(title, author, limit=limit):
+                key = (candidate.work_key, candidate.title)
+                if key not in best or best[key].score < candidate.score:
+                    best[key] = candidate
+        return sorted(best.values(), key=lambda candidate: -candidate.score)[:limit]
+
+    def resolve_title(self, title: str, author: str = "", filename: str = "") -> Optional[SearchCandidate]:
+        """Best candidate if it is certain enough to skip n8n (`ACCEPT_SCORE`, `ACCEPT_MARGIN`)."""
+        candidates = self.search(title, author, limit=2) if title else self.search_filename(filename, limit=2)
+        if not candidates or candidates[0].score < ACCEPT_SCORE or not candidates[0].authors:
+            return None
+        if len(candidates) > 1 and candidates[0].score - candidates[1].score < ACCEPT_MARGIN:
+            return None
+        return candidates[0]
+
+    def _fts(self, expression: str) -> list[tuple]:
+        return self._conn.execute(
+            "SELECT title, work_key, display_title, display_authors FROM title_search"
+            " WHERE title_search MATCH ? ORDER BY rank LIMIT ?",
+            (expression, CANDIDATE_POOL),
+        ).fetchall()
+
+    def _edition(self, key: str) -> Optional[CatalogueEntry]:
+        row = self._conn.execute(
+            "SELECT title, author_keys, work_key FROM editions WHERE key = ? LIMIT 1",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        title, author_keys, work_key = row
+        if work_key and (not author_keys or not title):
+            work = self._conn.execute(
+                "SELECT title, author_keys FROM works WHERE key = ? LIMIT 1",
+                (work_key,),
+            ).fetchone()
+            if work is not None:
+                title = title or work[0]
+                author_keys = author_keys or work[1]
+
+        return CatalogueEntry(edition_key=key, title=title, authors=self._author_names(author_keys))
+
+    def _author_names(self, author_keys: str) -> tuple[str, ...]:
+        names: list[str] = []
+        for author_key in filter(None, author_keys.split(LIST_SEPARATOR)):
+            row = self._conn.execute("SELECT name FROM authors WHERE key = ? LIMIT 1", (author_key,)).fetchone()
+            if row is not None and row[0] not in names:
+                names.append(row[0])
+        return tuple(names)
+
+
+def _match_expression(normalized: str, operator: str) -> str:
+    """FTS5 expression joining the significant words of a normalized string with ``operator``."""
+    words = normalized.split()
+    significant = [word for word in words if len(word) > 1 and word not in _STOPWORDS] or words
+    return f" {operator} ".join(f'"{word}"' for word in dict.fromkeys(significant))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recherche dans le catalogue OpenLibrary local.")
+    parser.add_argument("--db", type=Path, default=None, help="Base SQLite (défaut : OPENLIBRARY_DB).")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="Candidats classés pour un titre/auteur, un nom de fichier ou un ISBN.")
+    search.add_argument("--title", default="")
+    search.add_argument("--author", default="")
+    search.add_argument("--filename", default="")
+    search.add_argument("--isbn", default="")
+    search.add_argument("--limit", type=int, default=10)
+    commands.add_parser("build-index", help="(Re)construit l'index plein texte des titres.")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    db_path: Path = (args.db or Path(os.environ.get("OPENLIBRARY_DB") or DEFAULT_DB_PATH)).expanduser()
+
+    if args.command == "build-index":
+        conn = sqlite3.connect(str(db_path), isolation_level=None)
+        try:
+            print(f"{build_search_index(conn):,} titre(s) indexé(s) dans {db_path}")
+        finally:
+            conn.close()
+        return
+
+    with LocalCatalogue(db_path) as catalogue:
+        if args.isbn:
+            isbn = re.sub(r"[^0-9Xx]", "", args.isbn).upper()
+            entries = catalogue.lookup_isbn(isbn)
+            for entry in entries:
+                print(f"{entry.title} — {entry.author} ({entry.edition_key})")
+            resolved = catalogue.resolve_isbn(isbn) is not None
+            print(f"{len(entries)} édition(s) ; résolution {'sans ambiguïté' if resolved else 'impossible'}.")
+            return
+
+        if args.title:
+            candidates = catalogue.search(args.title, args.author, limit=args.limit)
+        else:
+            candidates = catalogue.search_filename(args.filename, limit=args.limit)
+        for candidate in candidates:
+            print(f"{candidate.score:.3f}  {candidate.title} — {candidate.author} ({candidate.work_key})")
+        if not candidates:
+            print(f"Aucun candidat au-dessus du seuil {MIN_SCORE}.")
+
+
+if __name__ == "__main__":
+    main()
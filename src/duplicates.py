@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Détection des doublons exacts d'une bibliothèque EPUB.
+
+Les fichiers sont d'abord regroupés par taille (un simple ``stat``) ; seuls
+ceux qui partagent leur taille avec un autre fichier sont ensuite hachés
+(SHA-256). Deux fichiers de même empreinte sont des copies identiques : un
+seul doit être extrait et envoyé à n8n, le résultat étant reporté sur les autres.
+
+Usage typique :
+    python src/duplicates.py --folder ./ebooks --report doublons.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from library_walker import walk_epubs
+from manifest import file_sha256
+
+# Hachage en parallèle : hashlib libère le GIL, la lecture disque domine.
+DEFAULT_HASH_WORKERS = 4
+
+
+@dataclass
+class DuplicateGroup:
+    """Identical files; ``paths[0]`` (premier dans l'ordre de parcours) est l'original."""
+
+    sha256: str
+    size: int
+    paths: list[Path]
+
+    @property
+    def original(self) -> Path:
+        return self.paths[0]
+
+    @property
+    def copies(self) -> list[Path]:
+        return self.paths[1:]
+
+    @property
+    def wasted_bytes(self) -> int:
+        return self.size * (len(self.paths) - 1)
+
+    def to_dict(self) -> dict:
+        return {"sha256": self.sha256, "size": self.size, "paths": [str(path) for path in self.paths]}
+
+
+def find_duplicates(
+    files: Iterable[tuple[Path, int]],
+    workers: int = DEFAULT_HASH_WORKERS,
+    hash_fn: Callable[[Path], str] = file_sha256,
+    report: Optional[Callable[[str], None]] = None,
+) -> list[DuplicateGroup]:
+    """Group ``(path, size)`` pairs into sets of identical files.
+
+    Seuls les fichiers dont la taille est partagée sont hachés. Les fichiers
+    illisibles sont ignorés (signalés via ``report``). L'ordre d'entrée est
+    conservé dans chaque groupe et entre les groupes.
+    """
+    order: dict[Path, int] = {}
+    by_size: dict[int, list[Path]] = defaultdict(list)
+    for position, (path, size) in enumerate(files):
+        order[path] = position
+        by_size[size].append(path)
+
+    candidates = [path for paths in by_size.values() if len(paths) > 1 for path in paths]
+    if not candidates:
+        return []
+
+    def digest(path: Path) -> Optional[str]:
+        try:
+            return hash_fn(path)
+        except OSError as exc:
+            if report is not None:
+                report(f"  [Doublons] Lecture impossible : {path} ({exc})")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        digests = list(executor.map(digest, candidates))
+
+    by_hash: dict[tuple[int, str], list[Path]] = defaultdict(list)
+    sizes = {path: size for size, paths in by_size.items() for path in paths}
+    for path, sha256 in zip(candidates, digests):
+        if sha256 is not None:
+            by_hash[(sizes[path], sha256)].append(path)
+
+    groups = [
+        DuplicateGroup(sha256=sha256, size=size, paths=sorted(paths, key=order.__getitem__))
+        for (size, sha256), paths in by_hash.items()
+        if len(paths) > 1
+    ]
+    groups.sort(key=lambda group: order[group.original])
+    return groups
+
+
+def iter_epub_sizes(folder: Path) -> Iterable[tuple[Path, int]]:
+    """Yield ``(path, size)`` for every EPUB below ``folder`` (fichiers illisibles ignorés)."""
+    for epub_file, stat_result in walk_epubs(folder):
+        yield epub_file, stat_result.st_size
+
+
+def describe_groups(groups: list[DuplicateGroup]) -> str:
+    """One-line summary of a duplicate detection pass."""
+    copies = sum(len(group.copies) for group in groups)
+    wasted = sum(group.wasted_bytes for group in groups)
+    return f"{len(groups)} groupe(s) de doublons, {copies} copie(s) superflue(s), {wasted / 1_048_576:.1f} Mo"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Détection des EPUB en double (taille puis empreinte SHA-256).")
+    parser.add_argument("--folder", type=Path, required=True, help="Dossier contenant les EPUB.")
+    parser.add_argument("--report", type=Path, default=None, help="Écrit le rapport des doublons en JSON.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_HASH_WORKERS,
+        help=f"Nombre de fichiers hachés en parallèle (défaut : {DEFAULT_HASH_WORKERS}).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    folder: Path = args.folder.expanduser()
+
+    if not folder.exists():
+        print(f"Dossier introuvable : {folder}")
+        return
+
+    groups = find_duplicates(iter_epub_sizes(folder), workers=args.workers, report=print)
+
+    for group in groups:
+        print(f"{group.original} ({group.size:,} octets)")
+        for copy in group.copies:
+            print(f"  = {copy}")
+
+    print(describe_groups(groups))
+
+    if args.report is not None:
+        report_path: Path = args.report.expanduser()
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as handle:
+            json.dump([group.to_dict() for group in groups], handle, ensure_ascii=False, indent=2)
+        print(f"Rapport écrit dans {os.fspath(report_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,22 +9,75 @@ and logs the normalized response for inspection (sans aucun renommage).
 from __future__ import annotations
 
 import argparse
+import atexit
+import codecs
+import cProfile
 import json
 import os
+import pstats
 import re
+import signal
+import sys
+import threading
 import zipfile
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass, field
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing, contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from itertools import islice
 from pathlib import Path
-from typing import Any, Iterable, Optional
+from typing import Any, Callable, ContextManager, Iterable, Iterator, Optional, Union
 
 import requests
 
+from manifest import STATUS_DONE, STATUS_EMPTY, STATUS_FAILED, Manifest
+from n8n_client import BalancedN8nClient, ClientSettings, N8nClient, WebhookClient, split_urls
+from catalogue import LocalCatalogue
+from duplicates import DuplicateGroup, describe_groups, find_duplicates
+from html_text import HtmlTextExtractor
+from isbn_index import IsbnIndex
+from library_walker import DEFAULT_LIST_THREADS, walk_epubs
+from openlibrary_import import DEFAULT_DB_PATH as DEFAULT_CATALOGUE_PATH
+from pipeline import StagedPipeline
+from response_cache import ResponseCache, identification_key
+from result_index import DEFAULT_INDEX_FILE, ResultIndex
+from result_log import LOG_PROFILES, PROFILE_FULL, ResultLog
+from sharding import Shard, parse_shard, shard_argument, shard_path
+from timings import (
+    STAGE_CACHE,
+    STAGE_CATALOGUE,
+    STAGE_ISBN_SCAN,
+    STAGE_LOG_WRITE,
+    STAGE_OPF,
+    STAGE_RAW_PAGES,
+    STAGE_TEXT,
+    STAGE_WEBHOOK,
+    STAGE_ZIP_OPEN,
+    TimingStats,
+    timed,
+    to_milliseconds,
+)
+from watch import DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE_SECONDS, FolderWatcher
+
 
 # Configuration defaults
 DEFAULT_WEBHOOK_URL = "http://localhost:5678/webhook/epub-metadata"
 DEFAULT_TIMEOUT = 120.0
 DEFAULT_MAX_TEXT_CHARS = 4000
+DEFAULT_MANIFEST_FILE = "sortbook_manifest.sqlite"
+# Index du livre dans un lot, ajouté à chaque payload batch et renvoyé par le workflow.
+BATCH_ID_KEY = "batch_id"
+DEFAULT_CACHE_FILE = "sortbook_cache.sqlite"
+# Taille des blocs (caractères) transmis à l'extracteur de texte HTML.
+TEXT_CHUNK_CHARS = 64 * 1024
+# Taille des lectures dans un membre compressé (décompression à la demande).
+RAW_CHUNK_BYTES = 64 * 1024
+# Nombre de fonctions affichées en fin d'exécution avec --profile.
+PROFILE_TOP_FUNCTIONS = 20
+# Nombre de livres soumis mais pas encore écrits, par worker (mode --concurrency).
+PENDING_WINDOW_FACTOR = 4
 
 PREFERRED_KEYWORDS = (
     "cover",
@@ -36,6 +89,9 @@ PREFERRED_KEYWORDS = (
 )
 
 ISBN_CANDIDATE_RE = re.compile(r"[0-9Xx][0-9Xx\- ]{8,16}[0-9Xx]")
+ISBN_CANDIDATE_CHARS = frozenset("0123456789Xx- ")
+# Au-delà, une suite de caractères "candidats" en fin de bloc est scannée sans attendre le bloc suivant.
+ISBN_MAX_PENDING_CHARS = 1024
 
 
 @dataclass
@@ -48,10 +104,36 @@ class Config:
     log_path: Path
     epub_root_label: str
     dest_path: str
+    manifest_path: Optional[Path] = None
+    manifest_hash: bool = False
+    retries: int = 3
+    backoff: float = 1.0
+    backoff_max: float = 30.0
+    pool_size: int = 10
+    breaker_threshold: int = 5
+    breaker_cooldown: float = 60.0
+    retry_read_timeout: bool = False
+    batch_url: str = ""
+    batch_size: int = 1
+    batch_timeout: float = 0.0
+    cache_path: Optional[Path] = None
+    cache_max_entries: int = 100_000
+    cache_ttl: float = 0.0
+    log_profile: str = PROFILE_FULL
+    log_max_bytes: int = 0
+    log_fsync_interval: float = 5.0
+    log_blob_gzip: bool = True
+    result_index_path: Optional[Path] = None
+    local_isbn: bool = False
+    local_search: bool = False
+    catalogue_path: Path = DEFAULT_CATALOGUE_PATH
+    isbn_index_path: Optional[Path] = None
+    list_threads: int = DEFAULT_LIST_THREADS
+    shard: Optional[Shard] = None
 
     @classmethod
-    def load(cls, test_mode: bool = False) -> Config:
-        """Load configuration from environment variables."""
+    def load(cls, test_mode: bool = False, shard: Optional[Shard] = None) -> Config:
+        """Load configuration from environment variables (``shard`` remplace EPUB_SHARD)."""
         test_url = os.environ.get("N8N_WEBHOOK_TEST_URL")
         prod_url = os.environ.get("N8N_WEBHOOK_PROD_URL")
 
@@ -65,6 +147,8 @@ class Config:
         log_path = cls._parse_log_path()
         epub_root_label = os.getcwd()
         dest_path = os.environ.get("EPUB_DEST", "")
+        manifest_path = cls._parse_state_path("EPUB_MANIFEST", DEFAULT_MANIFEST_FILE)
+        manifest_hash = os.environ.get("EPUB_MANIFEST_HASH", "false").strip().lower() in {"1", "true", "yes", "oui"}
 
         return cls(
             webhook_url=webhook_url,
@@ -73,6 +157,65 @@ class Config:
             log_path=log_path,
             epub_root_label=epub_root_label,
             dest_path=dest_path,
+            manifest_path=manifest_path,
+            manifest_hash=manifest_hash,
+            retries=cls._parse_int("N8N_RETRIES", 3),
+            backoff=cls._parse_float("N8N_BACKOFF", 1.0),
+            backoff_max=cls._parse_float("N8N_BACKOFF_MAX", 30.0),
+            pool_size=cls._parse_int("N8N_POOL_SIZE", 10),
+            breaker_threshold=cls._parse_int("N8N_BREAKER_THRESHOLD", 5),
+            breaker_cooldown=cls._parse_float("N8N_BREAKER_COOLDOWN", 60.0),
+            retry_read_timeout=os.environ.get("N8N_RETRY_READ_TIMEOUT", "false").strip().lower()
+            in {"1", "true", "yes", "oui"},
+            batch_url=os.environ.get("N8N_WEBHOOK_BATCH_URL") or _default_batch_url(webhook_url),
+            batch_size=cls._parse_int("N8N_BATCH_SIZE", 1),
+            batch_timeout=cls._parse_float("N8N_BATCH_TIMEOUT", 0.0),
+            cache_path=cls._parse_state_path("EPUB_CACHE", DEFAULT_CACHE_FILE),
+            cache_max_entries=cls._parse_int("EPUB_CACHE_MAX_ENTRIES", 100_000),
+            cache_ttl=cls._parse_float("EPUB_CACHE_TTL_DAYS", 0.0) * 86400,
+            log_profile=cls._parse_log_profile(),
+            log_max_bytes=int(cls._parse_float("EPUB_LOG_MAX_MB", 0.0) * 1024 * 1024),
+            log_fsync_interval=cls._parse_float("EPUB_LOG_FSYNC_INTERVAL", 5.0),
+            log_blob_gzip=os.environ.get("EPUB_LOG_BLOB_GZIP", "true").strip().lower() in {"1", "true", "yes", "oui"},
+            result_index_path=cls._parse_state_path("EPUB_RESULT_INDEX", DEFAULT_INDEX_FILE),
+            local_isbn=os.environ.get("EPUB_LOCAL_ISBN", "false").strip().lower() in {"1", "true", "yes", "oui"},
+            local_search=os.environ.get("EPUB_LOCAL_SEARCH", "false").strip().lower() in {"1", "true", "yes", "oui"},
+            catalogue_path=Path(os.environ.get("OPENLIBRARY_DB") or DEFAULT_CATALOGUE_PATH),
+            isbn_index_path=Path(os.environ["EPUB_ISBN_INDEX"]) if os.environ.get("EPUB_ISBN_INDEX") else None,
+            list_threads=cls._parse_int("EPUB_LIST_THREADS", DEFAULT_LIST_THREADS),
+        ).with_shard(shard or cls._parse_shard())
+
+    def with_shard(self, shard: Optional[Shard]) -> Config:
+        """Restrict processing to ``shard`` and give it its own state files.
+
+        Le log JSONL, le manifeste, le cache et l'index des résultats prennent
+        le suffixe ``.shardIofN`` ; les blobs du profil compact, adressés par
+        leur contenu, restent partagés.
+        """
+        if shard is None:
+            return self
+        if self.shard is not None:
+            raise ValueError(f"Part déjà définie : {self.shard}")
+        self.shard = shard
+        self.log_path = shard_path(self.log_path, shard)
+        for name in ("manifest_path", "cache_path", "result_index_path"):
+            path = getattr(self, name)
+            if path is not None:
+                setattr(self, name, shard_path(path, shard))
+        return self
+
+    def client_settings(self) -> ClientSettings:
+        """HTTP client settings (pool, retries, circuit breaker) for `N8nClient`."""
+        return ClientSettings(
+            timeout=self.timeout,
+            verify_ssl=self.verify_ssl,
+            retries=self.retries,
+            backoff=self.backoff,
+            backoff_max=self.backoff_max,
+            pool_size=self.pool_size,
+            breaker_threshold=self.breaker_threshold,
+            breaker_cooldown=self.breaker_cooldown,
+            retry_read_timeout=self.retry_read_timeout,
         )
 
     @staticmethod
@@ -94,12 +237,61 @@ class Config:
         except ValueError:
             return DEFAULT_TIMEOUT
 
+    @staticmethod
+    def _parse_int(name: str, default: int) -> int:
+        try:
+            return int(os.environ.get(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def _parse_float(name: str, default: float) -> float:
+        try:
+            return float(os.environ.get(name, str(default)))
+        except ValueError:
+            return default
+
     @staticmethod
     def _parse_log_path() -> Path:
         log_dir = Path(os.environ.get("LOG_DIR") or os.getcwd())
         log_filename = os.environ.get("EPUB_LOG_FILE", "n8n_response.json")
         return log_dir / log_filename
 
+    @staticmethod
+    def _parse_shard() -> Optional[Shard]:
+        raw = os.environ.get("EPUB_SHARD", "").strip()
+        if not raw:
+            return None
+        try:
+            return parse_shard(raw)
+        except ValueError as exc:
+            print(f"EPUB_SHARD ignoré : {exc}")
+            return None
+
+    @staticmethod
+    def _parse_log_profile() -> str:
+        profile = os.environ.get("EPUB_LOG_PROFILE", PROFILE_FULL).strip().lower()
+        return profile if profile in LOG_PROFILES else PROFILE_FULL
+
+    @staticmethod
+    def _parse_state_path(name: str, default_filename: str) -> Optional[Path]:
+        """Path of a local SQLite state file (manifeste, cache) ; ``None`` si désactivé."""
+        raw = os.environ.get(name, "").strip()
+
+        if raw.lower() in {"0", "false", "no", "non", "off"}:
+            return None
+        if raw:
+            return Path(raw)
+        return Path(os.environ.get("LOG_DIR") or os.getcwd()) / default_filename
+
+
+def _default_batch_url(webhook_url: str) -> str:
+    """Batch webhook URL of the bundled workflow: ``.../epub-metadata`` → ``.../epub-metadata-batch``.
+
+    Avec plusieurs webhooks (séparés par des virgules), chacun reçoit son URL batch.
+    """
+    return ",".join(url.rstrip("/") + "-batch" for url in split_urls(webhook_url))
+
 
 @dataclass
 class EpubResult:
@@ -144,6 +336,21 @@ class EpubMetadata:
         }
 
 
+@dataclass
+class ProcessOutcome:
+    """Outcome of `process_epub`, recorded in the run manifest."""
+
+    status: str
+    isbn: str = ""
+    result: Optional[EpubResult] = None
+    response: Optional[dict[str, Any]] = None
+    error: str = ""
+    prepared: Optional[PreparedEpub] = None
+    cache_hit: bool = False
+    # "n8n" (webhook ou cache de ses réponses) ou "catalogue" (ISBN résolu localement).
+    resolved_by: str = "n8n"
+
+
 class EpubProcessingError(Exception):
     """Base exception for EPUB processing errors."""
 
@@ -158,10 +365,15 @@ class WebhookError(EpubProcessingError):
 
 def _iter_text_files(zf: zipfile.ZipFile) -> Iterable[zipfile.ZipInfo]:
     """Return EPUB HTML/XHTML files ordered by priority."""
+    return _prioritize_text_files(zf.infolist())
+
+
+def _prioritize_text_files(infos: Iterable[zipfile.ZipInfo]) -> list[zipfile.ZipInfo]:
+    """Filter HTML/XHTML members and put the preferred ones (cover, copyright...) first."""
     prioritized: list[zipfile.ZipInfo] = []
     fallback: list[zipfile.ZipInfo] = []
 
-    for info in zf.infolist():
+    for info in infos:
         filename = info.filename.lower()
 
         if not filename.endswith((".xhtml", ".html", ".htm")):
@@ -175,10 +387,172 @@ def _iter_text_files(zf: zipfile.ZipFile) -> Iterable[zipfile.ZipInfo]:
     return prioritized + fallback
 
 
-def _strip_html(raw_html: str) -> str:
-    """Remove HTML tags and collapse whitespace."""
-    text = re.sub(r"<[^>]+>", " ", raw_html, flags=re.IGNORECASE)
-    return re.sub(r"\s+", " ", text).strip()
+class EpubArchive:
+    """EPUB archive opened once and shared by every extraction stage.
+
+    L'index des membres (fichiers texte par priorité, OPF) est construit à
+    l'ouverture ; les contenus décodés et nettoyés sont mis en cache au fil
+    des lectures, de sorte que texte, pages brutes, métadonnées et scan d'ISBN
+    ne décompressent chaque membre qu'une seule fois.
+
+    Lève ``zipfile.BadZipFile`` / ``FileNotFoundError`` si le fichier n'est pas lisible.
+    """
+
+    def __init__(self, epub_path: Path) -> None:
+        self.path = Path(epub_path)
+        self._zf = zipfile.ZipFile(self.path)
+
+        infos = self._zf.infolist()
+        self.text_files: list[zipfile.ZipInfo] = _prioritize_text_files(infos)
+        self.opf_info: Optional[zipfile.ZipInfo] = next(
+            (info for info in infos if info.filename.lower().endswith(".opf")),
+            None,
+        )
+
+        self._raw_cache: dict[str, Optional[str]] = {}
+        self._text_cache: dict[str, str] = {}
+
+    def __enter__(self) -> EpubArchive:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._zf.close()
+        self._raw_cache.clear()
+        self._text_cache.clear()
+
+    def read_raw(self, info: zipfile.ZipInfo, cache: bool = True) -> Optional[str]:
+        """Return the decoded content of a member (``None`` if unreadable)."""
+        if info.filename in self._raw_cache:
+            return self._raw_cache[info.filename]
+
+        try:
+            with self._zf.open(info) as handle:
+                raw: Optional[str] = handle.read().decode("utf-8", errors="ignore")
+        except Exception:
+            raw = None
+
+        if cache:
+            self._raw_cache[info.filename] = raw
+        return raw
+
+    def iter_raw(self, info: zipfile.ZipInfo, cache: bool = True) -> Iterator[str]:
+        """Yield the decoded content of a member block by block.
+
+        Le membre est décompressé au fil de la lecture (``RAW_CHUNK_BYTES`` à la
+        fois, décodeur UTF-8 incrémental) : un consommateur qui s'arrête tôt
+        n'inflate pas la suite. Le contenu n'est mis en cache que s'il a été lu
+        jusqu'au bout ; une erreur de lecture interrompt le flux.
+        """
+        if info.filename in self._raw_cache:
+            raw = self._raw_cache[info.filename] or ""
+            for start in range(0, len(raw), TEXT_CHUNK_CHARS):
+                yield raw[start : start + TEXT_CHUNK_CHARS]
+            return
+
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        blocks: list[str] = []
+
+        try:
+            with self._zf.open(info) as handle:
+                while True:
+                    data = handle.read(RAW_CHUNK_BYTES)
+                    text = decoder.decode(data, final=not data)
+                    if text:
+                        if cache:
+                            blocks.append(text)
+                        yield text
+                    if not data:
+                        break
+        except Exception:
+            if cache:
+                self._raw_cache[info.filename] = None
+            return
+
+        if cache:
+            self._raw_cache[info.filename] = "".join(blocks)
+
+    def read_text(self, info: zipfile.ZipInfo, cache: bool = True) -> str:
+        """Return the stripped plain text of a member ("" if unreadable)."""
+        return "".join(self.iter_member_text(info, cache=cache))
+
+    def iter_member_text(
+        self,
+        info: zipfile.ZipInfo,
+        budget: Optional[int] = None,
+        cache: bool = True,
+    ) -> Iterator[str]:
+        """Yield the plain text of a member block by block, up to ``budget`` characters.
+
+        Le contenu décompressé par ``iter_raw`` est transmis au fil de l'eau à
+        ``HtmlTextExtractor`` : dès que le budget est atteint (ou que le
+        consommateur s'arrête, premier ISBN trouvé), la décompression du membre
+        s'arrête aussi. Seul un texte complet est mis en cache.
+        """
+        cached = self._text_cache.get(info.filename)
+        if cached is not None:
+            if cached:
+                yield cached if budget is None else cached[:budget].rstrip()
+            return
+
+        extractor = HtmlTextExtractor(budget)
+        pieces: list[str] = []
+
+        with closing(self.iter_raw(info, cache=cache)) as chunks:
+            for chunk in chunks:
+                text = extractor.feed(chunk)
+                if text:
+                    pieces.append(text)
+                    yield text
+                if extractor.done:
+                    return
+
+        tail = extractor.close()
+        if tail:
+            pieces.append(tail)
+            yield tail
+
+        if cache:
+            self._text_cache[info.filename] = "".join(pieces)
+
+    def iter_text(self, cache: bool = True) -> Iterator[str]:
+        """Yield the plain text of each member in priority order, separated by spaces.
+
+        La concaténation des blocs produits est identique à ``_extract_full_text``,
+        sans jamais matérialiser le texte complet. Avec ``cache=False``, les membres
+        qui ne sont pas déjà en cache ne sont pas conservés après lecture.
+        """
+        started = False
+        for info in self.text_files:
+            separator = started
+            for text in self.iter_member_text(info, cache=cache):
+                if separator:
+                    yield " "
+                    separator = False
+                started = True
+                yield text
+
+    def read_opf(self) -> Optional[str]:
+        """Return the decoded OPF package document, if any."""
+        if self.opf_info is None:
+            return None
+        return self.read_raw(self.opf_info)
+
+
+EpubSource = Union[Path, EpubArchive]
+
+
+@contextmanager
+def _open_archive(source: EpubSource) -> Iterator[EpubArchive]:
+    """Yield an archive for ``source`` ; n'ouvre (et ne ferme) le ZIP que si un chemin est donné."""
+    if isinstance(source, EpubArchive):
+        yield source
+        return
+
+    with EpubArchive(source) as archive:
+        yield archive
 
 
 def _normalize_isbn_candidate(candidate: str) -> str:
@@ -238,8 +612,61 @@ def _find_first_isbn(strings: Iterable[str]) -> Optional[str]:
     return None
 
 
-def extract_text_from_epub(epub_path: Path, max_chars: int = DEFAULT_MAX_TEXT_CHARS) -> str:
-    """Extract plain text from EPUB file."""
+def _iter_isbn_candidates(chunks: Iterable[str]) -> Iterator[str]:
+    """Yield ISBN regex candidates from a stream of text chunks.
+
+    Un candidat ne contient que des chiffres, ``X``, tirets et espaces : la fin
+    de chaque bloc, à partir du dernier caractère qui ne peut pas appartenir à
+    un ISBN, est reportée sur le bloc suivant. Les candidats produits sont donc
+    les mêmes que sur le texte concaténé, y compris à cheval sur deux blocs.
+    """
+    tail = ""
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+
+        buffer = tail + chunk
+        cut = len(buffer)
+        while cut > 0 and buffer[cut - 1] in ISBN_CANDIDATE_CHARS:
+            cut -= 1
+
+        if len(buffer) - cut > ISBN_MAX_PENDING_CHARS:
+            cut = len(buffer)
+
+        yield from ISBN_CANDIDATE_RE.findall(buffer, 0, cut)
+        tail = buffer[cut:]
+
+    if tail:
+        yield from ISBN_CANDIDATE_RE.findall(tail)
+
+
+def _scan_first_isbn(chunks: Iterable[str]) -> Optional[str]:
+    """Return the first valid ISBN of a text stream, consuming it only up to that point."""
+    for candidate in _iter_isbn_candidates(chunks):
+        normalized = _normalize_isbn_candidate(candidate)
+        if normalized:
+            return normalized
+
+    return None
+
+
+def find_isbn_in_text(source: EpubSource) -> Optional[str]:
+    """Scan the EPUB text member by member and stop at the first valid ISBN.
+
+    Équivalent à ``_find_first_isbn([_extract_full_text(source)])`` mais sans
+    construire le texte complet : la plupart des ISBN sont sur la page de copyright,
+    parmi les premiers membres lus.
+    """
+    try:
+        with _open_archive(source) as archive:
+            return _scan_first_isbn(archive.iter_text(cache=False))
+    except (zipfile.BadZipFile, FileNotFoundError):
+        return None
+
+
+def extract_text_from_epub(source: EpubSource, max_chars: int = DEFAULT_MAX_TEXT_CHARS) -> str:
+    """Extract plain text from EPUB file (path or already opened `EpubArchive`)."""
     if max_chars == DEFAULT_MAX_TEXT_CHARS:
         env_max = os.environ.get("DEFAULT_MAX_TEXT_CHARS")
         if env_max is not None:
@@ -248,54 +675,45 @@ def extract_text_from_epub(epub_path: Path, max_chars: int = DEFAULT_MAX_TEXT_CH
             except ValueError:
                 max_chars = DEFAULT_MAX_TEXT_CHARS
 
+    texts: list[str] = []
+    length = 0
+
     try:
-        with zipfile.ZipFile(epub_path) as zf:
-            texts: list[str] = []
-
-            for info in _iter_text_files(zf):
-                try:
-                    with zf.open(info) as handle:
-                        raw = handle.read().decode("utf-8", errors="ignore")
-                except Exception:
-                    continue
+        with _open_archive(source) as archive:
+            for info in archive.text_files:
+                # Budget restant une fois compté l'espace qui sépare les membres.
+                separator = 1 if length else 0
+                remaining = max_chars - length - separator
+                if remaining <= 0:
+                    break
 
-                stripped = _strip_html(raw)
-                if stripped:
-                    texts.append(stripped)
+                text = "".join(archive.iter_member_text(info, budget=remaining))
+                if not text:
+                    continue
 
-                if len(" ".join(texts)) >= max_chars:
-                    break
+                if separator:
+                    texts.append(" ")
+                texts.append(text)
+                length += separator + len(text)
 
     except (zipfile.BadZipFile, FileNotFoundError):
         return ""
 
-    combined = " ".join(texts).strip()
-    return combined[:max_chars]
+    return "".join(texts)
 
 
-def _extract_full_text(epub_path: Path) -> str:
+def _extract_full_text(source: EpubSource) -> str:
     """Extract the full plain text from an EPUB (no length limit)."""
     try:
-        with zipfile.ZipFile(epub_path) as zf:
-            texts: list[str] = []
-
-            for info in _iter_text_files(zf):
-                try:
-                    with zf.open(info) as handle:
-                        raw = handle.read().decode("utf-8", errors="ignore")
-                except Exception:
-                    continue
-
-                stripped = _strip_html(raw)
-                if stripped:
-                    texts.append(stripped)
+        with _open_archive(source) as archive:
+            texts = [text for text in map(archive.read_text, archive.text_files) if text]
     except (zipfile.BadZipFile, FileNotFoundError):
         return ""
 
     return " ".join(texts).strip()
 
 
-def extract_raw_pages_from_epub(epub_path: Path, max_pages: int = 5) -> list[str]:
+def extract_raw_pages_from_epub(source: EpubSource, max_pages: int = 5) -> list[str]:
     """Extract raw (non-parsed) HTML content from the first `max_pages` text files.
 
     Les "pages" correspondent ici aux premiers fichiers HTML/XHTML renvoyés
@@ -304,12 +722,10 @@ def extract_raw_pages_from_epub(epub_path: Path, max_pages: int = 5) -> list[str
     pages: list[str] = []
 
     try:
-        with zipfile.ZipFile(epub_path) as zf:
-            for info in _iter_text_files(zf):
-                try:
-                    with zf.open(info) as handle:
-                        raw = handle.read().decode("utf-8", errors="ignore")
-                except Exception:
+        with _open_archive(source) as archive:
+            for info in archive.text_files:
+                raw = archive.read_raw(info)
+                if raw is None:
                     continue
 
                 pages.append(raw)
@@ -321,26 +737,19 @@ def extract_raw_pages_from_epub(epub_path: Path, max_pages: int = 5) -> list[str
     return pages
 
 
-def extract_metadata_from_epub(epub_path: Path) -> EpubMetadata:
+def extract_metadata_from_epub(source: EpubSource) -> EpubMetadata:
     """Extract metadata from EPUB OPF file."""
     metadata = EpubMetadata()
 
     try:
-        with zipfile.ZipFile(epub_path) as zf:
-            opf_info = next(
-                (info for info in zf.infolist() if info.filename.lower().endswith(".opf")),
-                None,
-            )
-
-            if opf_info is None:
-                return metadata
-
-            with zf.open(opf_info) as handle:
-                raw_opf = handle.read().decode("utf-8", errors="ignore")
-
+        with _open_archive(source) as archive:
+            raw_opf = archive.read_opf()
     except (zipfile.BadZipFile, FileNotFoundError, KeyError):
         return metadata
 
+    if raw_opf is None:
+        return metadata
+
     try:
         root = ET.fromstring(raw_opf)
     except ET.ParseError:
@@ -429,25 +838,160 @@ def _normalize_n8n_response(data: Any) -> dict[str, Any]:
     return {}
 
 
-def call_n8n(payload: dict, config: Config, test_mode: bool = False) -> Optional[dict[str, Any]]:
+def _normalize_n8n_batch_response(data: Any, count: int) -> list[Optional[dict[str, Any]]]:
+    """Map a batch n8n response back to the ``count`` books sent, in send order.
+
+    Accepte une liste d'objets (éventuellement enveloppés dans ``output``) ou un
+    objet contenant cette liste sous ``books`` / ``results`` / ``data``. Chaque
+    objet est rattaché au livre via l'index ``batch_id`` ajouté à l'envoi et
+    renvoyé par le workflow (le nom de fichier ne suffit pas : deux dossiers
+    peuvent contenir un même ``x.epub``) ; ceux qui n'en ont pas sont attribués
+    dans l'ordre aux livres restants. Un livre sans réponse vaut ``None``.
+    """
+    if isinstance(data, dict):
+        for key in ("books", "results", "data"):
+            if isinstance(data.get(key), list):
+                data = data[key]
+                break
+        else:
+            data = [data]
+
+    mapped: list[Optional[dict[str, Any]]] = [None] * count
+    if not isinstance(data, list):
+        return mapped
+
+    untagged: list[dict[str, Any]] = []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+
+        inner = item.get("output") if isinstance(item.get("output"), dict) else item
+        tag = inner.get(BATCH_ID_KEY, item.get(BATCH_ID_KEY))
+        normalized = _normalize_n8n_response(item)
+        normalized.pop("filename", None)
+        normalized.pop(BATCH_ID_KEY, None)
+
+        if isinstance(tag, str) and tag.isdigit():
+            tag = int(tag)
+        if isinstance(tag, int) and not isinstance(tag, bool) and 0 <= tag < count and mapped[tag] is None:
+            mapped[tag] = normalized
+        else:
+            untagged.append(normalized)
+
+    remaining = (position for position in range(count) if mapped[position] is None)
+    for position, normalized in zip(remaining, untagged):
+        mapped[position] = normalized
+
+    return mapped
+
+
+_CLIENTS: dict[tuple[str, ClientSettings], WebhookClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_n8n_client(config: Config, url: Optional[str] = None) -> WebhookClient:
+    """Return the shared client for this webhook URL and settings (créé au premier appel).
+
+    Le client (et donc son pool de connexions et son disjoncteur) est partagé
+    par tous les threads d'un même processus. Une liste d'URL séparées par des
+    virgules donne un `n8n_client.BalancedN8nClient` qui répartit les appels.
+    """
+    key = (url or config.webhook_url, config.client_settings())
+
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            urls = split_urls(key[0])
+            client = BalancedN8nClient(urls, key[1]) if len(urls) > 1 else N8nClient(key[0].strip(), key[1])
+            _CLIENTS[key] = client
+
+    return client
+
+
+def _print_endpoint_stats() -> None:
+    """Print the per-instance summary of the balanced webhook clients used so far."""
+    with _CLIENTS_LOCK:
+        clients = [client for client in _CLIENTS.values() if isinstance(client, BalancedN8nClient)]
+    for client in clients:
+        if any(row.requests for row in client.stats()):
+            print("\n".join(client.format_lines()))
+
+
+_CACHES: dict[Path, ResponseCache] = {}
+_CATALOGUES: dict[Path, Optional[LocalCatalogue]] = {}
+_ISBN_INDEXES: dict[Path, Optional[IsbnIndex]] = {}
+
+
+def get_local_catalogue(config: Config) -> Optional[LocalCatalogue]:
+    """Return the shared local catalogue if a local fast path is enabled and available."""
+    if not config.local_isbn and not config.local_search:
+        return None
+
+    with _CLIENTS_LOCK:
+        if config.catalogue_path not in _CATALOGUES:
+            try:
+                _CATALOGUES[config.catalogue_path] = LocalCatalogue(config.catalogue_path)
+            except Exception as exc:
+                # Un seul avertissement par exécution : les livres passent ensuite par n8n.
+                print(f"Catalogue local indisponible ({config.catalogue_path}) : {exc}")
+                _CATALOGUES[config.catalogue_path] = None
+        return _CATALOGUES[config.catalogue_path]
+
+
+def get_isbn_index(config: Config) -> Optional[IsbnIndex]:
+    """Return the ISBN index written by ``isbn_scan.py --output``, loaded once per process."""
+    if config.isbn_index_path is None:
+        return None
+
+    with _CLIENTS_LOCK:
+        if config.isbn_index_path not in _ISBN_INDEXES:
+            try:
+                _ISBN_INDEXES[config.isbn_index_path] = IsbnIndex.load(config.isbn_index_path)
+            except OSError as exc:
+                print(f"Index d'ISBN indisponible ({config.isbn_index_path}) : {exc}")
+                _ISBN_INDEXES[config.isbn_index_path] = None
+        return _ISBN_INDEXES[config.isbn_index_path]
+
+
+def get_response_cache(config: Config) -> Optional[ResponseCache]:
+    """Return the shared response cache of this configuration (``None`` si désactivé)."""
+    if config.cache_path is None:
+        return None
+
+    with _CLIENTS_LOCK:
+        cache = _CACHES.get(config.cache_path)
+        if cache is None:
+            try:
+                cache = ResponseCache(config.cache_path, config.cache_max_entries, config.cache_ttl)
+            except Exception as exc:
+                print(f"Cache de réponses indisponible ({config.cache_path}) : {exc}")
+                config.cache_path = None
+                return None
+            _CACHES[config.cache_path] = cache
+
+    return cache
+
+
+def call_n8n(
+    payload: dict,
+    config: Config,
+    test_mode: bool = False,
+    console: Optional[ConsoleOutput] = None,
+) -> Optional[dict[str, Any]]:
     """Send data to n8n webhook and return normalized response."""
+    console = console or ConsoleOutput()
+
     try:
-        resp = requests.post(
-            config.webhook_url,
-            json=payload,
-            timeout=config.timeout,
-            verify=config.verify_ssl,
-        )
-        resp.raise_for_status()
+        resp = get_n8n_client(config).post_json(payload)
     except requests.RequestException as exc:
         error_msg = f"Webhook request failed: {exc}"
-        print(f"  [Erreur n8n] {error_msg}")
+        console.print_info(f"[Erreur n8n] {error_msg}")
         raise WebhookError(error_msg) from exc
 
     if test_mode:
-        print(f"  [n8n/test] Statut HTTP : {resp.status_code}")
-        print("  [n8n/test] Réponse brute du webhook :")
-        print(resp.text)
+        console.print_info(f"[n8n/test] Statut HTTP : {resp.status_code}")
+        console.print_info("[n8n/test] Réponse brute du webhook :")
+        console.print_line(resp.text)
         return None
 
     try:
@@ -458,14 +1002,58 @@ def call_n8n(payload: dict, config: Config, test_mode: bool = False) -> Optional
     return _normalize_n8n_response(data)
 
 
+def call_n8n_batch(
+    payloads: list[dict],
+    config: Config,
+    test_mode: bool = False,
+    console: Optional[ConsoleOutput] = None,
+) -> Optional[list[Optional[dict[str, Any]]]]:
+    """Send several payloads in one request to the batch webhook.
+
+    Le corps envoyé est ``{"books": [payload, ...]}``, chaque payload portant
+    son index ``batch_id`` ; la réponse est ramenée à une liste de réponses
+    normalisées dans l'ordre des payloads (voir `_normalize_n8n_batch_response`).
+    n8n traitant les livres d'un lot l'un après l'autre, le délai d'attente vaut
+    ``N8N_BATCH_TIMEOUT`` ou, à défaut, ``N8N_TIMEOUT`` par livre du lot.
+    """
+    console = console or ConsoleOutput()
+    timeout = config.batch_timeout or config.timeout * max(1, len(payloads))
+    books = [{**payload, BATCH_ID_KEY: position} for position, payload in enumerate(payloads)]
+
+    try:
+        resp = get_n8n_client(config, url=config.batch_url).post_json({"books": books}, timeout=timeout)
+    except requests.RequestException as exc:
+        error_msg = f"Batch webhook request failed: {exc}"
+        console.print_info(f"[Erreur n8n] {error_msg}")
+        raise WebhookError(error_msg) from exc
+
+    if test_mode:
+        console.print_info(f"[n8n/test] Statut HTTP : {resp.status_code}")
+        console.print_info("[n8n/test] Réponse brute du webhook batch :")
+        console.print_line(resp.text)
+        return None
+
+    try:
+        data = resp.json()
+    except json.JSONDecodeError:
+        data = None
+
+    return _normalize_n8n_batch_response(data, len(payloads))
+
+
 def log_result(
     config: Config,
     epub_path: Path,
     result: EpubResult,
     metadata: EpubMetadata,
     payload: dict,
+    extra: Optional[dict[str, Any]] = None,
 ) -> None:
-    """Append processing result to log file as JSON line."""
+    """Append processing result to log file as JSON line.
+
+    ``extra`` ajoute des champs au record (ex. ``"cache": "hit"``). Le record
+    est écrit selon le profil de log configuré (voir `result_log.ResultLog`).
+    """
     record = {
         "filename": epub_path.name,
         "path": str(epub_path),
@@ -475,71 +1063,139 @@ def log_result(
         "destination": config.dest_path,
         "metadata": metadata.to_dict(),
         "payload": payload,
+        **(extra or {}),
     }
 
     try:
-        config.log_path.parent.mkdir(parents=True, exist_ok=True)
-        with config.log_path.open("a", encoding="utf-8") as handle:
-            json.dump(record, handle, ensure_ascii=False)
-            handle.write("\n")
+        get_result_log(config).write(record)
     except Exception as exc:
         print(f"  [Log] Impossible d'écrire dans {config.log_path}: {exc}")
 
 
+_LOGS: dict[Path, ResultLog] = {}
+_LOGS_LOCK = threading.Lock()
+
+
+def get_result_log(config: Config) -> ResultLog:
+    """Return the open result log of this configuration (ouvert une fois par processus)."""
+    with _LOGS_LOCK:
+        result_log = _LOGS.get(config.log_path)
+        if result_log is None:
+            result_log = ResultLog(
+                config.log_path,
+                profile=config.log_profile,
+                max_bytes=config.log_max_bytes,
+                fsync_interval=config.log_fsync_interval,
+                blob_gzip=config.log_blob_gzip,
+            )
+            _LOGS[config.log_path] = result_log
+    return result_log
+
+
+@atexit.register
+def close_result_logs() -> None:
+    """Flush and close every open result log."""
+    with _LOGS_LOCK:
+        for result_log in _LOGS.values():
+            try:
+                result_log.close()
+            except Exception as exc:
+                print(f"  [Log] Fermeture impossible de {result_log.path}: {exc}")
+
+
 class ConsoleOutput:
-    """Helper for consistent console output."""
+    """Helper for consistent console output.
 
-    @staticmethod
-    def print_processing(epub_path: Path, index: int, total: int | None) -> None:
+    En mode ``buffered``, les lignes sont conservées jusqu'à `flush` : cela permet
+    de traiter plusieurs livres en parallèle tout en affichant leurs sorties
+    dans l'ordre.
+    """
+
+    def __init__(self, buffered: bool = False) -> None:
+        self._lines: Optional[list[str]] = [] if buffered else None
+
+    def print_line(self, line: str) -> None:
+        if self._lines is None:
+            print(line)
+        else:
+            self._lines.append(line)
+
+    def flush(self) -> None:
+        if self._lines:
+            print("\n".join(self._lines))
+            self._lines.clear()
+
+    def print_processing(self, epub_path: Path, index: int, total: int | None) -> None:
         if total is None:
-            print(f"[{index}]")
+            self.print_line(f"[{index}]")
         else:
-            print(f"[{index}/{total}]")
-        print(f"Traitement de : {epub_path}")
+            self.print_line(f"[{index}/{total}]")
+        self.print_line(f"Traitement de : {epub_path}")
 
-    @staticmethod
-    def print_result(result: EpubResult) -> None:
-        print(f"  Titre       : {result.titre}")
-        print(f"  Auteur      : {result.auteur}")
+    def print_result(self, result: EpubResult) -> None:
+        self.print_line(f"  Titre       : {result.titre}")
+        self.print_line(f"  Auteur      : {result.auteur}")
         if result.explication:
-            print(f"  Explication : {result.explication}")
+            self.print_line(f"  Explication : {result.explication}")
 
-    @staticmethod
-    def print_info(message: str) -> None:
-        print(f"  {message}")
+    def print_info(self, message: str) -> None:
+        self.print_line(f"  {message}")
 
 
-def process_epub(
-    epub_path: Path,
-    config: Config,
-    test_mode: bool = False,
-) -> None:
-    """Process a single EPUB file: extract, call n8n, and log the result."""
-    console = ConsoleOutput()
+@dataclass
+class PreparedEpub:
+    """Extraction output for one EPUB, ready to be sent to n8n.
 
-    text = extract_text_from_epub(epub_path)
-    if not text:
-        console.print_info("Aucun texte utile extrait, passage au fichier suivant.")
-        return
+    ``timings`` contient la durée (secondes) de chaque étape déjà exécutée
+    pour ce livre (voir `timings`) ; l'envoi et l'écriture du log la complètent.
+    """
 
-    metadata = extract_metadata_from_epub(epub_path)
-    raw_pages = extract_raw_pages_from_epub(epub_path, max_pages=5)
-
-    # 1) Chercher l'ISBN dans les métadonnées
-    metadata_strings = [
-        metadata.title,
-        metadata.creator,
-        metadata.publisher,
-        metadata.language,
-        metadata.identifier,
-        metadata.description,
-    ]
-    isbn = _find_first_isbn(metadata_strings)
+    epub_path: Path
+    metadata: EpubMetadata
+    isbn: str
+    payload: dict[str, Any]
+    cache_key: str = ""
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+def prepare_epub(epub_path: Path, config: Config) -> Optional[PreparedEpub]:
+    """Extract text, raw pages, OPF metadata and ISBN; ``None`` if no useful text."""
+    timings: dict[str, float] = {}
+    try:
+        with timed(timings, STAGE_ZIP_OPEN):
+            archive = EpubArchive(epub_path)
+    except (zipfile.BadZipFile, FileNotFoundError):
+        return None
 
-    # 2) Si aucun ISBN trouvé, scanner le texte complet
-    if isbn is None:
-        full_text = _extract_full_text(epub_path)
-        isbn = _find_first_isbn([full_text])
+    with archive:
+        with timed(timings, STAGE_TEXT):
+            text = extract_text_from_epub(archive)
+        if not text:
+            return None
+
+        with timed(timings, STAGE_OPF):
+            metadata = extract_metadata_from_epub(archive)
+        with timed(timings, STAGE_RAW_PAGES):
+            raw_pages = extract_raw_pages_from_epub(archive, max_pages=5)
+
+        # 1) Chercher l'ISBN dans les métadonnées
+        metadata_strings = [
+            metadata.title,
+            metadata.creator,
+            metadata.publisher,
+            metadata.language,
+            metadata.identifier,
+            metadata.description,
+        ]
+        isbn = _find_first_isbn(metadata_strings)
+
+        # 2) Si aucun ISBN trouvé, reprendre le résultat d'isbn_scan s'il existe,
+        #    sinon scanner le texte (arrêt au premier ISBN valide)
+        if isbn is None:
+            with timed(timings, STAGE_ISBN_SCAN):
+                index = get_isbn_index(config)
+                known = index.text_isbn(epub_path) if index is not None else None
+                isbn = (known or None) if known is not None else find_isbn_in_text(archive)
 
     payload = {
         "filename": epub_path.name,
@@ -551,17 +1207,257 @@ def process_epub(
         "metadata": metadata.to_dict(),
     }
 
+    return PreparedEpub(
+        epub_path=epub_path,
+        metadata=metadata,
+        isbn=isbn or "",
+        payload=payload,
+        cache_key=identification_key(isbn or "", metadata.title, metadata.creator, text),
+        timings=timings,
+    )
+
+
+def dispatch_epub(
+    prepared: PreparedEpub,
+    config: Config,
+    test_mode: bool = False,
+    console: Optional[ConsoleOutput] = None,
+) -> ProcessOutcome:
+    """Send a prepared EPUB to n8n and build the outcome (sans écrire le log).
+
+    Le webhook n'est pas appelé si l'ISBN est résolu sans ambiguïté par le
+    catalogue local (``config.local_isbn``) ou si le cache de réponses contient
+    déjà ce livre (même clé d'identification).
+    """
+    console = console or ConsoleOutput()
+
+    local = None if test_mode else _catalogue_outcome(get_local_catalogue(config), prepared, console, config)
+    if local is not None:
+        return local
+
+    cache = None if test_mode else get_response_cache(config)
+    cached = _cached_outcome(cache, prepared, console)
+    if cached is not None:
+        return cached
+
     try:
-        response = call_n8n(payload, config, test_mode=test_mode)
-    except WebhookError:
-        return
+        with timed(prepared.timings, STAGE_WEBHOOK):
+            response = call_n8n(prepared.payload, config, test_mode=test_mode, console=console)
+    except WebhookError as exc:
+        return ProcessOutcome(status=STATUS_FAILED, isbn=prepared.isbn, error=str(exc), prepared=prepared)
+
+    return _outcome_from_response(prepared, response, test_mode, console, cache)
+
+
+def dispatch_epub_batch(
+    prepared_books: list[PreparedEpub],
+    config: Config,
+    test_mode: bool = False,
+    consoles: Optional[list[ConsoleOutput]] = None,
+) -> list[ProcessOutcome]:
+    """Send several prepared EPUBs in one batch request; one outcome per book, same order."""
+    consoles = consoles or [ConsoleOutput() for _ in prepared_books]
+    cache = None if test_mode else get_response_cache(config)
+    catalogue = None if test_mode else get_local_catalogue(config)
+
+    outcomes: list[Optional[ProcessOutcome]] = [
+        _catalogue_outcome(catalogue, prepared, console, config) or _cached_outcome(cache, prepared, console)
+        for prepared, console in zip(prepared_books, consoles)
+    ]
+    to_send = [position for position, outcome in enumerate(outcomes) if outcome is None]
+    if not to_send:
+        return [outcome for outcome in outcomes if outcome is not None]
+
+    batch_timings: dict[str, float] = {}
+    try:
+        with timed(batch_timings, STAGE_WEBHOOK):
+            responses = call_n8n_batch(
+                [prepared_books[position].payload for position in to_send],
+                config,
+                test_mode=test_mode,
+                console=consoles[to_send[0]],
+            )
+    except WebhookError as exc:
+        for position in to_send:
+            prepared = prepared_books[position]
+            outcomes[position] = ProcessOutcome(
+                status=STATUS_FAILED, isbn=prepared.isbn, error=str(exc), prepared=prepared
+            )
+    else:
+        for sent, position in enumerate(to_send):
+            prepared = prepared_books[position]
+            response = responses[sent] if responses is not None else None
+            outcomes[position] = _outcome_from_response(prepared, response, test_mode, consoles[position], cache)
+
+    # Chaque livre envoyé se voit attribuer la latence de la requête batch entière.
+    for position in to_send:
+        prepared_books[position].timings.update(batch_timings)
+
+    return [outcome for outcome in outcomes if outcome is not None]
+
+
+def _catalogue_outcome(
+    catalogue: Optional[LocalCatalogue],
+    prepared: PreparedEpub,
+    console: ConsoleOutput,
+    config: Config,
+) -> Optional[ProcessOutcome]:
+    """Outcome built from the local catalogue, or ``None`` if n8n must decide.
 
+    - ``config.local_isbn`` : l'ISBN est résolu s'il est sans ambiguïté ;
+    - ``config.local_search`` : sinon, recherche approchée du titre/auteur OPF
+      (ou du nom de fichier), retenue seulement si elle est quasi certaine.
+    """
+    if catalogue is None:
+        return None
+
+    response: Optional[dict[str, Any]] = None
+    try:
+        with timed(prepared.timings, STAGE_CATALOGUE):
+            if config.local_isbn and prepared.isbn:
+                entry = catalogue.resolve_isbn(prepared.isbn)
+                if entry is not None:
+                    response = {
+                        "titre": entry.title,
+                        "auteur": entry.author,
+                        "explication": f"ISBN {prepared.isbn} trouvé dans le catalogue local ({entry.edition_key}).",
+                        "source": "openlibrary",
+                    }
+
+            if response is None and config.local_search:
+                metadata = prepared.metadata
+                candidate = catalogue.resolve_title(metadata.title, metadata.creator, filename=prepared.epub_path.name)
+                if candidate is not None:
+                    origin = "titre OPF" if metadata.title else "nom de fichier"
+                    response = {
+                        "titre": candidate.title,
+                        "auteur": candidate.author,
+                        "explication": (
+                            f"Correspondance {candidate.score:.2f} ({origin}) "
+                            f"dans le catalogue local ({candidate.work_key})."
+                        ),
+                        "source": "openlibrary",
+                    }
+    except Exception as exc:
+        console.print_info(f"[Catalogue] Recherche impossible : {exc}")
+        return None
+
+    if response is None:
+        return None
+
+    console.print_info("[Catalogue] Livre résolu localement, webhook non appelé.")
+    result = EpubResult.from_dict(response)
+    console.print_result(result)
+
+    return ProcessOutcome(
+        status=STATUS_DONE,
+        isbn=prepared.isbn,
+        result=result,
+        response=response,
+        prepared=prepared,
+        resolved_by="catalogue",
+    )
+
+
+def _cached_outcome(
+    cache: Optional[ResponseCache],
+    prepared: PreparedEpub,
+    console: ConsoleOutput,
+) -> Optional[ProcessOutcome]:
+    """Outcome built from the response cache, or ``None`` on a miss."""
+    if cache is None or not prepared.cache_key:
+        return None
+
+    try:
+        with timed(prepared.timings, STAGE_CACHE):
+            response = cache.get(prepared.cache_key)
+    except Exception as exc:
+        console.print_info(f"[Cache] Lecture impossible : {exc}")
+        return None
+
+    if response is None:
+        return None
+
+    console.print_info("[Cache] Réponse déjà connue pour ce livre, webhook non appelé.")
+    result = EpubResult.from_dict(response)
+    console.print_result(result)
+
+    return ProcessOutcome(
+        status=STATUS_DONE,
+        isbn=prepared.isbn,
+        result=result,
+        response=response,
+        prepared=prepared,
+        cache_hit=True,
+    )
+
+
+def _outcome_from_response(
+    prepared: PreparedEpub,
+    response: Optional[dict[str, Any]],
+    test_mode: bool,
+    console: ConsoleOutput,
+    cache: Optional[ResponseCache] = None,
+) -> ProcessOutcome:
     if test_mode or response is None:
-        return
+        return ProcessOutcome(
+            status=STATUS_FAILED,
+            isbn=prepared.isbn,
+            error="Réponse n8n non exploitable",
+            prepared=prepared,
+        )
 
     result = EpubResult.from_dict(response)
     console.print_result(result)
-    log_result(config, epub_path, result, metadata, payload)
+
+    # Les réponses sans titre ni auteur ne sont pas mises en cache (nouvel essai possible).
+    if cache is not None and prepared.cache_key and (result.titre != "inconnu" or result.auteur != "inconnu"):
+        try:
+            cache.put(prepared.cache_key, response)
+        except Exception as exc:
+            console.print_info(f"[Cache] Écriture impossible : {exc}")
+
+    return ProcessOutcome(
+        status=STATUS_DONE,
+        isbn=prepared.isbn,
+        result=result,
+        response=response,
+        prepared=prepared,
+    )
+
+
+def process_epub(
+    epub_path: Path,
+    config: Config,
+    test_mode: bool = False,
+    console: Optional[ConsoleOutput] = None,
+    log: bool = True,
+    profiler: Optional[cProfile.Profile] = None,
+) -> ProcessOutcome:
+    """Process a single EPUB file: extract, call n8n, and log the result.
+
+    Avec ``log=False``, l'écriture du log est laissée à l'appelant (voir `finish_epub`).
+    Avec ``profiler``, seule l'extraction (`prepare_epub`) est profilée.
+    """
+    console = console or ConsoleOutput()
+
+    if profiler is not None:
+        prepared = profiler.runcall(prepare_epub, epub_path, config)
+    else:
+        prepared = prepare_epub(epub_path, config)
+    if prepared is None:
+        console.print_info("Aucun texte utile extrait, passage au fichier suivant.")
+        return ProcessOutcome(status=STATUS_EMPTY)
+
+    outcome = dispatch_epub(prepared, config, test_mode=test_mode, console=console)
+
+    if log and outcome.status == STATUS_DONE and outcome.result is not None:
+        log_result(config, epub_path, outcome.result, prepared.metadata, prepared.payload)
+
+    return outcome
+
+
+FinishCallback = Callable[[Path, ProcessOutcome, Optional[os.stat_result]], None]
 
 
 def process_folder(
@@ -569,29 +1465,604 @@ def process_folder(
     config: Config,
     limit: int | None = None,
     test_mode: bool = False,
+    force: bool = False,
+    concurrency: int = 1,
+    pipeline: bool = False,
+    extract_workers: int = 0,
+    stats_interval: float = 0.0,
+    batch_size: int | None = None,
+    dedupe: bool = False,
+    skip_logged: bool = False,
+    profile_path: Optional[Path] = None,
+    stop: Optional[threading.Event] = None,
 ) -> None:
-    """Recursively process all EPUB files in a folder."""
-    console = ConsoleOutput()
+    """Recursively process all EPUB files in a folder.
+
+    Si un manifeste est configuré (hors mode test), les livres déjà traités et
+    inchangés sont ignorés, et ``limit`` compte uniquement les livres effectivement
+    traités. ``force`` retraite tout en continuant à mettre le manifeste à jour.
+
+    Avec ``concurrency > 1``, jusqu'à ``concurrency`` livres sont extraits et
+    envoyés à n8n en parallèle ; l'affichage, le log JSONL et le manifeste sont
+    toujours écrits depuis le thread principal, dans l'ordre de parcours.
+
+    Avec ``pipeline``, l'extraction tourne dans un pool de ``extract_workers``
+    processus, les appels webhook dans ``concurrency`` threads et l'écriture
+    dans un thread dédié (voir `pipeline.StagedPipeline`).
 
+    Avec ``batch_size > 1`` (défaut : ``config.batch_size``), les livres sont
+    envoyés par lots au webhook batch (``concurrency`` lots en parallèle).
+
+    Avec ``dedupe``, les copies identiques (même taille puis même SHA-256) ne
+    sont traitées qu'une fois : le résultat de l'original est reporté sur
+    chaque copie (log JSONL et manifeste).
+
+    Avec ``skip_logged``, les livres ayant déjà un résultat dans le log JSONL
+    (d'après l'index `result_index.ResultIndex`, mis à jour au préalable) sont
+    ignorés, même sans manifeste.
+
+    Les durées par étape de chaque livre sont agrégées (`timings.TimingStats`)
+    et résumées en fin d'exécution. Avec ``profile_path``, l'extraction est
+    profilée avec cProfile (traitement séquentiel forcé) et les statistiques
+    sont écrites dans ce fichier.
+
+    Dès que ``stop`` est positionné (SIGTERM en mode ``--watch``), plus aucun
+    livre n'est lancé : ceux déjà en cours sont terminés et écrits, puis les
+    logs et le manifeste sont fermés normalement.
+    """
     if not folder.exists():
         print(f"Dossier introuvable : {folder}")
         return
 
+    manifest: Optional[Manifest] = None
+    if config.manifest_path is not None and not test_mode:
+        try:
+            manifest = Manifest(config.manifest_path, use_hash=config.manifest_hash)
+        except Exception as exc:
+            print(f"Manifeste indisponible ({config.manifest_path}) : {exc}")
+
+    logged: Optional[ResultIndex] = None
+    if skip_logged and config.result_index_path is not None:
+        try:
+            close_result_logs()
+            logged = ResultIndex(config.result_index_path)
+            print(f"Index des résultats : {logged.ingest(config.log_path).describe()}")
+        except Exception as exc:
+            print(f"Index des résultats indisponible ({config.result_index_path}) : {exc}")
+            logged = None
+
+    skipped: list[Path] = []
+    books: Iterable[tuple[Path, Optional[os.stat_result]]] = _iter_books_to_process(
+        folder, manifest, force, skipped, logged, config.list_threads, config.shard
+    )
+    copies: dict[Path, list[tuple[Path, Optional[os.stat_result]]]] = {}
+    if dedupe:
+        books = _dedupe_books(books, copies)
+    if limit is not None:
+        books = islice(books, max(limit, 0))
+    if stop is not None:
+        books = _until_stopped(books, stop)
+
+    timing_stats = TimingStats()
+
+    def finish(epub_file: Path, outcome: ProcessOutcome, stat_result: Optional[os.stat_result]) -> None:
+        finish_epub(config, epub_file, outcome, manifest, stat_result)
+        if outcome.prepared is not None:
+            timing_stats.add(outcome.prepared.timings)
+        for copy_path, copy_stat in copies.get(epub_file, ()):
+            print(f"  [Doublon] Résultat reporté sur : {copy_path}")
+            finish_epub(config, copy_path, outcome, manifest, copy_stat, duplicate_of=epub_file)
+
     index = 0
+    batch_size = config.batch_size if batch_size is None else batch_size
 
-    try:
-        for epub_file in folder.rglob("*.epub"):
-            index += 1
-            console.print_processing(epub_file, index, None)
-            process_epub(epub_file, config, test_mode=test_mode)
+    profiler: Optional[cProfile.Profile] = None
+    if profile_path is not None:
+        if pipeline or concurrency > 1 or batch_size > 1:
+            print("Profilage : traitement séquentiel forcé (--pipeline, --concurrency et --batch-size ignorés).")
+        pipeline, concurrency, batch_size = False, 1, 1
+        profiler = cProfile.Profile()
 
-            if limit is not None and index >= limit:
-                break
+    try:
+        if batch_size > 1 and not pipeline:
+            index = _process_books_batched(books, config, finish, test_mode, batch_size, concurrency)
+        elif pipeline:
+            index = _process_books_pipeline(
+                books, config, finish, test_mode, concurrency, extract_workers, stats_interval
+            )
+        elif concurrency > 1:
+            index = _process_books_concurrently(books, config, finish, test_mode, concurrency)
+        else:
+            index = _process_books_sequentially(books, config, finish, test_mode, profiler)
     except OSError as exc:
         print(f"Erreur lors du parcours du dossier {folder}: {exc}")
-
-    if index == 0:
+    finally:
+        close_result_logs()
+        if manifest is not None:
+            manifest.close()
+        if logged is not None:
+            logged.close()
+
+    if stop is not None and stop.is_set():
+        print(f"Arrêt demandé : traitement interrompu après {index} livre(s).")
+    elif index == 0 and not skipped:
         print("Aucun fichier .epub trouvé dans ce dossier.")
+    elif skipped:
+        print(f"{index} livre(s) traité(s), {len(skipped)} déjà traité(s) et inchangé(s) ignoré(s).")
+
+    cache = _CACHES.get(config.cache_path) if config.cache_path is not None else None
+    if cache is not None and cache.hits:
+        print(f"Cache de réponses : {cache.hits} réponse(s) réutilisée(s), {cache.misses} appel(s) webhook.")
+
+    if timing_stats:
+        print("\n".join(timing_stats.format_lines()))
+
+    _print_endpoint_stats()
+
+    if profiler is not None and profile_path is not None:
+        _dump_profile(profiler, profile_path)
+
+
+def watch_folder(
+    folder: Path,
+    config: Config,
+    test_mode: bool = False,
+    concurrency: int = 1,
+    batch_size: int | None = None,
+    settle: float = DEFAULT_SETTLE_SECONDS,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    polling: bool = False,
+    stop: Optional[threading.Event] = None,
+    catch_up: Optional[Callable[[], None]] = None,
+) -> None:
+    """Keep processing the EPUB files dropped into ``folder`` until interrupted (mode ``--watch``).
+
+    La surveillance (voir `watch.FolderWatcher`) démarre avant ``catch_up``
+    (rattrapage des livres déjà présents, en général `process_folder`) : rien
+    de ce qui arrive pendant le rattrapage n'est perdu. Les livres stables sont
+    ensuite traités par petits lots, sans parcourir la bibliothèque, avec le
+    même client HTTP et le même pool de threads pendant toute la surveillance ;
+    le manifeste écarte les livres déjà traités et inchangés.
+    """
+    if not folder.exists():
+        print(f"Dossier introuvable : {folder}")
+        return
+
+    watcher = FolderWatcher(folder, settle, poll_interval, config.list_threads, use_inotify=not polling)
+    manifest: Optional[Manifest] = None
+    batch_size = config.batch_size if batch_size is None else batch_size
+
+    def finish(epub_file: Path, outcome: ProcessOutcome, stat_result: Optional[os.stat_result]) -> None:
+        finish_epub(config, epub_file, outcome, manifest, stat_result)
+
+    try:
+        if catch_up is not None:
+            catch_up()
+        if stop is not None and stop.is_set():
+            return
+
+        if config.manifest_path is not None and not test_mode:
+            try:
+                manifest = Manifest(config.manifest_path, use_hash=config.manifest_hash)
+            except Exception as exc:
+                print(f"Manifeste indisponible ({config.manifest_path}) : {exc}")
+
+        shard_note = f", part {config.shard}" if config.shard is not None else ""
+        print(
+            f"Surveillance de {folder} ({watcher.backend}{shard_note}) : "
+            "en attente de nouveaux fichiers (Ctrl+C pour arrêter)."
+        )
+        processed = 0
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            for ready in watcher.changes(stop):
+                books: list[tuple[Path, Optional[os.stat_result]]] = [
+                    (epub_file, stat_result)
+                    for epub_file, stat_result in ready
+                    if (config.shard is None or config.shard.contains(epub_file, folder))
+                    and (
+                        manifest is None
+                        or not manifest.is_finished(epub_file, stat_result.st_size, stat_result.st_mtime_ns)
+                    )
+                ]
+                if not books:
+                    continue
+
+                if batch_size > 1:
+                    _process_books_batched(books, config, finish, test_mode, batch_size, concurrency, executor)
+                elif concurrency > 1:
+                    _process_books_concurrently(books, config, finish, test_mode, concurrency, executor)
+                else:
+                    _process_books_sequentially(books, config, finish, test_mode)
+
+                get_result_log(config).flush()
+                processed += len(books)
+                print(f"{len(books)} livre(s) traité(s), {processed} depuis le démarrage de la surveillance.")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        close_result_logs()
+        if manifest is not None:
+            manifest.close()
+    _print_endpoint_stats()
+    print("Surveillance arrêtée.")
+
+
+def _dump_profile(profiler: cProfile.Profile, profile_path: Path) -> None:
+    """Write the cProfile statistics of the extraction and print the costliest functions."""
+    try:
+        profile_path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(profile_path))
+    except OSError as exc:
+        print(f"Profil non écrit ({profile_path}) : {exc}")
+        return
+
+    print(f"Profil de l'extraction écrit dans {profile_path} (lecture : python -m pstats {profile_path})")
+    pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+
+
+def _iter_books_to_process(
+    folder: Path,
+    manifest: Optional[Manifest],
+    force: bool,
+    skipped: list[Path],
+    logged: Optional[ResultIndex] = None,
+    list_threads: int = DEFAULT_LIST_THREADS,
+    shard: Optional[Shard] = None,
+) -> Iterator[tuple[Path, Optional[os.stat_result]]]:
+    """Yield EPUB files that still need processing, with their stat, as the folder is walked.
+
+    Les livres ignorés (terminés et inchangés, ou déjà présents dans l'index
+    des résultats ``logged``) sont ajoutés à ``skipped`` ; avec ``shard``, les
+    livres des autres parts sont écartés sans être comptés.
+    """
+    for epub_file, stat_result in walk_epubs(folder, list_threads, on_error=_report_walk_error):
+        if shard is not None and not shard.contains(epub_file, folder):
+            continue
+
+        if logged is not None and not force and logged.has_result(epub_file):
+            skipped.append(epub_file)
+            continue
+
+        if (
+            manifest is not None
+            and not force
+            and manifest.is_finished(epub_file, stat_result.st_size, stat_result.st_mtime_ns)
+        ):
+            skipped.append(epub_file)
+            continue
+
+        yield epub_file, stat_result
+
+
+def _report_walk_error(exc: OSError) -> None:
+    print(f"Dossier illisible ignoré : {exc}")
+
+
+def _until_stopped(
+    books: Iterable[tuple[Path, Optional[os.stat_result]]],
+    stop: threading.Event,
+) -> Iterator[tuple[Path, Optional[os.stat_result]]]:
+    """Yield ``books`` until ``stop`` is set; checked before each book is handed out."""
+    for book in books:
+        if stop.is_set():
+            return
+        yield book
+
+
+def _dedupe_books(
+    books: Iterable[tuple[Path, Optional[os.stat_result]]],
+    copies: dict[Path, list[tuple[Path, Optional[os.stat_result]]]],
+) -> Iterator[tuple[Path, Optional[os.stat_result]]]:
+    """Yield only the first file of every group of identical files.
+
+    Le parcours complet est nécessaire pour regrouper les fichiers ; les copies
+    de chaque original sont ajoutées à ``copies`` (clé = chemin de l'original).
+    """
+    stats: dict[Path, Optional[os.stat_result]] = {}
+    for epub_file, stat_result in books:
+        if stat_result is None:
+            try:
+                stat_result = epub_file.stat()
+            except OSError:
+                stat_result = None
+        stats[epub_file] = stat_result
+
+    groups: list[DuplicateGroup] = find_duplicates(
+        ((path, stat_result.st_size) for path, stat_result in stats.items() if stat_result is not None),
+        report=print,
+    )
+    redundant: set[Path] = set()
+    for group in groups:
+        copies[group.original] = [(path, stats[path]) for path in group.copies]
+        redundant.update(group.copies)
+
+    if groups:
+        print(f"Doublons : {describe_groups(groups)}.")
+
+    for epub_file, stat_result in stats.items():
+        if epub_file not in redundant:
+            yield epub_file, stat_result
+
+
+def _process_books_sequentially(
+    books: Iterable[tuple[Path, Optional[os.stat_result]]],
+    config: Config,
+    finish: FinishCallback,
+    test_mode: bool,
+    profiler: Optional[cProfile.Profile] = None,
+) -> int:
+    """Run `process_epub` on each book in turn; return the number of books."""
+    index = 0
+    console = ConsoleOutput()
+    for index, (epub_file, stat_result) in enumerate(books, start=1):
+        console.print_processing(epub_file, index, None)
+        outcome = process_epub(epub_file, config, test_mode=test_mode, console=console, log=False, profiler=profiler)
+        finish(epub_file, outcome, stat_result)
+    return index
+
+
+def _thread_pool(executor: Optional[ThreadPoolExecutor], workers: int) -> ContextManager[ThreadPoolExecutor]:
+    """Reuse ``executor`` (laissé ouvert) or create a pool shut down at the end of the block."""
+    if executor is not None:
+        return nullcontext(executor)
+    return ThreadPoolExecutor(max_workers=max(1, workers))
+
+
+def _process_books_concurrently(
+    books: Iterable[tuple[Path, Optional[os.stat_result]]],
+    config: Config,
+    finish: FinishCallback,
+    test_mode: bool,
+    concurrency: int,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> int:
+    """Run `process_epub` on a thread pool, writing results in walk order."""
+    index = 0
+    # Livres soumis dont la sortie n'a pas encore été écrite (ordre de parcours).
+    pending: deque[tuple[Future[ProcessOutcome], ConsoleOutput, Path, Optional[os.stat_result]]] = deque()
+    window = concurrency * PENDING_WINDOW_FACTOR
+
+    with _thread_pool(executor, concurrency) as executor:
+        try:
+            for index, (epub_file, stat_result) in enumerate(books, start=1):
+                book_console = ConsoleOutput(buffered=True)
+                book_console.print_processing(epub_file, index, None)
+                future = executor.submit(
+                    process_epub, epub_file, config, test_mode=test_mode, console=book_console, log=False
+                )
+                pending.append((future, book_console, epub_file, stat_result))
+                _drain_pending(pending, finish, block=len(pending) >= window)
+        finally:
+            while pending:
+                _drain_pending(pending, finish, block=True)
+
+    return index
+
+
+def _process_batch(
+    batch: list[tuple[Path, Optional[os.stat_result], int]],
+    config: Config,
+    test_mode: bool,
+) -> list[tuple[ConsoleOutput, ProcessOutcome]]:
+    """Extract every book of a batch, then send the non-empty ones in one request."""
+    consoles: list[ConsoleOutput] = []
+    outcomes: list[Optional[ProcessOutcome]] = []
+    to_send: list[tuple[int, PreparedEpub]] = []
+
+    for epub_file, _, index in batch:
+        book_console = ConsoleOutput(buffered=True)
+        book_console.print_processing(epub_file, index, None)
+        consoles.append(book_console)
+
+        prepared = prepare_epub(epub_file, config)
+        if prepared is None:
+            book_console.print_info("Aucun texte utile extrait, passage au fichier suivant.")
+            outcomes.append(ProcessOutcome(status=STATUS_EMPTY))
+        else:
+            to_send.append((len(outcomes), prepared))
+            outcomes.append(None)
+
+    sent = dispatch_epub_batch(
+        [prepared for _, prepared in to_send],
+        config,
+        test_mode=test_mode,
+        consoles=[consoles[position] for position, _ in to_send],
+    )
+    for (position, _), outcome in zip(to_send, sent):
+        outcomes[position] = outcome
+
+    return [(book_console, outcome) for book_console, outcome in zip(consoles, outcomes) if outcome is not None]
+
+
+def _process_books_batched(
+    books: Iterable[tuple[Path, Optional[os.stat_result]]],
+    config: Config,
+    finish: FinishCallback,
+    test_mode: bool,
+    batch_size: int,
+    concurrency: int,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> int:
+    """Send books by batches of ``batch_size`` (``concurrency`` batches in flight), writing in walk order."""
+    index = 0
+    pending: deque[tuple[Future[list[tuple[ConsoleOutput, ProcessOutcome]]], list]] = deque()
+    window = max(1, concurrency) * 2
+
+    def drain(block: bool) -> None:
+        while pending and (block or pending[0][0].done()):
+            future, batch = pending.popleft()
+            try:
+                results = future.result()
+            except Exception as exc:
+                results = []
+                for epub_file, _, book_index in batch:
+                    book_console = ConsoleOutput(buffered=True)
+                    book_console.print_processing(epub_file, book_index, None)
+                    book_console.print_info(f"[Erreur] {exc}")
+                    results.append((book_console, ProcessOutcome(status=STATUS_FAILED, error=str(exc))))
+
+            for (epub_file, stat_result, _), (book_console, outcome) in zip(batch, results):
+                book_console.flush()
+                finish(epub_file, outcome, stat_result)
+            block = False
+
+    numbered = ((epub_file, stat_result, n) for n, (epub_file, stat_result) in enumerate(books, start=1))
+
+    with _thread_pool(executor, concurrency) as executor:
+        try:
+            while True:
+                batch = list(islice(numbered, batch_size))
+                if not batch:
+                    break
+                index = batch[-1][2]
+                pending.append((executor.submit(_process_batch, batch, config, test_mode), batch))
+                drain(block=len(pending) >= window)
+        finally:
+            while pending:
+                drain(block=True)
+
+    return index
+
+
+def _prepare_book(book: tuple[Path, Optional[os.stat_result], int], config: Config) -> Optional[PreparedEpub]:
+    """Extraction stage of the pipeline (exécutée dans un processus du pool)."""
+    return prepare_epub(book[0], config)
+
+
+def _process_books_pipeline(
+    books: Iterable[tuple[Path, Optional[os.stat_result]]],
+    config: Config,
+    finish: FinishCallback,
+    test_mode: bool,
+    io_workers: int,
+    extract_workers: int,
+    stats_interval: float,
+) -> int:
+    """Run books through the extract / webhook / write pipeline; return the number submitted."""
+
+    def dispatch(
+        book: tuple[Path, Optional[os.stat_result], int],
+        prepared: Optional[PreparedEpub],
+    ) -> tuple[ConsoleOutput, ProcessOutcome]:
+        epub_file, _, index = book
+        book_console = ConsoleOutput(buffered=True)
+        book_console.print_processing(epub_file, index, None)
+
+        if prepared is None:
+            book_console.print_info("Aucun texte utile extrait, passage au fichier suivant.")
+            return book_console, ProcessOutcome(status=STATUS_EMPTY)
+
+        return book_console, dispatch_epub(prepared, config, test_mode=test_mode, console=book_console)
+
+    def write(
+        book: tuple[Path, Optional[os.stat_result], int],
+        result: Optional[tuple[ConsoleOutput, ProcessOutcome]],
+        error: Optional[BaseException],
+    ) -> None:
+        epub_file, stat_result, index = book
+
+        if result is None:
+            book_console = ConsoleOutput(buffered=True)
+            book_console.print_processing(epub_file, index, None)
+            book_console.print_info(f"[Erreur] {error}")
+            outcome = ProcessOutcome(status=STATUS_FAILED, error=str(error))
+        else:
+            book_console, outcome = result
+
+        book_console.flush()
+        finish(epub_file, outcome, stat_result)
+
+    staged = StagedPipeline(
+        extract_fn=partial(_prepare_book, config=config),
+        io_fn=dispatch,
+        write_fn=write,
+        extract_workers=extract_workers or os.cpu_count() or 1,
+        io_workers=io_workers,
+        stats_interval=stats_interval,
+    )
+    numbered = ((epub_file, stat_result, index) for index, (epub_file, stat_result) in enumerate(books, start=1))
+    stats = staged.run(numbered)
+    print(stats.describe())
+
+    return stats.submitted
+
+
+def _drain_pending(
+    pending: deque[tuple[Future[ProcessOutcome], ConsoleOutput, Path, Optional[os.stat_result]]],
+    finish: FinishCallback,
+    block: bool,
+) -> None:
+    """Write out finished books at the head of the queue, in submission order.
+
+    Avec ``block``, attend au moins le premier livre de la file (fenêtre pleine).
+    """
+    while pending and (block or pending[0][0].done()):
+        future, book_console, epub_path, stat_result = pending.popleft()
+        try:
+            outcome = future.result()
+        except Exception as exc:
+            book_console.print_info(f"[Erreur] {exc}")
+            outcome = ProcessOutcome(status=STATUS_FAILED, error=str(exc))
+
+        book_console.flush()
+        finish(epub_path, outcome, stat_result)
+        block = False
+
+
+def finish_epub(
+    config: Config,
+    epub_path: Path,
+    outcome: ProcessOutcome,
+    manifest: Optional[Manifest] = None,
+    stat_result: Optional[os.stat_result] = None,
+    duplicate_of: Optional[Path] = None,
+) -> None:
+    """Log a successful outcome and record it in the manifest.
+
+    ``duplicate_of`` indique que ``outcome`` est celui d'une copie identique
+    (mode ``--dedupe``) ; le chemin de l'original est ajouté au log. Les durées
+    des étapes du livre sont écrites dans le record (``timings_ms``, sauf pour
+    les copies) ; celle de l'écriture du log est ajoutée ensuite à
+    ``outcome.prepared.timings`` pour le résumé de fin d'exécution.
+    """
+    if outcome.status == STATUS_DONE and outcome.result is not None and outcome.prepared is not None:
+        prepared = outcome.prepared
+        extra: dict[str, Any] = {"cache": "hit" if outcome.cache_hit else "miss"}
+        if outcome.resolved_by != "n8n":
+            extra["resolved_by"] = outcome.resolved_by
+        if duplicate_of is not None:
+            extra["duplicate_of"] = str(duplicate_of)
+        elif prepared.timings:
+            extra["timings_ms"] = to_milliseconds(prepared.timings)
+
+        with timed(prepared.timings, STAGE_LOG_WRITE):
+            log_result(config, epub_path, outcome.result, prepared.metadata, prepared.payload, extra=extra)
+
+    if manifest is not None and stat_result is not None:
+        _record_outcome(manifest, epub_path, stat_result, outcome)
+
+
+def _record_outcome(
+    manifest: Manifest,
+    epub_path: Path,
+    stat_result: os.stat_result,
+    outcome: ProcessOutcome,
+) -> None:
+    """Store a processing outcome in the manifest (erreurs SQLite non bloquantes)."""
+    try:
+        manifest.record(
+            epub_path,
+            size=stat_result.st_size,
+            mtime_ns=stat_result.st_mtime_ns,
+            status=outcome.status,
+            isbn=outcome.isbn,
+            result=asdict(outcome.result) if outcome.result is not None else None,
+            response=outcome.response,
+            error=outcome.error,
+        )
+    except Exception as exc:
+        print(f"  [Manifeste] Impossible d'enregistrer {epub_path}: {exc}")
 
 
 def parse_args() -> argparse.Namespace:
@@ -602,7 +2073,10 @@ def parse_args() -> argparse.Namespace:
         epilog="""
 Examples:
   %(prog)s --folder ~/Books --limit 5
+  %(prog)s --folder ~/Books --concurrency 4
+  %(prog)s --folder ~/Books --pipeline --concurrency 4 --stats-interval 10
   %(prog)s --folder ~/Books --test
+  %(prog)s --folder ~/Books --limit 200 --profile logs/extraction.prof
         """,
     )
 
@@ -623,7 +2097,155 @@ Examples:
         "--limit",
         type=int,
         default=None,
-        help="Nombre maximal de fichiers EPUB à traiter.",
+        help="Nombre maximal de nouveaux fichiers EPUB à traiter (hors livres déjà traités).",
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Nombre d'appels webhook menés en parallèle (1 = traitement séquentiel).",
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Pipeline à étages : extraction en processus, appels webhook (--concurrency threads), écriture dédiée.",
+    )
+
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=0,
+        help="Nombre de processus d'extraction en mode --pipeline (défaut : nombre de CPU).",
+    )
+
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=0.0,
+        help="Affiche la profondeur des files du pipeline toutes les N secondes (0 = résumé final seulement).",
+    )
+
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Envoie les livres par lots de N au webhook batch (N8N_BATCH_SIZE, hors --pipeline).",
+    )
+
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Traite une seule fois les fichiers identiques (taille puis SHA-256) ; résultat reporté sur les copies.",
+    )
+
+    parser.add_argument(
+        "--local-isbn",
+        action="store_true",
+        help="Résout les ISBN via le catalogue OpenLibrary local (OPENLIBRARY_DB) avant d'appeler n8n.",
+    )
+
+    parser.add_argument(
+        "--local-search",
+        action="store_true",
+        help="Sans ISBN résolu, recherche approchée du titre/auteur dans le catalogue local avant n8n.",
+    )
+
+    parser.add_argument(
+        "--isbn-index",
+        type=Path,
+        metavar="FICHIER",
+        help="Résultats JSONL d'isbn_scan.py --output : le texte des livres déjà scannés n'est pas rescanné "
+        "(EPUB_ISBN_INDEX).",
+    )
+
+    parser.add_argument(
+        "--list-threads",
+        type=int,
+        default=None,
+        help=f"Dossiers listés en parallèle pendant le parcours (EPUB_LIST_THREADS, défaut : {DEFAULT_LIST_THREADS}) ; "
+        "à augmenter sur un partage réseau.",
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=shard_argument,
+        metavar="I/N",
+        help="Ne traite que la part I sur N de la bibliothèque (répartition par empreinte du chemin relatif, "
+        "EPUB_SHARD) ; log, manifeste et cache suffixés par .shardIofN.",
+    )
+
+    parser.add_argument(
+        "--skip-logged",
+        action="store_true",
+        help="Ignore les livres ayant déjà un résultat dans le log JSONL (index EPUB_RESULT_INDEX).",
+    )
+
+    parser.add_argument(
+        "--log-profile",
+        choices=LOG_PROFILES,
+        default=None,
+        help="Contenu du log JSONL : full (payload complet), compact (parties volumineuses hors ligne), "
+        "minimal (sans payload). Défaut : EPUB_LOG_PROFILE ou full.",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Désactive le cache local des réponses n8n (EPUB_CACHE).",
+    )
+
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Retraite tous les livres, y compris ceux déjà terminés dans le manifeste.",
+    )
+
+    parser.add_argument(
+        "--no-manifest",
+        action="store_true",
+        help="Désactive le manifeste d'exécution incrémentale (EPUB_MANIFEST).",
+    )
+
+    parser.add_argument(
+        "--hash",
+        action="store_true",
+        help="Enregistre et compare aussi l'empreinte SHA-256 du contenu (EPUB_MANIFEST_HASH).",
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Après le traitement du dossier, rester actif et traiter les EPUB ajoutés ou modifiés "
+        "(inotify, sinon scrutation périodique).",
+    )
+
+    parser.add_argument(
+        "--watch-settle",
+        type=float,
+        default=DEFAULT_SETTLE_SECONDS,
+        help="Secondes sans modification avant de traiter un fichier déposé (défaut : %(default)s).",
+    )
+
+    parser.add_argument(
+        "--watch-poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="Intervalle de scrutation quand inotify est indisponible, en secondes (défaut : %(default)s).",
+    )
+
+    parser.add_argument(
+        "--watch-polling",
+        action="store_true",
+        help="Forcer la scrutation périodique (partage réseau modifié depuis une autre machine).",
+    )
+
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="FICHIER",
+        help="Profile l'extraction avec cProfile (mode séquentiel) et écrit les statistiques dans FICHIER.",
     )
 
     return parser.parse_args()
@@ -633,7 +2255,23 @@ def main() -> None:
     """Main execution function."""
     args = parse_args()
 
-    config = Config.load(test_mode=args.test)
+    config = Config.load(test_mode=args.test, shard=args.shard)
+    if args.no_manifest:
+        config.manifest_path = None
+    if args.hash:
+        config.manifest_hash = True
+    if args.no_cache:
+        config.cache_path = None
+    if args.log_profile:
+        config.log_profile = args.log_profile
+    if args.local_isbn:
+        config.local_isbn = True
+    if args.local_search:
+        config.local_search = True
+    if args.isbn_index:
+        config.isbn_index_path = args.isbn_index
+    if args.list_threads is not None:
+        config.list_threads = args.list_threads
 
     if args.folder is not None:
         target_folder = args.folder
@@ -650,11 +2288,42 @@ def main() -> None:
 
     target_folder = target_folder.expanduser()
 
-    process_folder(
+    run_folder = partial(
+        process_folder,
         target_folder,
         config,
         limit=args.limit,
         test_mode=args.test,
+        force=args.force,
+        concurrency=args.concurrency,
+        pipeline=args.pipeline,
+        extract_workers=args.extract_workers,
+        stats_interval=args.stats_interval,
+        batch_size=args.batch_size,
+        dedupe=args.dedupe,
+        skip_logged=args.skip_logged,
+        profile_path=args.profile,
+    )
+
+    if not args.watch:
+        run_folder()
+        return
+
+    # `docker stop` envoie SIGTERM : terminer le lot en cours puis fermer proprement,
+    # y compris pendant le rattrapage initial.
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    watch_folder(
+        target_folder,
+        config,
+        test_mode=args.test,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        settle=args.watch_settle,
+        poll_interval=args.watch_poll_interval,
+        polling=args.watch_polling,
+        stop=stop,
+        catch_up=partial(run_folder, stop=stop),
     )
 
 
@@ -0,0 +1,243 @@
+"""Incremental HTML/XHTML to plain text conversion.
+
+Remplace le nettoyage par expressions régulières (``<[^>]+>`` puis ``\\s+`` sur
+tout le document) par un extracteur incrémental :
+
+- le contenu est consommé par blocs déjà décodés (``feed``) ; balises,
+  commentaires et entités coupés entre deux blocs sont reportés au suivant ;
+- le contenu des éléments non textuels (``<script>``, ``<style>``, ``<head>``)
+  est ignoré ;
+- les entités (``&amp;``, ``&eacute;``, ``&#233;``...) sont décodées ;
+- les blancs sont fusionnés au fil de l'eau, chaque balise valant un espace
+  comme avec l'ancien nettoyage ;
+- avec un budget de caractères, l'extraction s'arrête dès qu'il est atteint
+  (``done``), sans parcourir le reste du document.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from typing import Iterable, Iterator, Optional
+
+SKIPPED_ELEMENTS = ("script", "style", "head")
+
+# Au-delà, un ``&`` sans ``;`` n'est plus considéré comme le début d'une entité.
+ENTITY_MAX_CHARS = 32
+
+# Longueur conservée en fin de bloc quand on cherche la fin d'un élément ignoré.
+_SKIP_TAIL_CHARS = 64
+
+# Au-delà, un ``<`` sans ``>`` est gardé comme texte au lieu d'être attendu indéfiniment.
+MAX_TAG_CHARS = 16384
+
+# Avec un budget, le HTML est traité par fenêtres de FACTOR caractères par caractère
+# de texte manquant (+ SLACK) : on n'analyse pas tout le membre pour 4000 caractères.
+BUDGET_WINDOW_FACTOR = 4
+BUDGET_WINDOW_SLACK = 256
+
+# Balise, déclaration (``<!DOCTYPE``) ou instruction (``<?xml``) ; ``3 < 4`` reste du texte.
+_TAG_RE = re.compile(r"<[A-Za-z/!?][^>]*>")
+_TAG_START_RE = re.compile(r"<(?:[A-Za-z/!?]|$)")
+_SPECIAL_MAX_CHARS = 16
+# Début d'un commentaire ou d'un élément dont le contenu est ignoré.
+_SPECIAL_RE = re.compile(r"<(?:!--|(?:" + "|".join(SKIPPED_ELEMENTS) + r")(?=[\s/>]))", re.IGNORECASE)
+
+# Fin d'un élément ignoré ; un ``<body`` termine aussi un ``<head>`` jamais fermé.
+_SKIP_END_RE = {
+    name: re.compile(rf"</{name}\s*>" + (r"|<body[\s>/]" if name == "head" else ""), re.IGNORECASE)
+    for name in SKIPPED_ELEMENTS
+}
+_COMMENT_END_RE = re.compile("-->")
+
+
+class HtmlTextExtractor:
+    """Convert HTML fed chunk by chunk into whitespace-normalized plain text.
+
+    ``feed`` renvoie le texte produit par le bloc (éventuellement vide) et
+    ``close`` le texte encore en attente. La concaténation des valeurs
+    renvoyées ne commence ni ne finit par un blanc. Avec ``budget``, le texte
+    produit est tronqué à ``budget`` caractères et ``done`` passe à ``True`` :
+    les blocs suivants sont ignorés.
+    """
+
+    def __init__(self, budget: Optional[int] = None) -> None:
+        self.budget = budget
+        self.length = 0
+        self.done = budget is not None and budget <= 0
+        self._buffer = ""
+        self._skip: Optional[re.Pattern[str]] = None
+        self._space = False
+
+    def feed(self, chunk: str) -> str:
+        """Consume a decoded chunk and return the text it completes."""
+        if self.done or not chunk:
+            return ""
+
+        buffer = self._buffer + chunk if self._buffer else chunk
+        out: list[str] = []
+        pos = self._consume(buffer, out)
+        self._buffer = "" if self.done else buffer[pos:]
+        return "".join(out)
+
+    def close(self) -> str:
+        """Flush the pending text (incomplete tags and skipped content are dropped)."""
+        buffer, self._buffer = self._buffer, ""
+        if self.done or not buffer or self._skip is not None:
+            return ""
+
+        tag = _TAG_START_RE.search(buffer, buffer.rfind(">") + 1)
+        out: list[str] = []
+        self._emit(_TAG_RE.sub(" ", buffer if tag is None else buffer[: tag.start()]), out)
+        return "".join(out)
+
+    def _consume(self, buffer: str, out: list[str]) -> int:
+        """Process ``buffer`` and return the position of the unconsumed remainder.
+
+        Entre deux éléments « spéciaux » (commentaire, ``<script>``...), tout
+        le texte est traité d'un bloc : balises remplacées par un espace en une
+        passe, puis entités et blancs dans ``_emit``.
+        """
+        pos = 0
+        end = len(buffer)
+        special: Optional[re.Match[str]] = None
+
+        while pos < end and not self.done:
+            if self._skip is not None:
+                match = self._skip.search(buffer, pos)
+                if match is None:
+                    return max(pos, end - _SKIP_TAIL_CHARS)
+                self._skip = None
+                self._space = True
+                # Un ``<body`` qui ferme un ``<head>`` est traité comme une balise ordinaire.
+                pos = match.start() if match.group()[1] in "bB" else match.end()
+                continue
+
+            if special is None or special.start() < pos:
+                special = _SPECIAL_RE.search(buffer, pos, self._horizon(pos, end))
+            stop = special.start() if special is not None else end
+
+            if stop > pos:
+                limit = self._region_end(buffer, pos, stop)
+                if limit < end:
+                    self._emit(_TAG_RE.sub(" ", buffer[pos:limit]), out)
+                    pos = limit
+                    continue
+
+                # Fin du bloc : le texte incomplet attend le bloc suivant.
+                limit = _pending_text_end(buffer, pos, end)
+                self._emit(_TAG_RE.sub(" ", buffer[pos:limit]), out)
+                return limit
+
+            if buffer.startswith("<!--", pos):
+                self._skip = _COMMENT_END_RE
+                pos += 4
+                continue
+
+            gt = buffer.find(">", pos)
+            if gt < 0:
+                return pos
+            if buffer[gt - 1] != "/":
+                self._skip = _SKIP_END_RE[special.group()[1:].lower()]
+            self._space = True
+            pos = gt + 1
+
+        return pos
+
+    def _window_end(self, pos: int) -> Optional[int]:
+        """Return the end of the input window that may fill the remaining budget."""
+        if self.budget is None:
+            return None
+        return pos + BUDGET_WINDOW_FACTOR * (self.budget - self.length) + BUDGET_WINDOW_SLACK
+
+    def _horizon(self, pos: int, end: int) -> int:
+        """Return how far to look for the next special element."""
+        window_end = self._window_end(pos)
+        return end if window_end is None else min(end, window_end + _SPECIAL_MAX_CHARS)
+
+    def _region_end(self, buffer: str, pos: int, stop: int) -> int:
+        """Return where to cut the text region ``[pos, stop)`` to respect the budget.
+
+        Sans budget, la région est traitée en entier ; sinon elle est découpée
+        après un ``>`` pour ne jamais couper une balise ou une entité.
+        """
+        window_end = self._window_end(pos)
+        if window_end is None or window_end >= stop:
+            return stop
+
+        cut = buffer.rfind(">", pos, window_end)
+        if cut >= 0:
+            return cut + 1
+
+        # Aucune balise dans la fenêtre : on va jusqu'à la suivante, sans dépasser un élément spécial.
+        cut = buffer.find(">", window_end, stop)
+        limit = stop if cut < 0 else cut + 1
+        special = _SPECIAL_RE.search(buffer, pos, limit)
+        return limit if special is None else special.start()
+
+    def _emit(self, text: str, out: list[str]) -> None:
+        """Append the normalized form of a text segment to ``out``."""
+        if not text:
+            return
+        if "&" in text:
+            text = html.unescape(text)
+
+        words = text.split()
+        if not words:
+            self._space = True
+            return
+
+        piece = " ".join(words)
+        if self.length and (self._space or text[0].isspace()):
+            piece = " " + piece
+        self._space = text[-1].isspace()
+
+        if self.budget is not None and self.length + len(piece) >= self.budget:
+            piece = piece[: self.budget - self.length].rstrip()
+            self.done = True
+
+        out.append(piece)
+        self.length += len(piece)
+
+
+def _pending_text_end(buffer: str, pos: int, end: int) -> int:
+    """Return where the trailing text of a chunk must stop.
+
+    Une balise non terminée (``<p cla``) ou une entité sans ``;`` en fin de
+    bloc sont reportées au bloc suivant.
+    """
+    text_start = max(pos, buffer.rfind(">", pos, end) + 1)
+
+    tag = _TAG_START_RE.search(buffer, text_start, end)
+    if tag is not None and end - tag.start() <= MAX_TAG_CHARS:
+        end = tag.start()
+
+    amp = buffer.rfind("&", max(text_start, end - ENTITY_MAX_CHARS), end)
+    if amp < 0 or ";" in buffer[amp:end]:
+        return end
+    return amp
+
+
+def iter_html_text(chunks: Iterable[str], budget: Optional[int] = None) -> Iterator[str]:
+    """Yield the plain text of an HTML document given as decoded chunks.
+
+    La consommation de ``chunks`` s'arrête dès que ``budget`` est atteint.
+    """
+    extractor = HtmlTextExtractor(budget)
+
+    for chunk in chunks:
+        text = extractor.feed(chunk)
+        if text:
+            yield text
+        if extractor.done:
+            return
+
+    tail = extractor.close()
+    if tail:
+        yield tail
+
+
+def html_to_text(raw_html: str, budget: Optional[int] = None) -> str:
+    """Return the plain text of a whole HTML document."""
+    extractor = HtmlTextExtractor(budget)
+    return extractor.feed(raw_html) + extractor.close()
@@ -0,0 +1,151 @@
+"""
+Index des ISBN produit par ``isbn_scan.py``.
+
+Chaque ligne du fichier JSONL décrit un EPUB scanné :
+
+    {"path": "/abs/livre.epub", "size": 123, "mtime_ns": 1700000000000000000,
+     "source": "text", "isbns": ["9782070368228"], "elapsed_ms": 12.5}
+
+``source`` vaut ``meta`` (ISBN dans les métadonnées, texte non scanné),
+``text`` (premier ISBN valide du texte), ``none`` (métadonnées et texte
+scannés sans résultat) ou ``error`` (archive illisible).
+
+Le même fichier sert de point de reprise au scan (``--resume``) et d'index
+pour ``process_epub`` (``EPUB_ISBN_INDEX`` / ``--isbn-index``) : un livre
+dont le texte a déjà été scanné n'est pas rescanné. Une entrée n'est valable
+que si la taille et la date de modification du fichier n'ont pas changé.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+SOURCE_META = "meta"
+SOURCE_TEXT = "text"
+SOURCE_NONE = "none"
+SOURCE_ERROR = "error"
+SOURCES = (SOURCE_META, SOURCE_TEXT, SOURCE_NONE, SOURCE_ERROR)
+
+
+@dataclass(frozen=True)
+class IsbnRecord:
+    """Scan result of one EPUB file."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    source: str
+    isbns: tuple[str, ...] = ()
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["isbns"] = list(self.isbns)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Optional[IsbnRecord]:
+        """Build a record from a decoded JSON line (``None`` si la ligne est invalide)."""
+        if not isinstance(data, dict) or data.get("source") not in SOURCES:
+            return None
+        try:
+            return cls(
+                path=str(data["path"]),
+                size=int(data["size"]),
+                mtime_ns=int(data["mtime_ns"]),
+                source=data["source"],
+                isbns=tuple(str(isbn) for isbn in data.get("isbns") or ()),
+                elapsed_ms=float(data.get("elapsed_ms") or 0.0),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+def index_path_key(path: Path) -> str:
+    """Absolute path used as index key (sans résolution des liens, donc sans accès disque)."""
+    return os.path.abspath(path)
+
+
+def iter_records(path: Path) -> Iterator[IsbnRecord]:
+    """Yield the valid records of an index file, skipping malformed lines."""
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = IsbnRecord.from_dict(json.loads(line))
+            except ValueError:
+                continue
+            if record is not None:
+                yield record
+
+
+def repair_tail(path: Path) -> None:
+    """Drop a partially written last line (arrêt brutal) so appends start on a fresh line."""
+    with open(path, "rb+") as handle:
+        handle.seek(0, os.SEEK_END)
+        size = handle.tell()
+        if size == 0:
+            return
+        handle.seek(size - 1)
+        if handle.read(1) == b"\n":
+            return
+
+        position = size
+        while position > 0:
+            step = min(64 * 1024, position)
+            position -= step
+            handle.seek(position)
+            block = handle.read(step)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                handle.truncate(position + newline + 1)
+                return
+        handle.truncate(0)
+
+
+class IsbnIndex:
+    """In-memory view of an index file, keyed by absolute path (la dernière ligne l'emporte)."""
+
+    def __init__(self, records: Optional[Iterator[IsbnRecord]] = None) -> None:
+        self._records: dict[str, IsbnRecord] = {}
+        for record in records or ():
+            self._records[record.path] = record
+
+    @classmethod
+    def load(cls, path: Path) -> IsbnIndex:
+        return cls(iter_records(path))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def lookup(self, path: Path, stat_result: Optional[os.stat_result] = None) -> Optional[IsbnRecord]:
+        """Return the record of ``path`` if the file is unchanged since it was scanned."""
+        record = self._records.get(index_path_key(path))
+        if record is None:
+            return None
+        try:
+            stat_result = stat_result or os.stat(path)
+        except OSError:
+            return None
+        if stat_result.st_size != record.size or stat_result.st_mtime_ns != record.mtime_ns:
+            return None
+        return record
+
+    def text_isbn(self, path: Path) -> Optional[str]:
+        """ISBN found by scanning the text of ``path``.
+
+        Renvoie ``""`` si le texte a été scanné sans résultat, ``None`` si
+        l'index ne permet pas de conclure (livre absent ou modifié, texte non
+        scanné car l'ISBN était dans les métadonnées, archive illisible).
+        """
+        record = self.lookup(path)
+        if record is None:
+            return None
+        if record.source == SOURCE_TEXT and record.isbns:
+            return record.isbns[0]
+        if record.source == SOURCE_NONE:
+            return ""
+        return None
@@ -5,6 +5,15 @@ ISBN scanner for EPUB files.
 Parcourt les EPUB d'un dossier, inspecte les métadonnées ainsi que
 l'intégralité du texte et tente d'y détecter des ISBN-10 / ISBN-13.
 
+Les fichiers sont envoyés aux processus au fil du parcours du dossier
+(`library_walker`), par paquets (``--chunk-size``), et seul un nombre borné
+de paquets est en attente à un instant donné : le scan démarre dès le
+premier dossier lu et la mémoire reste constante quelle que soit la taille
+de la bibliothèque. Le total (pour l'ETA) est compté en arrière-plan. Le
+nombre de processus vaut par défaut le nombre de CPU disponibles
+(``--workers``). Avec ``--shard I/N``, seule la part ``I`` de la
+bibliothèque est scannée (voir `sharding`).
+
 Usage typique :
     python src/isbn_scan.py --folder ./ebooks --limit 20
 """
@@ -12,46 +21,56 @@ Usage typique :
 from __future__ import annotations
 
 import argparse
+import math
+import os
 import re
 import sys
 import time
 import zipfile
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, Set, Tuple
+from typing import Callable, Iterable, Iterator, Optional, Set, Tuple
 
 from epub_metadata import (
-    extract_metadata_from_epub,
-    _iter_text_files,
-    _strip_html,
+    EpubArchive,
+    EpubSource,
     _normalize_isbn_candidate,
+    extract_metadata_from_epub,
+    find_isbn_in_text,
 )
+from isbn_index import (
+    SOURCE_ERROR,
+    SOURCE_META,
+    SOURCE_NONE,
+    SOURCE_TEXT,
+    IsbnIndex,
+    IsbnRecord,
+    index_path_key,
+    repair_tail,
+)
+from library_walker import DEFAULT_LIST_THREADS, LibraryCounter, walk_epubs
+from result_log import PROFILE_FULL, ResultLog
+from sharding import shard_argument, shard_path
 
 
-ISBN_CANDIDATE_RE = re.compile(r"[0-9Xx][0-9Xx\- ]{8,16}[0-9Xx]")
-
-
-def _extract_full_text(epub_path: Path) -> str:
-    """Extraire l'intégralité du texte utile d'un EPUB (sans limite de longueur)."""
-    try:
-        with zipfile.ZipFile(epub_path) as zf:
-            texts: list[str] = []
-
-            for info in _iter_text_files(zf):
-                try:
-                    with zf.open(info) as handle:
-                        raw = handle.read().decode("utf-8", errors="ignore")
-                except Exception:
-                    continue
-
-                stripped = _strip_html(raw)
-                if stripped:
-                    texts.append(stripped)
-
-    except (zipfile.BadZipFile, FileNotFoundError):
-        return ""
+# Échecs propres à un fichier (archive corrompue ou chiffrée, membre illisible,
+# fichier disparu ou inaccessible) : le fichier est enregistré en erreur et le scan continue.
+SCAN_ERRORS = (zipfile.BadZipFile, OSError, zlib.error, EOFError, RuntimeError)
 
-    return " ".join(texts).strip()
+ISBN_CANDIDATE_RE = re.compile(r"[0-9Xx][0-9Xx\- ]{8,16}[0-9Xx]")
+# Nombre maximal de fichiers par paquet envoyé à un processus.
+DEFAULT_CHUNK_SIZE = 32
+# Paquets soumis mais pas encore terminés, par processus.
+SUBMIT_WINDOW_FACTOR = 2
+# Intervalle minimal entre deux rafraîchissements du bloc de progression (secondes).
+PROGRESS_INTERVAL = 0.5
+# Attente maximale du comptage des fichiers avant de dimensionner les paquets (secondes).
+STARTUP_COUNT_WAIT = 1.0
+# Intervalle de synchronisation du fichier de résultats sur disque (secondes).
+DEFAULT_CHECKPOINT_INTERVAL = 5.0
 
 
 def _find_isbns_in_strings(strings: Iterable[str]) -> Set[str]:
@@ -70,9 +89,9 @@ def _find_isbns_in_strings(strings: Iterable[str]) -> Set[str]:
     return found
 
 
-def _collect_metadata_strings(epub_path: Path) -> list[str]:
+def _collect_metadata_strings(source: EpubSource) -> list[str]:
     """Collecter toutes les chaînes de métadonnées susceptibles de contenir un ISBN."""
-    meta = extract_metadata_from_epub(epub_path)
+    meta = extract_metadata_from_epub(source)
 
     strings: list[str] = [
         meta.title,
@@ -92,22 +111,142 @@ def _collect_metadata_strings(epub_path: Path) -> list[str]:
     return [s for s in strings if s]
 
 
-def scan_epub_for_isbn(epub_path: Path) -> Tuple[bool, bool]:
-    """Scanner un EPUB et indiquer si un ISBN est trouvé.
+def scan_epub(epub_path: Path) -> IsbnRecord:
+    """Scanner un EPUB et décrire où ses ISBN ont été trouvés.
 
     On cherche d'abord dans les métadonnées ; si au moins un ISBN est
     trouvé, on ne scanne pas le texte (optimisation, même logique que l'agent principal).
+    Le ZIP n'est ouvert qu'une fois (`EpubArchive`) pour les deux étapes, et le
+    texte est parcouru membre par membre jusqu'au premier ISBN valide.
+    """
+    start = time.perf_counter()
+    try:
+        stat_result = os.stat(epub_path)
+        with EpubArchive(epub_path) as archive:
+            metadata_strings = _collect_metadata_strings(archive)
+            metadata_isbns = _find_isbns_in_strings(metadata_strings)
+
+            if metadata_isbns:
+                source, isbns = SOURCE_META, tuple(sorted(metadata_isbns))
+            else:
+                text_isbn = find_isbn_in_text(archive)
+                source, isbns = (SOURCE_TEXT, (text_isbn,)) if text_isbn else (SOURCE_NONE, ())
+    except SCAN_ERRORS:
+        return IsbnRecord(index_path_key(epub_path), 0, 0, SOURCE_ERROR)
+
+    return IsbnRecord(
+        path=index_path_key(epub_path),
+        size=stat_result.st_size,
+        mtime_ns=stat_result.st_mtime_ns,
+        source=source,
+        isbns=isbns,
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 3),
+    )
+
+
+def scan_epub_for_isbn(epub_path: Path) -> Tuple[bool, bool]:
+    """Scanner un EPUB et indiquer si un ISBN est trouvé (métadonnées, texte)."""
+    source = scan_epub(epub_path).source
+    return source == SOURCE_META, source == SOURCE_TEXT
+
+
+@dataclass
+class ScanCounts:
+    """Running totals of a scan (fichiers traités, ISBN en métadonnées / dans le texte / absents, illisibles)."""
+
+    done: int = 0
+    meta: int = 0
+    text: int = 0
+    none: int = 0
+    errors: int = 0
+
+    def add(self, record: IsbnRecord) -> None:
+        self.done += 1
+        if record.source == SOURCE_META:
+            self.meta += 1
+        elif record.source == SOURCE_TEXT:
+            self.text += 1
+        elif record.source == SOURCE_ERROR:
+            self.errors += 1
+        else:
+            self.none += 1
+
+
+def scan_epub_chunk(paths: list[str]) -> list[IsbnRecord]:
+    """Scan a chunk of EPUB files in a worker process.
+
+    Les chemins circulent sous forme de chaînes, et seuls les résultats
+    compacts (`IsbnRecord`) reviennent au processus principal.
     """
-    metadata_strings = _collect_metadata_strings(epub_path)
-    metadata_isbns = _find_isbns_in_strings(metadata_strings)
+    return [scan_epub(Path(path)) for path in paths]
+
 
-    if metadata_isbns:
-        return True, False
+def available_cpus() -> int:
+    """Number of CPUs this process may run on (affinité / cgroups compris quand le système l'expose)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
 
-    text = _extract_full_text(epub_path)
-    text_isbns = _find_isbns_in_strings([text])
 
-    return False, bool(text_isbns)
+def plan_chunks(total: int, workers: int, chunk_size: int) -> Tuple[int, int]:
+    """Return ``(processus, taille de paquet)`` for ``total`` files.
+
+    Sur une petite sélection, les paquets sont réduits pour que chaque
+    processus en reçoive plusieurs (équilibrage) ; on ne lance jamais plus de
+    processus que de paquets.
+    """
+    workers = max(1, workers)
+    chunk_size = max(1, min(chunk_size, math.ceil(total / (workers * 4))))
+    return max(1, min(workers, math.ceil(total / chunk_size))), chunk_size
+
+
+def _iter_chunks(files: Iterable[Path], size: int) -> Iterator[list[str]]:
+    iterator = iter(files)
+    while True:
+        chunk = [str(path) for path in islice(iterator, size)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def scan_files(
+    files: Iterable[Path],
+    workers: int,
+    chunk_size: int,
+    on_progress: Optional[Callable[[ScanCounts], None]] = None,
+    on_records: Optional[Callable[[list[IsbnRecord]], None]] = None,
+) -> ScanCounts:
+    """Scan ``files`` on a process pool with a bounded submission window.
+
+    Au plus ``workers × SUBMIT_WINDOW_FACTOR`` paquets sont en attente :
+    ``files`` est consommé au fil de l'eau. ``on_records`` reçoit les résultats
+    de chaque paquet terminé ; ``on_progress`` est appelé à chaque paquet
+    terminé et au moins toutes les ``PROGRESS_INTERVAL`` secondes.
+    """
+    counts = ScanCounts()
+    window = max(1, workers) * SUBMIT_WINDOW_FACTOR
+    pending: set[Future[list[IsbnRecord]]] = set()
+
+    def drain(limit: int) -> None:
+        nonlocal pending
+        while len(pending) > limit:
+            finished, pending = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in finished:
+                records = future.result()
+                for record in records:
+                    counts.add(record)
+                if on_records is not None:
+                    on_records(records)
+            if on_progress is not None:
+                on_progress(counts)
+
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        for chunk in _iter_chunks(files, chunk_size):
+            pending.add(executor.submit(scan_epub_chunk, chunk))
+            drain(window - 1)
+        drain(0)
+
+    return counts
 
 
 def parse_args() -> argparse.Namespace:
@@ -129,6 +268,62 @@ def parse_args() -> argparse.Namespace:
         help="Nombre maximal de fichiers EPUB à analyser.",
     )
 
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Nombre de processus de scan (défaut : nombre de CPU disponibles).",
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Nombre maximal de fichiers par paquet envoyé à un processus (défaut : {DEFAULT_CHUNK_SIZE}).",
+    )
+
+    parser.add_argument(
+        "--list-threads",
+        type=int,
+        default=DEFAULT_LIST_THREADS,
+        help="Dossiers listés en parallèle pendant le parcours (défaut : %(default)s) ; à augmenter sur un "
+        "partage réseau.",
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=shard_argument,
+        metavar="I/N",
+        help="Ne scanne que la part I sur N de la bibliothèque ; --output est suffixé par .shardIofN.",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Fichier JSONL des résultats par fichier (chemin, ISBN, source, durée) ; réutilisable "
+        "comme index d'ISBN par epub_metadata.py (--isbn-index).",
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reprendre un scan interrompu : ignorer les fichiers déjà enregistrés dans --output.",
+    )
+
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Remplacer un fichier --output existant (sinon le scan refuse de démarrer, sauf avec --resume).",
+    )
+
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=DEFAULT_CHECKPOINT_INTERVAL,
+        help="Intervalle de synchronisation de --output sur disque, en secondes (défaut : %(default)s).",
+    )
+
     return parser.parse_args()
 
 
@@ -141,8 +336,13 @@ def _print_progress_block(
     meta_count: int,
     text_count: int,
     none_count: int,
+    redraw: bool = False,
+    counting: bool = False,
 ) -> None:
-    """Afficher le bloc de progression (et le rafraîchir sur place)."""
+    """Afficher le bloc de progression (et le rafraîchir sur place si ``redraw``).
+
+    ``counting`` signale un total provisoire (comptage des fichiers en cours).
+    """
     meta_pct = (meta_count / done * 100) if done else 0.0
     text_pct = (text_count / done * 100) if done else 0.0
     none_pct = (none_count / done * 100) if done else 0.0
@@ -152,12 +352,14 @@ def _print_progress_block(
     bar = "#" * filled + "-" * (bar_width - filled)
 
     header_line = f"Livres traités : {done} / {total_to_process}"
+    if counting:
+        header_line += "+ (comptage en cours)"
     bar_line = f"[{bar}] {percent:5.1f}%  ETA {eta_hours}h{eta_minutes:02d}m"
     meta_line = f"  META  : {meta_count:,} ({meta_pct:4.1f}%)"
     text_line = f"  TEXTE : {text_count:,} ({text_pct:4.1f}%)"
     none_line = f"  AUCUN : {none_count:,} ({none_pct:4.1f}%)"
 
-    if done > 1:
+    if redraw:
         # Remonter et effacer les 5 lignes précédentes (header + 4 lignes)
         for _ in range(5):
             sys.stdout.write("\x1b[1A\x1b[2K\r")
@@ -170,6 +372,65 @@ def _print_progress_block(
     sys.stdout.flush()
 
 
+class ProgressDisplay:
+    """Redraw the progress block at most every ``interval`` seconds.
+
+    ``total`` renvoie ``(nombre de fichiers à traiter, définitif)`` : tant que
+    le comptage en arrière-plan n'est pas terminé, le total affiché est
+    provisoire.
+    """
+
+    def __init__(self, total: Callable[[], Tuple[int, bool]], interval: float = PROGRESS_INTERVAL) -> None:
+        self.total = total
+        self.interval = interval
+        self.start_time = time.monotonic()
+        self._last_draw: Optional[float] = None
+
+    def update(self, counts: ScanCounts, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and self._last_draw is not None and now - self._last_draw < self.interval:
+            return
+
+        done = counts.done
+        total_to_process, final = self.total()
+        total_to_process = max(total_to_process, done)
+        elapsed = now - self.start_time
+        remaining = max(total_to_process - done, 0)
+        eta_seconds = (elapsed / done * remaining) if done > 0 else 0.0
+        percent = (done / total_to_process * 100) if total_to_process else 0.0
+
+        _print_progress_block(
+            done=done,
+            total_to_process=total_to_process,
+            percent=percent,
+            eta_hours=int(eta_seconds // 3600),
+            eta_minutes=int((eta_seconds % 3600) // 60),
+            meta_count=counts.meta,
+            text_count=counts.text,
+            none_count=counts.none,
+            redraw=self._last_draw is not None,
+            counting=not final,
+        )
+        self._last_draw = now
+
+
+def _load_recorded(output: Path) -> IsbnIndex:
+    """Load the files already recorded in ``output`` (après suppression d'une ligne tronquée)."""
+    repair_tail(output)
+    recorded = IsbnIndex.load(output)
+    print(f"Reprise : {len(recorded)} fichiers déjà enregistrés dans {output}.")
+    return recorded
+
+
+def _write_records(output: ResultLog, records: list[IsbnRecord]) -> None:
+    for record in records:
+        output.write(record.to_dict())
+
+
+def _report_walk_error(exc: OSError) -> None:
+    print(f"Dossier illisible ignoré : {exc}")
+
+
 def main() -> None:
     args = parse_args()
     folder: Path = args.folder.expanduser()
@@ -178,77 +439,100 @@ def main() -> None:
         print(f"Dossier introuvable : {folder}")
         return
 
-    files = list(folder.rglob("*.epub"))
-    if not files:
-        print("Aucun fichier .epub trouvé dans ce dossier.")
+    if args.resume and args.output is None:
+        print("--resume nécessite --output.")
         return
 
-    total = len(files)
-    if args.limit is not None:
-        total_to_process = min(total, args.limit)
-    else:
-        total_to_process = total
-
-    meta_count = 0
-    text_count = 0
-    none_count = 0
-
-    start_time = time.time()
-
-    target_files = files[:total_to_process]
-    max_workers = min(4, total_to_process) or 1
-    processed = 0
+    if args.resume and args.overwrite:
+        print("--resume et --overwrite sont incompatibles.")
+        return
 
-    if not target_files:
+    if args.limit is not None and args.limit <= 0:
         print("Limite de fichiers à 0 ; aucun scan exécuté.")
         return
 
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(scan_epub_for_isbn, epub_file): epub_file for epub_file in target_files}
-
-        for future in as_completed(futures):
-            has_meta, has_text = future.result()
-
-            if has_meta:
-                meta_count += 1
-            if has_text:
-                text_count += 1
-            if not has_meta and not has_text:
-                none_count += 1
-
-            processed += 1
-            done = processed
-            elapsed = time.time() - start_time
-            remaining = max(total_to_process - done, 0)
-            eta_seconds = (elapsed / done * remaining) if done > 0 else 0.0
-            eta_hours = int(eta_seconds // 3600)
-            eta_minutes = int((eta_seconds % 3600) // 60)
-            percent = (done / total_to_process * 100) if total_to_process else 0.0
-
-            _print_progress_block(
-                done=done,
-                total_to_process=total_to_process,
-                percent=percent,
-                eta_hours=eta_hours,
-                eta_minutes=eta_minutes,
-                meta_count=meta_count,
-                text_count=text_count,
-                none_count=none_count,
-            )
+    if args.shard is not None and args.output is not None:
+        args.output = shard_path(args.output, args.shard)
+
+    recorded: Optional[IsbnIndex] = None
+    if args.output is not None and args.output.exists():
+        if args.resume:
+            recorded = _load_recorded(args.output)
+        elif args.overwrite:
+            args.output.unlink()
+        else:
+            print(f"{args.output} existe déjà : --resume pour reprendre ce scan, --overwrite pour le remplacer.")
+            return
+
+    # Comptage en arrière-plan (ETA) pendant que le parcours alimente déjà le scan.
+    in_shard = (lambda path: args.shard.contains(path, folder)) if args.shard is not None else None
+    counter = LibraryCounter(folder, args.list_threads, accept=in_shard).start()
+    skipped = 0
+
+    def files_to_scan() -> Iterator[Path]:
+        nonlocal skipped
+        for path, stat_result in walk_epubs(folder, args.list_threads, on_error=_report_walk_error):
+            if in_shard is not None and not in_shard(path):
+                continue
+            if recorded is not None and recorded.lookup(path, stat_result) is not None:
+                skipped += 1
+                continue
+            yield path
+
+    def total() -> Tuple[int, bool]:
+        remaining = counter.count - skipped
+        if args.limit is not None and remaining >= args.limit:
+            return args.limit, True
+        return remaining, counter.total is not None
+
+    # Une petite bibliothèque est comptée presque instantanément : les paquets
+    # sont alors dimensionnés sur le nombre réel de fichiers.
+    counted = counter.wait(STARTUP_COUNT_WAIT)
+    planned = total()[0] if counted is not None else sys.maxsize
+    workers, chunk_size = plan_chunks(planned, args.workers or available_cpus(), args.chunk_size)
+    shard_note = f", part {args.shard}" if args.shard is not None else ""
+    print(f"Scan : {workers} processus, paquets de {chunk_size} fichiers{shard_note}.")
+
+    progress = ProgressDisplay(total)
+    output = ResultLog(args.output, PROFILE_FULL, fsync_interval=args.checkpoint_interval) if args.output else None
+    try:
+        counts = scan_files(
+            islice(files_to_scan(), args.limit),
+            workers,
+            chunk_size,
+            on_progress=progress.update,
+            on_records=(lambda records: _write_records(output, records)) if output is not None else None,
+        )
+    finally:
+        if output is not None:
+            output.close()
+
+    if counts.done == 0:
+        if skipped:
+            print("Tous les fichiers sont déjà enregistrés ; rien à reprendre.")
+        else:
+            print("Aucun fichier .epub trouvé dans ce dossier.")
+        return
 
+    progress.update(counts, force=True)
     print()  # retour ligne final pour ne pas écraser le résumé
 
-    final_meta_pct = (meta_count / total_to_process * 100) if total_to_process else 0.0
-    final_text_pct = (text_count / total_to_process * 100) if total_to_process else 0.0
-    final_none_pct = (none_count / total_to_process * 100) if total_to_process else 0.0
+    final_meta_pct = counts.meta / counts.done * 100
+    final_text_pct = counts.text / counts.done * 100
+    final_none_pct = counts.none / counts.done * 100
 
     print("Résumé du scan ISBN :")
-    print(f"  Fichiers analysés      : {total_to_process}")
-    print(f"  ISBN trouvés metadata  : {meta_count} ({final_meta_pct:4.1f}%)")
-    print(f"  ISBN trouvés texte     : {text_count} ({final_text_pct:4.1f}%)")
-    print(f"  Aucun ISBN détecté     : {none_count} ({final_none_pct:4.1f}%)")
+    print(f"  Fichiers analysés      : {counts.done}")
+    print(f"  ISBN trouvés metadata  : {counts.meta} ({final_meta_pct:4.1f}%)")
+    print(f"  ISBN trouvés texte     : {counts.text} ({final_text_pct:4.1f}%)")
+    print(f"  Aucun ISBN détecté     : {counts.none} ({final_none_pct:4.1f}%)")
+    if counts.errors:
+        print(f"  Fichiers illisibles    : {counts.errors} ({counts.errors / counts.done * 100:4.1f}%)")
+    if skipped:
+        print(f"  Déjà enregistrés       : {skipped}")
+    if args.output is not None:
+        print(f"  Résultats par fichier  : {args.output}")
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,156 @@
+"""
+Parcours en flux d'une bibliothèque d'EPUB, basé sur ``os.scandir``.
+
+- Les fichiers sont produits au fil du parcours, avec leur ``stat`` (taille,
+  date de modification) obtenu pendant le listage : le traitement commence
+  dès le premier dossier lu, sans attendre la fin du parcours.
+- L'extension est comparée sans tenir compte de la casse (``.epub``,
+  ``.EPUB``...).
+- Avec plusieurs threads, les dossiers suivants sont listés à l'avance
+  (utile sur NFS/SMB, où chaque listage coûte un aller-retour réseau) ;
+  l'ordre de sortie reste celui d'un parcours en profondeur, noms triés.
+- ``LibraryCounter`` compte les EPUB dans un thread séparé, pour afficher
+  une estimation du temps restant sans retarder le traitement.
+
+Les liens symboliques vers des dossiers ne sont pas suivis (pas de boucle
+possible) ; les liens vers des fichiers le sont.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Union, cast
+
+EPUB_SUFFIX = ".epub"
+DEFAULT_LIST_THREADS = 4
+# Dossiers listés à l'avance, par thread.
+PREFETCH_FACTOR = 4
+
+Listing = tuple[list[tuple[Path, Optional[os.stat_result]]], list[Path]]
+
+
+def is_epub_name(name: str) -> bool:
+    return name.lower().endswith(EPUB_SUFFIX)
+
+
+def _list_directory(
+    directory: Path,
+    with_stat: bool,
+    on_error: Optional[Callable[[OSError], None]],
+) -> Listing:
+    """Return the EPUB files (avec leur stat) and the subdirectories of ``directory``, sorted by name."""
+    files: list[tuple[Path, Optional[os.stat_result]]] = []
+    subdirs: list[Path] = []
+
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(Path(entry.path))
+                    elif is_epub_name(entry.name) and entry.is_file():
+                        files.append((Path(entry.path), entry.stat() if with_stat else None))
+                except OSError:
+                    # Fichier disparu ou lien cassé entre le listage et le stat.
+                    continue
+    except OSError as exc:
+        if on_error is not None:
+            on_error(exc)
+
+    files.sort(key=lambda item: item[0].name)
+    subdirs.sort(key=lambda path: path.name)
+    return files, subdirs
+
+
+def _walk(
+    folder: Path,
+    threads: int,
+    with_stat: bool,
+    on_error: Optional[Callable[[OSError], None]],
+) -> Iterator[tuple[Path, Optional[os.stat_result]]]:
+    if threads <= 1:
+        stack: list[Path] = [folder]
+        while stack:
+            files, subdirs = _list_directory(stack.pop(), with_stat, on_error)
+            yield from files
+            stack.extend(reversed(subdirs))
+        return
+
+    window = threads * PREFETCH_FACTOR
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="library-walker") as executor:
+        # Pile du parcours en profondeur ; le haut de la pile est listé à l'avance.
+        pending: list[Union[Path, Future[Listing]]] = [folder]
+        try:
+            while pending:
+                for position in range(len(pending) - 1, max(len(pending) - 1 - window, -1), -1):
+                    item = pending[position]
+                    if isinstance(item, Path):
+                        pending[position] = executor.submit(_list_directory, item, with_stat, on_error)
+
+                listing = cast("Future[Listing]", pending.pop())
+                files, subdirs = listing.result()
+                yield from files
+                pending.extend(reversed(subdirs))
+        finally:
+            for item in pending:
+                if isinstance(item, Future):
+                    item.cancel()
+
+
+def walk_epubs(
+    folder: Path,
+    threads: int = DEFAULT_LIST_THREADS,
+    on_error: Optional[Callable[[OSError], None]] = None,
+) -> Iterator[tuple[Path, os.stat_result]]:
+    """Yield ``(chemin, stat)`` for every EPUB below ``folder``, as the walk progresses.
+
+    ``threads`` dossiers sont listés en parallèle (1 = parcours séquentiel).
+    Les dossiers illisibles sont ignorés après un appel à ``on_error``.
+    """
+    for path, stat_result in _walk(folder, threads, True, on_error):
+        yield path, cast(os.stat_result, stat_result)
+
+
+class LibraryCounter:
+    """Count the EPUB files below a folder in a background thread.
+
+    ``count`` progresse pendant le comptage ; ``total`` vaut ``None`` tant que
+    le parcours n'est pas terminé. Le comptage ne fait aucun ``stat`` ;
+    ``accept`` permet de ne compter qu'une partie des fichiers.
+    """
+
+    def __init__(
+        self,
+        folder: Path,
+        threads: int = DEFAULT_LIST_THREADS,
+        accept: Optional[Callable[[Path], bool]] = None,
+    ) -> None:
+        self.folder = folder
+        self.threads = threads
+        self.accept = accept
+        self.count = 0
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="library-counter", daemon=True)
+
+    def start(self) -> LibraryCounter:
+        self._thread.start()
+        return self
+
+    @property
+    def total(self) -> Optional[int]:
+        return self.count if self._finished.is_set() else None
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        self._finished.wait(timeout)
+        return self.total
+
+    def _run(self) -> None:
+        try:
+            for path, _ in _walk(self.folder, self.threads, False, None):
+                if self.accept is None or self.accept(path):
+                    self.count += 1
+        finally:
+            self._finished.set()
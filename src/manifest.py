@@ -0,0 +1,256 @@
+"""
+Manifeste SQLite des exécutions incrémentales.
+
+Chaque EPUB traité est enregistré avec sa taille et sa date de modification
+(et, en option, l'empreinte SHA-256 de son contenu), le résultat de
+l'extraction, l'ISBN, le statut de l'appel webhook et la réponse n8n.
+Une nouvelle exécution ignore les livres terminés et inchangés et ne
+relance que ceux en échec ou modifiés.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+STATUS_DONE = "done"
+STATUS_EMPTY = "empty"
+STATUS_FAILED = "failed"
+
+# Statuts considérés comme définitifs tant que le fichier ne change pas.
+FINISHED_STATUSES = frozenset({STATUS_DONE, STATUS_EMPTY})
+
+SCHEMA_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT,
+    status TEXT NOT NULL,
+    isbn TEXT NOT NULL DEFAULT '',
+    titre TEXT,
+    auteur TEXT,
+    explication TEXT,
+    response TEXT,
+    error TEXT NOT NULL DEFAULT '',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS books_status ON books (status);
+CREATE INDEX IF NOT EXISTS books_sha256 ON books (sha256);
+"""
+
+
+def file_sha256(path: Path) -> str:
+    """Return the hex SHA-256 digest of a file, read by blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def manifest_key(path: Path) -> str:
+    """Stable manifest key for a file (absolute path, sans résolution des liens)."""
+    return os.path.abspath(path)
+
+
+@dataclass
+class ManifestEntry:
+    """One row of the manifest."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: Optional[str]
+    status: str
+    isbn: str
+    titre: Optional[str]
+    auteur: Optional[str]
+    explication: Optional[str]
+    response: Optional[dict[str, Any]]
+    error: str
+    attempts: int
+    updated_at: float
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+
+class Manifest:
+    """SQLite-backed record of what was already processed.
+
+    Les méthodes sont protégées par un verrou : le manifeste peut être consulté
+    par le thread qui parcourt le dossier et mis à jour par celui qui écrit les résultats.
+    """
+
+    def __init__(self, db_path: Path, use_hash: bool = False) -> None:
+        self.db_path = Path(db_path)
+        self.use_hash = use_hash
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.commit()
+
+    def __enter__(self) -> Manifest:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def lookup(self, path: Path) -> Optional[ManifestEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, size, mtime_ns, sha256, status, isbn, titre, auteur, explication,"
+                " response, error, attempts, updated_at FROM books WHERE path = ?",
+                (manifest_key(path),),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        response = json.loads(row[9]) if row[9] else None
+        return ManifestEntry(*row[:9], response, *row[10:])
+
+    def is_finished(self, path: Path, size: int, mtime_ns: int) -> bool:
+        """Return True if ``path`` was processed successfully and has not changed since.
+
+        Avec ``use_hash``, un fichier dont la taille est identique mais la date de
+        modification différente (copie, ``touch``) est comparé par empreinte SHA-256 ;
+        s'il est inchangé, sa date est mise à jour sans retraitement.
+        """
+        entry = self.lookup(path)
+        if entry is None or not entry.finished or entry.size != size:
+            return False
+
+        if entry.mtime_ns == mtime_ns:
+            return True
+
+        if not self.use_hash or not entry.sha256:
+            return False
+
+        try:
+            unchanged = file_sha256(path) == entry.sha256
+        except OSError:
+            return False
+
+        if unchanged:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "UPDATE books SET mtime_ns = ? WHERE path = ?",
+                    (mtime_ns, entry.path),
+                )
+        return unchanged
+
+    def record(
+        self,
+        path: Path,
+        size: int,
+        mtime_ns: int,
+        status: str,
+        isbn: str = "",
+        result: Optional[dict[str, Any]] = None,
+        response: Optional[dict[str, Any]] = None,
+        error: str = "",
+    ) -> None:
+        """Insert or update the entry for ``path`` after a processing attempt."""
+        sha256: Optional[str] = None
+        if self.use_hash:
+            try:
+                sha256 = file_sha256(path)
+            except OSError:
+                sha256 = None
+
+        result = result or {}
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO books (path, size, mtime_ns, sha256, status, isbn, titre, auteur,
+                                   explication, response, error, attempts, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT (path) DO UPDATE SET
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns,
+                    sha256 = excluded.sha256,
+                    status = excluded.status,
+                    isbn = excluded.isbn,
+                    titre = excluded.titre,
+                    auteur = excluded.auteur,
+                    explication = excluded.explication,
+                    response = excluded.response,
+                    error = excluded.error,
+                    attempts = books.attempts + 1,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    manifest_key(path),
+                    size,
+                    mtime_ns,
+                    sha256,
+                    status,
+                    isbn,
+                    result.get("titre"),
+                    result.get("auteur"),
+                    result.get("explication"),
+                    json.dumps(response, ensure_ascii=False) if response is not None else None,
+                    error,
+                    time.time(),
+                ),
+            )
+
+    def counts(self) -> dict[str, int]:
+        """Number of entries per status."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM books GROUP BY status").fetchall())
+
+    def merge(self, source: Path) -> None:
+        """Import the entries of another manifest (pour un même chemin, l'entrée la plus récente l'emporte)."""
+        with self._lock:
+            self._conn.execute("ATTACH DATABASE ? AS source", (str(source),))
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        """
+                        INSERT INTO books (path, size, mtime_ns, sha256, status, isbn, titre, auteur,
+                                           explication, response, error, attempts, updated_at)
+                        SELECT path, size, mtime_ns, sha256, status, isbn, titre, auteur,
+                               explication, response, error, attempts, updated_at
+                        FROM source.books WHERE true
+                        ON CONFLICT (path) DO UPDATE SET
+                            size = excluded.size,
+                            mtime_ns = excluded.mtime_ns,
+                            sha256 = excluded.sha256,
+                            status = excluded.status,
+                            isbn = excluded.isbn,
+                            titre = excluded.titre,
+                            auteur = excluded.auteur,
+                            explication = excluded.explication,
+                            response = excluded.response,
+                            error = excluded.error,
+                            attempts = excluded.attempts,
+                            updated_at = excluded.updated_at
+                        WHERE excluded.updated_at > books.updated_at
+                        """
+                    )
+            finally:
+                self._conn.execute("DETACH DATABASE source")
@@ -0,0 +1,428 @@
+"""
+Client HTTP réutilisable pour le webhook n8n.
+
+- Session ``requests`` partagée (connexions keep-alive, pool de taille
+  configurable) : la poignée de main TCP/TLS n'est payée qu'une fois par connexion.
+- Nouvelles tentatives avec backoff exponentiel et jitter pour les échecs
+  transitoires (connexion, 429/502/503/504), en respectant ``Retry-After``.
+  Un délai de lecture dépassé n'est rejoué que sur option : le webhook a pu
+  recevoir la requête et lancer le traitement (appel IA compris).
+- Disjoncteur : après N échecs consécutifs, les envois sont suspendus pendant
+  une période de refroidissement, puis une seule requête d'essai est autorisée
+  avant de reprendre normalement.
+- Plusieurs webhooks (``BalancedN8nClient``, URL séparées par des virgules) :
+  chaque requête part vers l'instance la moins chargée (requêtes en cours
+  pondérées par la latence récente) ; une instance en échec répété est
+  écartée temporairement et les requêtes échouées sont rejouées sur une autre.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Statuts HTTP considérés comme transitoires (la requête peut être rejouée).
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Poids de la dernière mesure dans la moyenne mobile des latences d'une instance.
+LATENCY_EWMA_ALPHA = 0.3
+
+
+def split_urls(value: str) -> list[str]:
+    """Split a comma-separated list of webhook URLs (espaces et entrées vides ignorés)."""
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+@dataclass(frozen=True)
+class ClientSettings:
+    """Connection, retry and circuit breaker settings."""
+
+    timeout: float = 120.0
+    verify_ssl: bool | str = True
+    retries: int = 3
+    backoff: float = 1.0
+    backoff_max: float = 30.0
+    pool_size: int = 10
+    breaker_threshold: int = 5
+    breaker_cooldown: float = 60.0
+    retry_read_timeout: bool = False
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker that pauses callers while open.
+
+    - fermé : les requêtes passent ;
+    - ouvert : `acquire` attend la fin du refroidissement ;
+    - semi-ouvert : une seule requête d'essai passe, les autres attendent son issue.
+    """
+
+    def __init__(
+        self,
+        threshold: int,
+        cooldown: float,
+        report: Callable[[str], None] = print,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.report = report
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        with self._cond:
+            return self._opened_at is not None
+
+    def acquire(self) -> None:
+        """Block while the circuit is open or a probe request is in flight."""
+        if self.threshold <= 0:
+            return
+
+        with self._cond:
+            while True:
+                if self._opened_at is None:
+                    return
+
+                remaining = self._opened_at + self.cooldown - self._clock()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+
+                if not self._probing:
+                    self._probing = True
+                    return
+
+                self._cond.wait()
+
+    def record_success(self) -> None:
+        with self._cond:
+            if self._opened_at is not None:
+                self.report("  [n8n] Webhook de nouveau disponible, reprise des envois.")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+            self._cond.notify_all()
+
+    def record_failure(self) -> None:
+        if self.threshold <= 0:
+            return
+
+        with self._cond:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self.threshold):
+                self._opened_at = self._clock()
+                self.report(
+                    f"  [n8n] {self._failures} échec(s) consécutif(s) : envois suspendus {self.cooldown:.0f}s."
+                )
+            self._probing = False
+            self._cond.notify_all()
+
+
+class N8nClient:
+    """Pooled keep-alive client with retries and a circuit breaker."""
+
+    def __init__(
+        self,
+        url: str,
+        settings: ClientSettings = ClientSettings(),
+        report: Callable[[str], None] = print,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.url = url
+        self.settings = settings
+        self.report = report
+        self._sleep = sleep
+        self.breaker = CircuitBreaker(settings.breaker_threshold, settings.breaker_cooldown, report=report)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max(1, settings.pool_size),
+            pool_block=False,
+            max_retries=0,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def post_json(self, payload: Any, timeout: Optional[float] = None) -> requests.Response:
+        """POST ``payload`` as JSON, retrying transient failures.
+
+        ``timeout`` remplace ``settings.timeout`` pour cette requête (lots).
+        Lève la dernière ``requests.RequestException`` si toutes les tentatives échouent.
+        """
+        attempt = 0
+
+        while True:
+            self.breaker.acquire()
+
+            try:
+                resp = self.session.post(
+                    self.url,
+                    json=payload,
+                    timeout=self.settings.timeout if timeout is None else timeout,
+                    verify=self.settings.verify_ssl,
+                )
+                resp.raise_for_status()
+            except requests.RequestException as exc:
+                if _is_transient(exc, retry_read_timeout=True):
+                    self.breaker.record_failure()
+                else:
+                    # Erreur « définitive » (4xx, 500) : le serveur répond, le circuit reste fermé.
+                    self.breaker.record_success()
+
+                if not _is_transient(exc, self.settings.retry_read_timeout) or attempt >= self.settings.retries:
+                    raise
+
+                delay = self._retry_delay(attempt, exc)
+                attempt += 1
+                self.report(
+                    f"  [n8n] Tentative {attempt}/{self.settings.retries} dans {delay:.1f}s ({_describe(exc)})"
+                )
+                self._sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return resp
+
+    def _retry_delay(self, attempt: int, exc: requests.RequestException) -> float:
+        return _retry_delay(self.settings, attempt, exc)
+
+
+@dataclass
+class EndpointStats:
+    """Per-endpoint counters of a `BalancedN8nClient` (résumé de fin d'exécution)."""
+
+    url: str
+    requests: int = 0
+    errors: int = 0
+    ejections: int = 0
+    total_latency: float = 0.0
+    answered: int = 0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.answered if self.answered else 0.0
+
+
+class Endpoint:
+    """One webhook instance: its connection pool, current load, recent latency and health."""
+
+    def __init__(self, url: str, client: N8nClient) -> None:
+        self.url = url
+        self.client = client
+        self.outstanding = 0
+        self.latency: Optional[float] = None
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.stats = EndpointStats(url)
+
+    def load(self) -> tuple[float, int]:
+        """Selection key: requêtes en cours pondérées par la latence récente, puis requêtes en cours.
+
+        Une instance sans mesure de latence passe avant les autres à charge égale.
+        """
+        return (self.outstanding + 1) * (self.latency or 0.0), self.outstanding
+
+
+class BalancedN8nClient:
+    """Spread requests over several webhook instances with health tracking.
+
+    Chaque requête part vers l'instance disponible de plus faible charge
+    (`Endpoint.load`). Après ``breaker_threshold`` échecs consécutifs
+    (connexion, timeout, 429 ou 5xx), une instance est écartée pendant
+    ``breaker_cooldown`` secondes, puis réintégrée à l'essai : un nouvel
+    échec l'écarte aussitôt. Une requête en échec transitoire (voir
+    `_is_transient` : un timeout de lecture n'est rejoué qu'avec
+    ``retry_read_timeout``) est rejouée (``retries`` fois au plus) sur une
+    autre instance sans attendre, ou après un backoff si toutes ont déjà été
+    essayées. Si toutes les instances sont écartées, les appelants attendent
+    la première réintégration.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        settings: ClientSettings = ClientSettings(),
+        report: Callable[[str], None] = print,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not urls:
+            raise ValueError("Aucune URL de webhook.")
+        self.url = ",".join(urls)
+        self.settings = settings
+        self.report = report
+        self._sleep = sleep
+        self._clock = clock
+        self._cond = threading.Condition()
+        # Nouvelles tentatives et mise à l'écart sont gérées ici, pas par chaque instance.
+        single = replace(settings, retries=0, breaker_threshold=0)
+        self.endpoints = [Endpoint(url, N8nClient(url, single, report=report)) for url in urls]
+
+    def close(self) -> None:
+        for endpoint in self.endpoints:
+            endpoint.client.close()
+
+    def post_json(self, payload: Any, timeout: Optional[float] = None) -> requests.Response:
+        """POST ``payload`` as JSON to the least loaded instance, failing over on transient errors.
+
+        Lève la dernière ``requests.RequestException`` si toutes les tentatives échouent.
+        """
+        attempt = 0
+        tried: set[Endpoint] = set()
+
+        while True:
+            endpoint = self._acquire(tried)
+            started = self._clock()
+            try:
+                resp = endpoint.client.post_json(payload, timeout)
+            except requests.RequestException as exc:
+                self._release(endpoint, self._clock() - started, exc)
+                if not _is_transient(exc, self.settings.retry_read_timeout) or attempt >= self.settings.retries:
+                    raise
+
+                attempt += 1
+                tried.add(endpoint)
+                if self._has_untried(tried):
+                    self.report(
+                        f"  [n8n] Tentative {attempt}/{self.settings.retries} sur une autre instance "
+                        f"({endpoint.url} : {_describe(exc)})"
+                    )
+                    continue
+
+                tried.clear()
+                delay = _retry_delay(self.settings, attempt - 1, exc)
+                self.report(
+                    f"  [n8n] Tentative {attempt}/{self.settings.retries} dans {delay:.1f}s ({_describe(exc)})"
+                )
+                self._sleep(delay)
+                continue
+
+            self._release(endpoint, self._clock() - started, None)
+            return resp
+
+    def stats(self) -> list[EndpointStats]:
+        with self._cond:
+            return [replace(endpoint.stats) for endpoint in self.endpoints]
+
+    def format_lines(self) -> list[str]:
+        """Return the per-instance summary as aligned text lines (résumé de fin d'exécution)."""
+        lines = ["Instances n8n :", f"  {'requêtes':>9} {'erreurs':>8} {'écartée':>8} {'moy. ms':>9}  url"]
+        for row in self.stats():
+            lines.append(
+                f"  {row.requests:>9} {row.errors:>8} {row.ejections:>8} {row.mean_latency * 1000:>9.0f}  {row.url}"
+            )
+        return lines
+
+    def _available(self, now: float) -> list[Endpoint]:
+        return [endpoint for endpoint in self.endpoints if endpoint.ejected_until <= now]
+
+    def _has_untried(self, tried: set[Endpoint]) -> bool:
+        with self._cond:
+            return any(endpoint not in tried for endpoint in self._available(self._clock()))
+
+    def _acquire(self, tried: set[Endpoint]) -> Endpoint:
+        """Reserve the least loaded available instance (de préférence pas encore essayée)."""
+        with self._cond:
+            while True:
+                now = self._clock()
+                available = self._available(now)
+                if available:
+                    candidates = [endpoint for endpoint in available if endpoint not in tried] or available
+                    endpoint = min(candidates, key=Endpoint.load)
+                    endpoint.outstanding += 1
+                    return endpoint
+                self._cond.wait(min(endpoint.ejected_until for endpoint in self.endpoints) - now)
+
+    def _release(self, endpoint: Endpoint, elapsed: float, exc: Optional[requests.RequestException]) -> None:
+        threshold = self.settings.breaker_threshold
+        with self._cond:
+            endpoint.outstanding -= 1
+            endpoint.stats.requests += 1
+            if exc is not None:
+                endpoint.stats.errors += 1
+
+            if exc is not None and _is_endpoint_failure(exc):
+                endpoint.consecutive_failures += 1
+                now = self._clock()
+                if threshold > 0 and endpoint.consecutive_failures >= threshold and endpoint.ejected_until <= now:
+                    endpoint.ejected_until = now + self.settings.breaker_cooldown
+                    endpoint.stats.ejections += 1
+                    self.report(
+                        f"  [n8n] {endpoint.url} : {endpoint.consecutive_failures} échec(s) consécutif(s), "
+                        f"instance écartée {self.settings.breaker_cooldown:.0f}s."
+                    )
+            else:
+                if threshold > 0 and endpoint.consecutive_failures >= threshold:
+                    self.report(f"  [n8n] {endpoint.url} : instance de nouveau disponible.")
+                endpoint.consecutive_failures = 0
+                endpoint.stats.answered += 1
+                endpoint.stats.total_latency += elapsed
+                if endpoint.latency is None:
+                    endpoint.latency = elapsed
+                else:
+                    endpoint.latency += LATENCY_EWMA_ALPHA * (elapsed - endpoint.latency)
+            self._cond.notify_all()
+
+
+WebhookClient = Union[N8nClient, BalancedN8nClient]
+
+
+def _retry_delay(settings: ClientSettings, attempt: int, exc: requests.RequestException) -> float:
+    """Full-jitter exponential backoff, au moins ``Retry-After`` si le serveur l'indique."""
+    ceiling = min(settings.backoff_max, settings.backoff * (2**attempt))
+    delay = random.uniform(0, ceiling)
+
+    response = getattr(exc, "response", None)
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            delay = max(delay, min(float(retry_after), settings.backoff_max))
+        except ValueError:
+            pass
+
+    return delay
+
+
+def _is_transient(exc: requests.RequestException, retry_read_timeout: bool = False) -> bool:
+    """Failure worth sending the same request again.
+
+    Connexion impossible (``ConnectTimeout`` compris) ou 429/502/503/504 : la
+    requête n'a pas été traitée. Un délai de lecture dépassé ne l'est qu'avec
+    ``retry_read_timeout`` : le webhook a pu la recevoir et la traiter.
+    """
+    if isinstance(exc, requests.ConnectionError):
+        return True
+    if isinstance(exc, requests.Timeout):
+        return retry_read_timeout
+
+    response = getattr(exc, "response", None)
+    return response is not None and response.status_code in RETRY_STATUSES
+
+
+def _is_endpoint_failure(exc: requests.RequestException) -> bool:
+    """Failure attributable to the instance (et non au livre envoyé) : transitoire, timeout ou 5xx."""
+    if _is_transient(exc, retry_read_timeout=True):
+        return True
+
+    response = getattr(exc, "response", None)
+    return response is not None and response.status_code >= 500
+
+
+def _describe(exc: requests.RequestException) -> str:
+    response = getattr(exc, "response", None)
+    if response is not None:
+        return f"HTTP {response.status_code}"
+    return type(exc).__name__
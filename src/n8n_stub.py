@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Serveur local imitant le webhook n8n, pour les tests de charge hors ligne.
+
+Implémente le contrat du workflow fourni sans n8n ni Ollama :
+
+- ``POST`` d'un payload ``process_epub`` (``filename``, ``text``, ``metadata``...)
+  ou d'un lot ``{"books": [...]}`` (webhook batch), sur n'importe quel chemin ;
+- réponse Dublin Core (``title``, ``creator``...) tirée des métadonnées OPF
+  ou du nom de fichier, sous la forme choisie : objet (``dict``), enveloppe
+  ``output``, liste, ou alternance des trois (``mixed``) ;
+- latence tirée d'une distribution (constante, uniforme, normale,
+  log-normale, exponentielle), taux d'erreur configurable ;
+- limite de concurrence : au-delà, les requêtes attendent (comme un backend
+  LLM qui sert N requêtes à la fois) ou sont refusées en 503 avec
+  ``Retry-After`` (``--reject-when-busy``) ;
+- ``GET /stats`` renvoie les compteurs (requêtes, erreurs, refus,
+  concurrence maximale atteinte, latence moyenne).
+
+Usage typique :
+    python src/n8n_stub.py --port 5679 --latency-ms 800 --latency-dist lognormal --jitter 0.5 --concurrency 2
+    N8N_WEBHOOK_PROD_URL=http://127.0.0.1:5679/webhook/epub-metadata python src/epub_metadata.py --folder ./ebooks
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import PurePath
+from typing import Any, Optional
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential")
+RESPONSE_SHAPES = ("dict", "output", "list", "mixed")
+DEFAULT_PORT = 5679
+WEBHOOK_PATH = "/webhook/epub-metadata"
+
+
+@dataclass(frozen=True)
+class StubSettings:
+    """Behaviour of the stub webhook.
+
+    ``latency`` est la latence moyenne (médiane pour ``lognormal``) en secondes ;
+    ``jitter`` règle la dispersion : ±``jitter × latency`` en ``uniform``,
+    écart-type ``jitter × latency`` en ``normal``, sigma du logarithme en
+    ``lognormal``. ``concurrency`` à 0 signifie sans limite.
+    """
+
+    latency: float = 0.0
+    latency_dist: str = "constant"
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    concurrency: int = 0
+    reject_when_busy: bool = False
+    retry_after: float = 1.0
+    shape: str = "dict"
+    seed: Optional[int] = None
+
+
+def sample_latency(settings: StubSettings, rng: random.Random) -> float:
+    """Draw one latency (secondes, jamais négative) from the configured distribution."""
+    mean = max(0.0, settings.latency)
+    spread = max(0.0, settings.jitter)
+    dist = settings.latency_dist
+
+    if mean == 0.0 or dist == "constant":
+        value = mean
+    elif dist == "uniform":
+        value = rng.uniform(mean * (1 - spread), mean * (1 + spread))
+    elif dist == "normal":
+        value = rng.gauss(mean, mean * spread)
+    elif dist == "lognormal":
+        value = rng.lognormvariate(math.log(mean), spread)
+    elif dist == "exponential":
+        value = rng.expovariate(1 / mean)
+    else:
+        raise ValueError(f"Distribution de latence inconnue : {dist}")
+
+    return max(0.0, value)
+
+
+def book_answer(payload: dict[str, Any]) -> dict[str, Any]:
+    """Dublin Core answer for one book, derived from its OPF metadata or filename."""
+    metadata = payload.get("metadata") if isinstance(payload.get("metadata"), dict) else {}
+    filename = str(payload.get("filename") or "")
+    stem = PurePath(filename).stem.replace("_", " ").strip()
+
+    answer = {
+        "filename": filename,
+        "title": metadata.get("title") or stem or "inconnu",
+        "creator": metadata.get("creator") or "inconnu",
+        "language": metadata.get("language") or "fr",
+        "identifier": payload.get("isbn") or "",
+        "explication": "Réponse simulée par n8n_stub.",
+    }
+    if "batch_id" in payload:
+        # Index du livre dans le lot, renvoyé tel quel comme le fait le workflow.
+        answer["batch_id"] = payload["batch_id"]
+    return answer
+
+
+def shape_response(answers: list[dict[str, Any]], shape: str, batch: bool) -> Any:
+    """Wrap answers in one of the response shapes accepted by the client."""
+    if shape == "output":
+        wrapped: list[Any] = [{"output": answer} for answer in answers]
+        return wrapped if batch else wrapped[0]
+    if shape == "list":
+        return answers
+    if batch:
+        return {"books": answers}
+    return answers[0]
+
+
+class StubStats:
+    """Thread-safe request counters."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.books = 0
+        self.errors = 0
+        self.rejected = 0
+        self.invalid = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.latency_total = 0.0
+
+    def enter(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self, books: int, latency: float, error: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.books += books
+            self.latency_total += latency
+            if error:
+                self.errors += 1
+
+    def count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            served = self.requests - self.rejected - self.invalid
+            return {
+                "requests": self.requests,
+                "books": self.books,
+                "errors": self.errors,
+                "rejected": self.rejected,
+                "invalid": self.invalid,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "mean_latency_ms": round(self.latency_total / served * 1000, 1) if served else 0.0,
+            }
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: N8nStub
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _StubServer
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.server.stub.stats.to_dict())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        stub = self.server.stub
+        stub.stats.count("requests")
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            stub.stats.count("invalid")
+            self._send_json(400, {"error": "JSON object expected"})
+            return
+
+        status, data, headers = stub.handle(payload)
+        self._send_json(status, data, headers)
+
+    def _send_json(self, status: int, data: Any, headers: Optional[dict[str, str]] = None) -> None:
+        encoded = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(encoded)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class N8nStub:
+    """Local stand-in for the n8n webhook, usable as a context manager.
+
+    ``start`` lance le serveur dans un thread (port 0 = port libre choisi par
+    le système) ; ``url`` et ``batch_url`` donnent les adresses à configurer
+    côté client.
+    """
+
+    def __init__(self, settings: StubSettings = StubSettings(), host: str = "127.0.0.1", port: int = 0) -> None:
+        if settings.latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Distribution de latence inconnue : {settings.latency_dist}")
+        if settings.shape not in RESPONSE_SHAPES:
+            raise ValueError(f"Forme de réponse inconnue : {settings.shape}")
+
+        self.settings = settings
+        self.stats = StubStats()
+        self._rng = random.Random(settings.seed)
+        self._rng_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(settings.concurrency) if settings.concurrency > 0 else None
+        self._responses = 0
+
+        self._server = _StubServer((host, port), _StubHandler)
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{WEBHOOK_PATH}"
+
+    @property
+    def batch_url(self) -> str:
+        return self.url + "-batch"
+
+    def start(self) -> N8nStub:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="n8n-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> N8nStub:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def handle(self, payload: dict[str, Any]) -> tuple[int, Any, dict[str, str]]:
+        """Return ``(statut, corps, en-têtes)`` for a webhook payload, after the simulated latency."""
+        settings = self.settings
+
+        if self._slots is not None and not self._slots.acquire(blocking=not settings.reject_when_busy):
+            self.stats.count("rejected")
+            return 503, {"error": "busy"}, {"Retry-After": f"{settings.retry_after:g}"}
+
+        books = payload.get("books")
+        batch = isinstance(books, list)
+        items = [book for book in books if isinstance(book, dict)] if batch else [payload]
+
+        with self._rng_lock:
+            latency = sample_latency(settings, self._rng)
+            error = self._rng.random() < settings.error_rate
+            index = self._responses
+            self._responses += 1
+
+        self.stats.enter()
+        try:
+            time.sleep(latency)
+        finally:
+            self.stats.leave(len(items), latency, error)
+            if self._slots is not None:
+                self._slots.release()
+
+        if error:
+            return settings.error_status, {"error": "erreur simulée"}, {}
+
+        shape = RESPONSE_SHAPES[index % 3] if settings.shape == "mixed" else settings.shape
+        return 200, shape_response([book_answer(item) for item in items], shape, batch), {}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Webhook n8n simulé pour les tests de charge.")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port d'écoute.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latence moyenne (médiane en lognormal), en ms.")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="constant", help="Distribution.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Dispersion de la latence (voir StubSettings).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proportion de réponses en erreur (0 à 1).")
+    parser.add_argument("--error-status", type=int, default=503, help="Statut HTTP des erreurs simulées.")
+    parser.add_argument("--concurrency", type=int, default=0, help="Requêtes traitées simultanément (0 = illimité).")
+    parser.add_argument(
+        "--reject-when-busy",
+        action="store_true",
+        help="Au-delà de --concurrency, répondre 503 + Retry-After au lieu de mettre en attente.",
+    )
+    parser.add_argument("--shape", choices=RESPONSE_SHAPES, default="dict", help="Forme des réponses.")
+    parser.add_argument("--seed", type=int, help="Graine des tirages (latence, erreurs).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    settings = StubSettings(
+        latency=args.latency_ms / 1000,
+        latency_dist=args.latency_dist,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        concurrency=args.concurrency,
+        reject_when_busy=args.reject_when_busy,
+        shape=args.shape,
+        seed=args.seed,
+    )
+    stub = N8nStub(settings, host=args.host, port=args.port)
+    print(f"Webhook simulé : {stub.url} (batch : {stub.batch_url}, compteurs : GET /stats)")
+
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(stub.stats.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
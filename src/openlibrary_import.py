@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Import des dumps OpenLibrary dans la base SQLite locale.
+
+Les dumps (``ol_dump_editions_*.txt.gz``, ``ol_dump_works_*``,
+``ol_dump_authors_*`` ou le dump complet ``ol_dump_*``) sont des fichiers TSV
+gzip : ``type  clé  révision  date  JSON``. Ils sont lus ligne par ligne
+(mémoire bornée), insérés par transactions de ``--batch-size`` lignes dans
+une base neuve aux pragmas d'import (journal désactivé, cache élargi), les
+index étant créés une fois toutes les lignes chargées. La base finale
+remplace ensuite ``openlibrary_dumps.sqlite`` de façon atomique : les
+lectures en cours ne voient jamais une base à moitié importée.
+
+Un index plein texte FTS5 (``title_search``) des titres d'édition et des
+auteurs est construit en fin d'import pour la recherche approchée de
+`catalogue.LocalCatalogue.search` (``--no-search-index`` pour l'omettre).
+
+Usage typique :
+    python src/openlibrary_import.py ol_dump_editions_latest.txt.gz \\
+        ol_dump_works_latest.txt.gz ol_dump_authors_latest.txt.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+SCHEMA_VERSION = 3
+DEFAULT_DB_PATH = Path("data/database/openlibrary_dumps.sqlite")
+DEFAULT_BATCH_SIZE = 50_000
+REPORT_INTERVAL = 10.0
+
+_TABLES = """
+CREATE TABLE authors (key TEXT NOT NULL, name TEXT NOT NULL);
+CREATE TABLE works (key TEXT NOT NULL, title TEXT NOT NULL, author_keys TEXT NOT NULL);
+CREATE TABLE editions (
+    key TEXT NOT NULL,
+    work_key TEXT,
+    title TEXT NOT NULL,
+    subtitle TEXT NOT NULL,
+    author_keys TEXT NOT NULL,
+    publishers TEXT NOT NULL,
+    publish_date TEXT NOT NULL,
+    languages TEXT NOT NULL
+);
+CREATE TABLE isbn10 (isbn TEXT NOT NULL, edition_key TEXT NOT NULL);
+CREATE TABLE isbn13 (isbn TEXT NOT NULL, edition_key TEXT NOT NULL);
+CREATE TABLE import_meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+# Créés après le chargement : maintenir un index pendant des millions d'insertions
+# coûte bien plus cher que le construire en une passe triée.
+_INDEXES = """
+CREATE INDEX authors_key ON authors (key);
+CREATE INDEX works_key ON works (key);
+CREATE INDEX editions_key ON editions (key);
+CREATE INDEX editions_work ON editions (work_key);
+CREATE INDEX isbn10_isbn ON isbn10 (isbn);
+CREATE INDEX isbn13_isbn ON isbn13 (isbn);
+"""
+
+_IMPORT_PRAGMAS = (
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA locking_mode = EXCLUSIVE",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",
+)
+
+# Séparateur des listes (clés d'auteurs, éditeurs, langues) dans une colonne TEXT.
+LIST_SEPARATOR = "|"
+
+# Titres et auteurs normalisés ; les colonnes display_* gardent la forme d'origine.
+_SEARCH_TABLE = """
+CREATE VIRTUAL TABLE title_search USING fts5(
+    title,
+    authors,
+    work_key UNINDEXED,
+    display_title UNINDEXED,
+    display_authors UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_LIGATURES = str.maketrans({"œ": "oe", "Œ": "oe", "æ": "ae", "Æ": "ae"})
+
+
+@dataclass
+class ImportStats:
+    """Row counters of an import run."""
+
+    lines: int = 0
+    rows: dict[str, int] = field(default_factory=dict)
+    invalid: int = 0
+    elapsed: float = 0.0
+
+    def add(self, table: str, count: int = 1) -> None:
+        self.rows[table] = self.rows.get(table, 0) + count
+
+    def describe(self) -> str:
+        rate = self.lines / self.elapsed if self.elapsed else 0.0
+        tables = ", ".join(f"{table} {count:,}" for table, count in sorted(self.rows.items()))
+        return f"{self.lines:,} ligne(s) en {self.elapsed:.0f}s ({rate:,.0f} lignes/s) : {tables}"
+
+
+def normalize_text(value: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace (comme ``normalize`` du workflow)."""
+    decomposed = unicodedata.normalize("NFKD", (value or "").translate(_LIGATURES))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^\w]+", " ", stripped.casefold()).split())
+
+
+def normalize_isbn(value: str) -> str:
+    """Strip separators from a dump ISBN (``978-2-07-...`` → ``9782070...``)."""
+    return "".join(char for char in str(value) if char.isdigit() or char in "Xx").upper()
+
+
+def _keys(values: Any, nested: str = "") -> str:
+    """Join OpenLibrary references (``[{"key": ...}]`` ou ``[{"author": {"key": ...}}]``)."""
+    keys: list[str] = []
+    for value in values or ():
+        if nested and isinstance(value, dict):
+            value = value.get(nested)
+        if isinstance(value, dict):
+            value = value.get("key")
+        if isinstance(value, str) and value:
+            keys.append(value)
+    return LIST_SEPARATOR.join(keys)
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, dict):
+        value = value.get("value")
+    return str(value).strip() if value else ""
+
+
+def iter_dump_lines(paths: Iterable[Path]) -> Iterator[tuple[str, str, str]]:
+    """Yield ``(type, key, json)`` from gzip (ou texte brut) dump files."""
+    for path in paths:
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                parts = line.rstrip("\n").split("\t", 4)
+                if len(parts) == 5:
+                    yield parts[0], parts[1], parts[4]
+
+
+class DumpImporter:
+    """Load dump lines into a fresh SQLite database, then swap it in."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        report: Callable[[str], None] = print,
+        report_interval: float = REPORT_INTERVAL,
+        search_index: bool = True,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.search_index = search_index
+        self.work_path = self.db_path.with_name(f"{self.db_path.name}.importing")
+        self.batch_size = max(1, batch_size)
+        self.report = report
+        self.report_interval = report_interval
+        self.stats = ImportStats()
+        self._pending: dict[str, list[tuple]] = {}
+        self._pending_rows = 0
+
+    def run(self, paths: Iterable[Path]) -> ImportStats:
+        """Import every dump file and replace ``db_path`` with the result."""
+        paths = list(paths)
+        start = time.monotonic()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        for stale in (self.work_path, Path(f"{self.work_path}-journal")):
+            if stale.exists():
+                stale.unlink()
+
+        conn = sqlite3.connect(str(self.work_path), isolation_level=None)
+        try:
+            for pragma in _IMPORT_PRAGMAS:
+                conn.execute(pragma)
+            conn.executescript(_TABLES)
+
+            last_report = start
+            conn.execute("BEGIN")
+            for kind, key, raw in iter_dump_lines(paths):
+                self.stats.lines += 1
+                self._add_line(kind, key, raw)
+
+                if self._pending_rows >= self.batch_size:
+                    self._flush(conn)
+                    conn.execute("COMMIT")
+                    conn.execute("BEGIN")
+
+                    now = time.monotonic()
+                    if now - last_report >= self.report_interval:
+                        last_report = now
+                        self.stats.elapsed = now - start
+                        self.report(f"  [OpenLibrary] {self.stats.describe()}")
+
+            self._flush(conn)
+            conn.execute("COMMIT")
+
+            self.report("  [OpenLibrary] Création des index…")
+            conn.executescript(_INDEXES)
+            if self.search_index:
+                self.report("  [OpenLibrary] Construction de l'index de recherche des titres…")
+                rows = build_search_index(conn, batch_size=self.batch_size)
+                self.stats.add("title_search", rows)
+            self._write_meta(conn, paths)
+            conn.execute("ANALYZE")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        finally:
+            conn.close()
+
+        os.replace(self.work_path, self.db_path)
+        self.stats.elapsed = time.monotonic() - start
+        return self.stats
+
+    def _add_line(self, kind: str, key: str, raw: str) -> None:
+        if kind not in {"/type/edition", "/type/work", "/type/author"}:
+            return
+
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            self.stats.invalid += 1
+            return
+
+        if kind == "/type/author":
+            name = _text(data.get("name")) or _text(data.get("personal_name"))
+            if name:
+                self._queue("authors", (key, name))
+            return
+
+        title = _text(data.get("title"))
+        if kind == "/type/work":
+            self._queue("works", (key, title, _keys(data.get("authors"), nested="author")))
+            return
+
+        works = data.get("works") or []
+        work_key = _keys(works[:1]) or None
+        self._queue(
+            "editions",
+            (
+                key,
+                work_key,
+                title,
+                _text(data.get("subtitle")),
+                _keys(data.get("authors")),
+                LIST_SEPARATOR.join(str(publisher) for publisher in data.get("publishers") or ()),
+                _text(data.get("publish_date")),
+                _keys(data.get("languages")),
+            ),
+        )
+
+        for column, length in (("isbn_10", 10), ("isbn_13", 13)):
+            for isbn in {normalize_isbn(value) for value in data.get(column) or ()}:
+                if len(isbn) == length:
+                    self._queue(f"isbn{length}", (isbn, key))
+
+    def _queue(self, table: str, row: tuple) -> None:
+        self._pending.setdefault(table, []).append(row)
+        self._pending_rows += 1
+
+    def _flush(self, conn: sqlite3.Connection) -> None:
+        for table, rows in self._pending.items():
+            placeholders = ", ".join("?" for _ in rows[0])
+            conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+            self.stats.add(table, len(rows))
+        self._pending.clear()
+        self._pending_rows = 0
+
+    def _write_meta(self, conn: sqlite3.Connection, paths: Iterable[Path]) -> None:
+        meta = {
+            "imported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sources": json.dumps([path.name for path in paths]),
+            "rows": json.dumps(self.stats.rows),
+        }
+        conn.executemany("INSERT INTO import_meta VALUES (?, ?)", meta.items())
+
+
+def build_search_index(conn: sqlite3.Connection, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """(Re)build the ``title_search`` FTS5 table; return the number of rows indexed.
+
+    Une ligne par titre d'édition distinct (après normalisation) de chaque
+    œuvre : les traductions et rééditions sous un autre titre restent
+    trouvables, les éditions identiques ne sont indexées qu'une fois. Les
+    éditions sont parcourues dans l'ordre des œuvres (index ``editions_work``),
+    la mémoire reste donc bornée à une œuvre.
+    """
+    conn.execute("DROP TABLE IF EXISTS title_search")
+    conn.executescript(_SEARCH_TABLE)
+
+    author_names: dict[str, str] = {}
+    work_authors: dict[str, str] = {}
+    current_work: object = None
+    seen: set[str] = set()
+    pending: list[tuple] = []
+    total = 0
+
+    def names(author_keys: str) -> list[str]:
+        result: list[str] = []
+        for author_key in filter(None, author_keys.split(LIST_SEPARATOR)):
+            if author_key not in author_names:
+                row = conn.execute("SELECT name FROM authors WHERE key = ? LIMIT 1", (author_key,)).fetchone()
+                author_names[author_key] = row[0] if row is not None else ""
+            if author_names[author_key] and author_names[author_key] not in result:
+                result.append(author_names[author_key])
+        return result
+
+    conn.execute("BEGIN")
+    editions = conn.execute("SELECT work_key, key, title, author_keys FROM editions ORDER BY work_key")
+    for work_key, edition_key, title, author_keys in editions:
+        if work_key != current_work:
+            current_work = work_key
+            seen.clear()
+            work_authors.clear()
+            # Le cache des noms d'auteurs est borné : vidé quand il grossit trop.
+            if len(author_names) > 100_000:
+                author_names.clear()
+
+        normalized = normalize_text(title)
+        if not normalized:
+            continue
+        if work_key:
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+
+        if not author_keys and work_key:
+            if work_key not in work_authors:
+                row = conn.execute("SELECT author_keys FROM works WHERE key = ? LIMIT 1", (work_key,)).fetchone()
+                work_authors[work_key] = row[0] if row is not None else ""
+            author_keys = work_authors[work_key]
+
+        authors = names(author_keys)
+        pending.append(
+            (
+                normalized,
+                " ".join(normalize_text(name) for name in authors),
+                work_key or edition_key,
+                title,
+                LIST_SEPARATOR.join(authors),
+            )
+        )
+
+        if len(pending) >= batch_size:
+            conn.executemany("INSERT INTO title_search VALUES (?, ?, ?, ?, ?)", pending)
+            total += len(pending)
+            pending.clear()
+
+    conn.executemany("INSERT INTO title_search VALUES (?, ?, ?, ?, ?)", pending)
+    total += len(pending)
+    conn.execute("INSERT INTO title_search (title_search) VALUES ('optimize')")
+    conn.execute("COMMIT")
+    return total
+
+
+def _default_db_path() -> Path:
+    raw = os.environ.get("OPENLIBRARY_DB", "").strip()
+    return Path(raw) if raw else DEFAULT_DB_PATH
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Import des dumps OpenLibrary (TSV gzip) dans SQLite.")
+    parser.add_argument("dumps", type=Path, nargs="+", help="Fichiers de dump (editions, works, authors).")
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=None,
+        help=f"Base SQLite à remplacer (défaut : OPENLIBRARY_DB ou {DEFAULT_DB_PATH}).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Lignes insérées par transaction (défaut : {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--no-search-index",
+        action="store_true",
+        help="Ne construit pas l'index plein texte des titres (recherche approchée).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    dumps: list[Path] = [path.expanduser() for path in args.dumps]
+
+    missing = [path for path in dumps if not path.is_file()]
+    if missing:
+        print(f"Dump introuvable : {', '.join(str(path) for path in missing)}")
+        return
+
+    db_path: Path = (args.db or _default_db_path()).expanduser()
+    importer = DumpImporter(db_path, batch_size=args.batch_size, search_index=not args.no_search_index)
+    stats = importer.run(dumps)
+    print(f"Import terminé : {stats.describe()}")
+    if stats.invalid:
+        print(f"{stats.invalid:,} ligne(s) JSON invalide(s) ignorée(s).")
+    print(f"Base : {db_path}")
+
+
+if __name__ == "__main__":
+    main()
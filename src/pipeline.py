@@ -0,0 +1,239 @@
+"""
+Pipeline à étages pour le traitement d'une bibliothèque.
+
+    source ──► extraction (pool de processus) ──► E/S (threads) ──► écriture (1 thread)
+
+Les étages sont reliés par des files bornées : quand un étage aval est saturé,
+l'étage amont se bloque (backpressure), si bien que la mémoire reste constante
+quelle que soit la taille du dossier. L'étage d'écriture remet les éléments
+dans l'ordre de la source. La profondeur de chaque file est échantillonnée
+pour identifier l'étage limitant.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+
+# Marqueur de fin de flux dans les files.
+_DONE = object()
+
+
+@dataclass
+class QueueStats:
+    """Depth samples of one inter-stage queue."""
+
+    name: str
+    capacity: int
+    samples: int = 0
+    total: int = 0
+    peak: int = 0
+    full_samples: int = 0
+
+    def sample(self, depth: int) -> None:
+        self.samples += 1
+        self.total += depth
+        self.peak = max(self.peak, depth)
+        if self.capacity and depth >= self.capacity:
+            self.full_samples += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.samples if self.samples else 0.0
+
+    def describe(self) -> str:
+        line = f"{self.name:<16} moyenne {self.mean:6.1f} max {self.peak:<4}"
+        if not self.capacity:
+            return line
+
+        full_pct = (self.full_samples / self.samples * 100) if self.samples else 0.0
+        return f"{line} capacité {self.capacity:<4} pleine {full_pct:5.1f}% du temps"
+
+
+@dataclass
+class PipelineStats:
+    """Counters and queue depth statistics of a pipeline run."""
+
+    submitted: int = 0
+    written: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    queues: dict[str, QueueStats] = field(default_factory=dict)
+
+    def describe(self) -> str:
+        rate = self.written / self.elapsed if self.elapsed else 0.0
+        lines = [f"Pipeline : {self.written} livre(s) en {self.elapsed:.1f}s ({rate:.2f}/s), {self.errors} erreur(s)"]
+        lines.extend(f"  {stats.describe()}" for stats in self.queues.values())
+        return "\n".join(lines)
+
+
+class StagedPipeline:
+    """Extract / I-O / write pipeline connected by bounded queues.
+
+    - ``extract_fn(item)`` tourne dans un pool de processus (doit être picklable) ;
+    - ``io_fn(item, extracted)`` tourne dans ``io_workers`` threads ;
+    - ``write_fn(item, result, error)`` tourne dans un seul thread, dans l'ordre de la source.
+
+    Une exception levée par ``extract_fn`` ou ``io_fn`` est transmise à
+    ``write_fn`` via ``error`` (``result`` vaut alors ``None``).
+    """
+
+    def __init__(
+        self,
+        extract_fn: Callable[[Any], Any],
+        io_fn: Callable[[Any, Any], Any],
+        write_fn: Callable[[Any, Any, Optional[BaseException]], None],
+        extract_workers: int = 1,
+        io_workers: int = 1,
+        queue_size: int = 0,
+        stats_interval: float = 0.0,
+        report: Callable[[str], None] = print,
+    ) -> None:
+        self.extract_fn = extract_fn
+        self.io_fn = io_fn
+        self.write_fn = write_fn
+        self.extract_workers = max(1, extract_workers)
+        self.io_workers = max(1, io_workers)
+        self.queue_size = queue_size or 2 * max(self.extract_workers, self.io_workers)
+        self.stats_interval = stats_interval
+        self.report = report
+
+        # Extractions soumises (futures) en attente d'un thread d'E/S.
+        self._extracted: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        # Résultats d'E/S en attente d'écriture.
+        self._results: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._reorder: dict[int, tuple[Any, Any, Optional[BaseException]]] = {}
+        self._io_busy = 0
+        self._lock = threading.Lock()
+
+        self.stats = PipelineStats(
+            queues={
+                "extraction→E/S": QueueStats("extraction→E/S", self.queue_size),
+                "E/S en cours": QueueStats("E/S en cours", self.io_workers),
+                "E/S→écriture": QueueStats("E/S→écriture", self.queue_size),
+                "réordonnancement": QueueStats("réordonnancement", 0),
+            }
+        )
+
+    def depths(self) -> dict[str, int]:
+        """Current depth of every queue."""
+        with self._lock:
+            io_busy = self._io_busy
+            reorder = len(self._reorder)
+        return {
+            "extraction→E/S": self._extracted.qsize(),
+            "E/S en cours": io_busy,
+            "E/S→écriture": self._results.qsize(),
+            "réordonnancement": reorder,
+        }
+
+    def run(self, items: Iterable[Any]) -> PipelineStats:
+        """Feed ``items`` through the pipeline and wait until everything is written."""
+        start = time.monotonic()
+        stop_sampling = threading.Event()
+
+        io_threads = [
+            threading.Thread(target=self._io_loop, name=f"pipeline-io-{n}", daemon=True)
+            for n in range(self.io_workers)
+        ]
+        writer = threading.Thread(target=self._write_loop, name="pipeline-writer", daemon=True)
+        sampler = threading.Thread(target=self._sample_loop, args=(stop_sampling,), name="pipeline-stats", daemon=True)
+
+        for thread in (*io_threads, writer, sampler):
+            thread.start()
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.extract_workers) as executor:
+                for seq, item in enumerate(items):
+                    future = executor.submit(self.extract_fn, item)
+                    self._extracted.put((seq, item, future))
+                    self.stats.submitted += 1
+        finally:
+            for _ in io_threads:
+                self._extracted.put(_DONE)
+            for thread in io_threads:
+                thread.join()
+            self._results.put(_DONE)
+            writer.join()
+            stop_sampling.set()
+            sampler.join()
+            self.stats.elapsed = time.monotonic() - start
+
+        return self.stats
+
+    def _io_loop(self) -> None:
+        while True:
+            entry = self._extracted.get()
+            if entry is _DONE:
+                return
+
+            seq, item, future = entry
+            result: Any = None
+            error: Optional[BaseException] = None
+
+            try:
+                extracted = future.result()
+                with self._lock:
+                    self._io_busy += 1
+                try:
+                    result = self.io_fn(item, extracted)
+                finally:
+                    with self._lock:
+                        self._io_busy -= 1
+            except Exception as exc:
+                error = exc
+
+            self._results.put((seq, item, result, error))
+
+    def _write_loop(self) -> None:
+        next_seq = 0
+
+        while True:
+            entry = self._results.get()
+            if entry is _DONE:
+                break
+
+            seq, item, result, error = entry
+            with self._lock:
+                self._reorder[seq] = (item, result, error)
+
+            while True:
+                with self._lock:
+                    ready = self._reorder.pop(next_seq, None)
+                if ready is None:
+                    break
+                self._write(*ready)
+                next_seq += 1
+
+        # Les éléments restants (ne devrait pas arriver) sont écrits dans l'ordre.
+        for seq in sorted(self._reorder):
+            self._write(*self._reorder.pop(seq))
+
+    def _write(self, item: Any, result: Any, error: Optional[BaseException]) -> None:
+        if error is not None:
+            self.stats.errors += 1
+        try:
+            self.write_fn(item, result, error)
+        except Exception as exc:
+            self.stats.errors += 1
+            self.report(f"  [Pipeline] Erreur d'écriture : {exc}")
+        self.stats.written += 1
+
+    def _sample_loop(self, stop: threading.Event) -> None:
+        last_report = time.monotonic()
+        period = min(self.stats_interval, 0.5) if self.stats_interval else 0.5
+
+        while not stop.wait(period):
+            depths = self.depths()
+            for name, depth in depths.items():
+                self.stats.queues[name].sample(depth)
+
+            now = time.monotonic()
+            if self.stats_interval and now - last_report >= self.stats_interval:
+                last_report = now
+                summary = ", ".join(f"{name}={depth}" for name, depth in depths.items())
+                self.report(f"[Pipeline] écrits {self.stats.written}/{self.stats.submitted} | {summary}")
@@ -0,0 +1,144 @@
+"""
+Cache local des réponses n8n.
+
+Beaucoup de fichiers sont le même livre sous un autre emballage
+(re-téléchargement, autre habillage d'éditeur). La clé du cache est une
+empreinte des éléments d'identification (ISBN normalisé, titre et auteur OPF,
+début du texte) : un second fichier identique sur ces points réutilise la
+réponse déjà obtenue au lieu de relancer la chaîne n8n / LLM.
+
+Le cache est borné en nombre d'entrées (éviction LRU) et les entrées expirent
+après une durée de vie configurable.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Optional
+
+# Nombre de caractères du texte pris en compte quand le livre n'a pas d'ISBN.
+CACHE_TEXT_PREFIX_CHARS = 1000
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def _normalize_text(value: str) -> str:
+    """Casefold, strip accents and punctuation, collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    cleaned = re.sub(r"[^\w]+", " ", stripped.casefold())
+    return " ".join(cleaned.split())
+
+
+def identification_key(isbn: str, title: str, creator: str, text: str) -> str:
+    """Stable digest of the identification-relevant inputs of a book.
+
+    Avec un ISBN, celui-ci et le couple titre/auteur OPF suffisent : le texte
+    (couvertures, pages d'éditeur) varie d'un emballage à l'autre. Sans ISBN,
+    le début du texte normalisé est ajouté pour éviter les collisions entre
+    livres aux métadonnées vides ou génériques.
+    """
+    parts = [isbn.strip().upper(), _normalize_text(title), _normalize_text(creator)]
+    if not parts[0]:
+        parts.append(_normalize_text(text[:CACHE_TEXT_PREFIX_CHARS]))
+
+    encoded = json.dumps(parts, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of n8n responses with TTL, stored in SQLite."""
+
+    def __init__(self, db_path: Path, max_entries: int = 100_000, ttl: float = 0.0) -> None:
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Return the cached response for ``key`` (``None`` if absent or expired)."""
+        now = time.time()
+
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+
+            if row is not None and self.ttl > 0 and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count -= 1
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, key: str, response: dict[str, Any]) -> None:
+        """Store a response and evict the least recently used entries beyond ``max_entries``."""
+        now = time.time()
+
+        with self._lock, self._conn:
+            exists = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                """
+                INSERT INTO responses (key, response, created_at, last_used) VALUES (?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    response = excluded.response,
+                    created_at = excluded.created_at,
+                    last_used = excluded.last_used
+                """,
+                (key, json.dumps(response, ensure_ascii=False), now, now),
+            )
+
+            if exists is None:
+                self._count += 1
+
+            if self.max_entries > 0 and self._count > self.max_entries:
+                excess = self._count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+                self._count -= excess
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Index SQLite du log JSONL des résultats.
+
+Le log (`result_log.ResultLog`) est ingéré de façon incrémentale : pour chaque
+fichier (log courant et fichiers renommés par la rotation), l'inode et la
+position déjà lue sont mémorisés, si bien qu'une nouvelle ingestion ne lit que
+les octets ajoutés depuis la précédente. Le dernier résultat de chaque livre
+est indexé par chemin, nom de fichier, ISBN, titre et auteur.
+
+Usage typique :
+    python src/result_index.py stats
+    python src/result_index.py find --auteur inconnu
+    python src/result_index.py find --filename "mon livre.epub"
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+SCHEMA_VERSION = 1
+DEFAULT_INDEX_FILE = "sortbook_results.sqlite"
+UNKNOWN = "inconnu"
+INGEST_CHUNK_SIZE = 4 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    inode INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    path TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    isbn TEXT NOT NULL DEFAULT '',
+    titre TEXT NOT NULL DEFAULT '',
+    auteur TEXT NOT NULL DEFAULT '',
+    explication TEXT NOT NULL DEFAULT '',
+    cache TEXT NOT NULL DEFAULT '',
+    duplicate_of TEXT,
+    records INTEGER NOT NULL DEFAULT 1,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_filename ON results (filename);
+CREATE INDEX IF NOT EXISTS results_isbn ON results (isbn);
+CREATE INDEX IF NOT EXISTS results_titre ON results (titre COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS results_auteur ON results (auteur COLLATE NOCASE);
+"""
+
+_UPSERT = """
+INSERT INTO results (path, filename, isbn, titre, auteur, explication, cache, duplicate_of, record)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (path) DO UPDATE SET
+    filename = excluded.filename,
+    isbn = excluded.isbn,
+    titre = excluded.titre,
+    auteur = excluded.auteur,
+    explication = excluded.explication,
+    cache = excluded.cache,
+    duplicate_of = excluded.duplicate_of,
+    records = results.records + 1,
+    record = excluded.record
+"""
+
+# Colonnes interrogeables par `find`.
+SEARCH_COLUMNS = ("path", "filename", "isbn", "titre", "auteur")
+
+
+@dataclass
+class IngestStats:
+    """Outcome of one ingestion pass."""
+
+    files: int = 0
+    bytes_read: int = 0
+    records: int = 0
+    invalid: int = 0
+    elapsed: float = 0.0
+
+    def describe(self) -> str:
+        return (
+            f"{self.records} record(s) ingéré(s) depuis {self.files} fichier(s) "
+            f"({self.bytes_read / 1_048_576:.1f} Mo, {self.invalid} ligne(s) invalide(s)) en {self.elapsed:.2f}s"
+        )
+
+
+def log_files(log_path: Path) -> list[Path]:
+    """Rotated log files (plus anciens d'abord) followed by the current one."""
+    rotated = sorted(
+        candidate
+        for candidate in log_path.parent.glob(f"{log_path.name}.*")
+        if candidate.is_file() and not candidate.name.endswith(".tmp")
+    )
+    current = [log_path] if log_path.is_file() else []
+    return rotated + current
+
+
+def _isbn_of(record: dict[str, Any]) -> str:
+    if record.get("isbn"):
+        return str(record["isbn"])
+    payload = record.get("payload")
+    return str(payload.get("isbn") or "") if isinstance(payload, dict) else ""
+
+
+class ResultIndex:
+    """Incrementally ingested SQLite index of the result log."""
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.commit()
+
+    def __enter__(self) -> ResultIndex:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def ingest(self, log_path: Path) -> IngestStats:
+        """Read the bytes appended to the log (et aux fichiers renommés) since the last pass."""
+        stats = IngestStats()
+        start = time.monotonic()
+
+        with self._lock:
+            for path in log_files(Path(log_path)):
+                self._ingest_file(path, stats)
+
+        stats.elapsed = time.monotonic() - start
+        return stats
+
+    def _ingest_file(self, path: Path, stats: IngestStats) -> None:
+        try:
+            handle = open(path, "rb")
+        except OSError:
+            return
+
+        with handle:
+            file_stat = os.fstat(handle.fileno())
+            row = self._conn.execute("SELECT offset FROM sources WHERE inode = ?", (file_stat.st_ino,)).fetchone()
+            offset = row[0] if row is not None else 0
+            if offset > file_stat.st_size:
+                # Fichier tronqué ou inode réutilisé : relecture complète.
+                offset = 0
+            if offset == file_stat.st_size:
+                return
+
+            stats.files += 1
+            handle.seek(offset)
+            pending = b""
+
+            while True:
+                chunk = handle.read(INGEST_CHUNK_SIZE)
+                if not chunk:
+                    break
+                stats.bytes_read += len(chunk)
+
+                data = pending + chunk
+                end = data.rfind(b"\n")
+                if end < 0:
+                    pending = data
+                    continue
+
+                pending = data[end + 1 :]
+                rows = self._parse_lines(data[: end + 1], stats)
+
+                with self._conn:
+                    self._conn.executemany(_UPSERT, rows)
+                    self._conn.execute(
+                        """
+                        INSERT INTO sources (inode, name, offset, updated_at) VALUES (?, ?, ?, ?)
+                        ON CONFLICT (inode) DO UPDATE SET
+                            name = excluded.name, offset = excluded.offset, updated_at = excluded.updated_at
+                        """,
+                        (file_stat.st_ino, str(path), handle.tell() - len(pending), time.time()),
+                    )
+
+    @staticmethod
+    def _parse_lines(data: bytes, stats: IngestStats) -> list[tuple]:
+        rows: list[tuple] = []
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                stats.invalid += 1
+                continue
+            if not isinstance(record, dict) or not record.get("path"):
+                stats.invalid += 1
+                continue
+
+            stats.records += 1
+            rows.append(
+                (
+                    str(record["path"]),
+                    str(record.get("filename") or Path(str(record["path"])).name),
+                    _isbn_of(record),
+                    str(record.get("titre") or ""),
+                    str(record.get("auteur") or ""),
+                    str(record.get("explication") or ""),
+                    str(record.get("cache") or ""),
+                    record.get("duplicate_of"),
+                    line.decode("utf-8", errors="replace"),
+                )
+            )
+        return rows
+
+    def has_result(self, path: Path) -> bool:
+        """Return True if ``path`` (tel que loggé ou en chemin absolu) has a logged result."""
+        keys = {str(path), os.path.abspath(path)}
+        placeholders = ", ".join("?" for _ in keys)
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT 1 FROM results WHERE path IN ({placeholders}) LIMIT 1", tuple(keys))
+            return cursor.fetchone() is not None
+
+    def find(self, limit: int = 100, like: bool = False, **criteria: str) -> list[dict[str, Any]]:
+        """Latest logged record of the books matching every criterion.
+
+        Les critères portent sur `SEARCH_COLUMNS` ; ``titre``/``auteur`` sont
+        comparés sans tenir compte de la casse. Avec ``like``, les valeurs sont
+        des motifs SQL ``LIKE`` (``%`` et ``_``).
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+        for column, value in criteria.items():
+            if column not in SEARCH_COLUMNS:
+                raise ValueError(f"Critère inconnu : {column}")
+            collate = " COLLATE NOCASE" if column in {"titre", "auteur"} else ""
+            clauses.append(f"{column}{collate} {'LIKE' if like else '='} ?")
+            params.append(value)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT record FROM results {where} LIMIT ?", (*params, limit)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def stats(self) -> dict[str, int]:
+        """Aggregate counters over the latest result of every book."""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT
+                    COUNT(*),
+                    COALESCE(SUM(records), 0),
+                    COALESCE(SUM(isbn != ''), 0),
+                    COALESCE(SUM(titre = ? OR titre = ''), 0),
+                    COALESCE(SUM(auteur = ? OR auteur = ''), 0),
+                    COALESCE(SUM(cache = 'hit'), 0),
+                    COALESCE(SUM(duplicate_of IS NOT NULL), 0)
+                FROM results
+                """,
+                (UNKNOWN, UNKNOWN),
+            ).fetchone()
+
+        keys = ("livres", "records", "avec_isbn", "titre_inconnu", "auteur_inconnu", "cache", "doublons")
+        return dict(zip(keys, row))
+
+
+def _default_log_path() -> Path:
+    log_dir = Path(os.environ.get("LOG_DIR") or os.getcwd())
+    return log_dir / os.environ.get("EPUB_LOG_FILE", "n8n_response.json")
+
+
+def _default_index_path() -> Path:
+    raw = os.environ.get("EPUB_RESULT_INDEX", "").strip()
+    if raw and raw.lower() not in {"0", "false", "no", "non", "off"}:
+        return Path(raw)
+    return Path(os.environ.get("LOG_DIR") or os.getcwd()) / DEFAULT_INDEX_FILE
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Index et statistiques du log JSONL des résultats n8n.")
+    parser.add_argument("--log", type=Path, default=None, help="Log JSONL (défaut : $LOG_DIR/$EPUB_LOG_FILE).")
+    parser.add_argument("--db", type=Path, default=None, help="Index SQLite (défaut : EPUB_RESULT_INDEX).")
+    parser.add_argument("--no-ingest", action="store_true", help="Interroge l'index sans lire les nouvelles lignes.")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("ingest", help="Ingère les nouvelles lignes du log.")
+    commands.add_parser("stats", help="Statistiques agrégées.")
+
+    find = commands.add_parser("find", help="Recherche des livres par critère.")
+    for column in SEARCH_COLUMNS:
+        find.add_argument(f"--{column}", default=None)
+    find.add_argument("--like", action="store_true", help="Valeurs interprétées comme motifs LIKE (%%, _).")
+    find.add_argument("--limit", type=int, default=100)
+    find.add_argument("--json", action="store_true", help="Affiche les records JSON complets.")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    log_path: Path = (args.log or _default_log_path()).expanduser()
+    db_path: Path = (args.db or _default_index_path()).expanduser()
+
+    with ResultIndex(db_path) as index:
+        if not args.no_ingest or args.command == "ingest":
+            print(index.ingest(log_path).describe())
+
+        if args.command == "stats":
+            stats = index.stats()
+            total = stats["livres"] or 1
+            for key, value in stats.items():
+                share = "" if key in {"livres", "records"} else f" ({value / total * 100:.1f}%)"
+                print(f"  {key:<15} {value:>10,}{share}")
+
+        elif args.command == "find":
+            criteria = {column: getattr(args, column) for column in SEARCH_COLUMNS if getattr(args, column)}
+            records = index.find(limit=args.limit, like=args.like, **criteria)
+            for record in records:
+                if args.json:
+                    print(json.dumps(record, ensure_ascii=False))
+                else:
+                    print(f"{record.get('path')}\n  {record.get('titre')} — {record.get('auteur')}")
+            print(f"{len(records)} résultat(s).")
+
+
+if __name__ == "__main__":
+    main()
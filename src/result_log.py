@@ -0,0 +1,191 @@
+"""
+Journal JSONL des résultats n8n.
+
+- Le fichier reste ouvert pendant toute l'exécution (écriture bufferisée) ;
+  les données sont vidées et synchronisées sur disque (``fsync``) à intervalle
+  régulier et à la fermeture.
+- Profils de journalisation :
+    * ``full``    : record complet, payload inclus tel quel ;
+    * ``compact`` : les parties volumineuses du payload (texte, pages HTML
+      brutes) sont stockées hors ligne dans ``blobs/`` (fichiers adressés par
+      leur SHA-256, compressés en gzip) et remplacées par une référence
+      ``{"$blob": "<sha256>", "bytes": N}`` ;
+    * ``minimal`` : payload omis, seul l'ISBN envoyé est conservé.
+- Rotation par taille : le fichier courant est renommé
+  ``<nom>.<AAAAMMJJ-HHMMSS>`` puis un nouveau fichier est ouvert.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+PROFILE_FULL = "full"
+PROFILE_COMPACT = "compact"
+PROFILE_MINIMAL = "minimal"
+LOG_PROFILES = (PROFILE_FULL, PROFILE_COMPACT, PROFILE_MINIMAL)
+
+BLOB_KEY = "$blob"
+DEFAULT_BLOB_MIN_BYTES = 2048
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+class ResultLog:
+    """Buffered, size-rotated JSONL writer with out-of-line blobs."""
+
+    def __init__(
+        self,
+        path: Path,
+        profile: str = PROFILE_FULL,
+        max_bytes: int = 0,
+        fsync_interval: float = 5.0,
+        blob_dir: Optional[Path] = None,
+        blob_gzip: bool = True,
+        blob_min_bytes: int = DEFAULT_BLOB_MIN_BYTES,
+    ) -> None:
+        if profile not in LOG_PROFILES:
+            raise ValueError(f"Profil de log inconnu : {profile} (attendu : {', '.join(LOG_PROFILES)})")
+
+        self.path = Path(path)
+        self.profile = profile
+        self.max_bytes = max_bytes
+        self.fsync_interval = fsync_interval
+        self.blob_dir = Path(blob_dir) if blob_dir is not None else self.path.parent / "blobs"
+        self.blob_gzip = blob_gzip
+        self.blob_min_bytes = blob_min_bytes
+
+        self._lock = threading.Lock()
+        self._handle = None
+        self._size = 0
+        self._last_sync = time.monotonic()
+
+    def __enter__(self) -> ResultLog:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Apply the profile to ``record`` and append it as one JSON line."""
+        record = self._apply_profile(record)
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+        with self._lock:
+            if self._handle is None:
+                self._open()
+            elif self.max_bytes > 0 and self._size > 0 and self._size + len(line) > self.max_bytes:
+                self._rotate()
+
+            self._handle.write(line)
+            self._size += len(line)
+
+            if self.fsync_interval > 0 and time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def flush(self) -> None:
+        """Flush buffered records and fsync them."""
+        with self._lock:
+            if self._handle is not None:
+                self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._sync()
+                self._handle.close()
+                self._handle = None
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = open(self.path, "ab", buffering=DEFAULT_BUFFER_SIZE)
+        self._size = self._handle.tell()
+        self._last_sync = time.monotonic()
+
+    def _sync(self) -> None:
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._last_sync = time.monotonic()
+
+    def _rotate(self) -> None:
+        self._sync()
+        self._handle.close()
+        self._handle = None
+
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        target = self.path.with_name(f"{self.path.name}.{stamp}")
+        suffix = 1
+        while target.exists():
+            target = self.path.with_name(f"{self.path.name}.{stamp}-{suffix}")
+            suffix += 1
+
+        os.replace(self.path, target)
+        self._open()
+
+    def _apply_profile(self, record: dict[str, Any]) -> dict[str, Any]:
+        payload = record.get("payload")
+        if self.profile == PROFILE_FULL or not isinstance(payload, dict):
+            return record
+
+        record = dict(record)
+        if self.profile == PROFILE_MINIMAL:
+            del record["payload"]
+            record.setdefault("isbn", payload.get("isbn", ""))
+            return record
+
+        compact: dict[str, Any] = {}
+        for key, value in payload.items():
+            if isinstance(value, (str, list, dict)):
+                encoded = json.dumps(value, ensure_ascii=False).encode("utf-8")
+                if len(encoded) >= self.blob_min_bytes:
+                    value = {BLOB_KEY: self._store_blob(encoded), "bytes": len(encoded)}
+            compact[key] = value
+
+        record["payload"] = compact
+        return record
+
+    def _store_blob(self, encoded: bytes) -> str:
+        """Write ``encoded`` under its SHA-256 (une seule fois par contenu) and return the digest."""
+        digest = hashlib.sha256(encoded).hexdigest()
+        target = blob_path(self.blob_dir, digest, self.blob_gzip)
+        if target.exists():
+            return digest
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        data = gzip.compress(encoded, compresslevel=6, mtime=0) if self.blob_gzip else encoded
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+        return digest
+
+
+def blob_path(blob_dir: Path, digest: str, compressed: bool = True) -> Path:
+    """Location of a blob: ``<blob_dir>/<2 premiers caractères>/<sha256>.json[.gz]``."""
+    return blob_dir / digest[:2] / (f"{digest}.json.gz" if compressed else f"{digest}.json")
+
+
+def load_blob(blob_dir: Path, digest: str) -> Any:
+    """Read back a blob written by `ResultLog` (compressé ou non)."""
+    compressed = blob_path(blob_dir, digest, compressed=True)
+    if compressed.exists():
+        return json.loads(gzip.decompress(compressed.read_bytes()))
+    return json.loads(blob_path(blob_dir, digest, compressed=False).read_bytes())
+
+
+def expand_record(record: dict[str, Any], blob_dir: Path) -> dict[str, Any]:
+    """Return ``record`` with its blob references replaced by their content."""
+    payload = record.get("payload")
+    if not isinstance(payload, dict):
+        return record
+
+    expanded = dict(record)
+    expanded["payload"] = {
+        key: load_blob(blob_dir, value[BLOB_KEY]) if isinstance(value, dict) and BLOB_KEY in value else value
+        for key, value in payload.items()
+    }
+    return expanded
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Répartition déterministe d'une bibliothèque entre plusieurs machines.
+
+Avec ``--shard I/N`` (1 ≤ I ≤ N), un processus ne traite que les fichiers
+dont l'empreinte BLAKE2b du chemin relatif au dossier parcouru tombe dans
+la part ``I`` : N machines lancées avec ``1/N`` ... ``N/N`` couvrent toute la
+bibliothèque sans se coordonner ni traiter deux fois le même livre. La
+répartition ne dépend que du chemin relatif (pas du point de montage ni du
+système).
+
+Chaque part écrit ses propres fichiers d'état (log JSONL, manifeste, cache,
+index) suffixés par ``.shardIofN`` ; la commande ``merge`` les regroupe :
+
+    python src/sharding.py merge --logs log/n8n_response.shard*of4.json --output log/n8n_response.json \\
+        --manifests log/sortbook_manifest.shard*of4.sqlite --manifest-output log/sortbook_manifest.sqlite
+
+Les logs (et les résultats JSONL d'``isbn_scan.py``) sont dédupliqués par
+chemin en gardant la dernière ligne ; les manifestes par chemin en gardant
+l'entrée la plus récente.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from manifest import Manifest
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Part ``index`` (à partir de 1) of a library split into ``count`` parts."""
+
+    index: int
+    count: int
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    @property
+    def suffix(self) -> str:
+        return f"shard{self.index}of{self.count}"
+
+    def contains(self, path: Path, root: Path) -> bool:
+        """Return True if ``path`` (sous ``root``) belongs to this part."""
+        return shard_of(relative_key(path, root), self.count) == self.index
+
+
+def parse_shard(value: str) -> Shard:
+    """Parse ``"I/N"`` (1 ≤ I ≤ N)."""
+    try:
+        index_text, count_text = value.strip().split("/")
+        index, count = int(index_text), int(count_text)
+    except ValueError:
+        raise ValueError(f"Part invalide : {value!r} (attendu : I/N, par exemple 2/4)") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Part invalide : {value!r} (il faut 1 ≤ I ≤ N)")
+    return Shard(index, count)
+
+
+def shard_argument(value: str) -> Shard:
+    """``argparse`` type for ``--shard``."""
+    try:
+        return parse_shard(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+
+
+def relative_key(path: Path, root: Path) -> str:
+    """Path of ``path`` relative to ``root``, with ``/`` separators (identique sur tous les systèmes)."""
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+
+def shard_of(key: str, count: int) -> int:
+    """Part (1 à ``count``) of a relative path, from its BLAKE2b digest."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+
+def shard_path(path: Path, shard: Shard) -> Path:
+    """Per-part state file: ``log/n8n_response.json`` → ``log/n8n_response.shard2of4.json``."""
+    return path.with_name(f"{path.stem}.{shard.suffix}{path.suffix}")
+
+
+def merge_logs(sources: Iterable[Path], output: Path) -> tuple[int, int]:
+    """Merge JSONL logs into ``output``, one line per ``path`` (la dernière l'emporte).
+
+    Deux passes en flux : la première ne retient, pour chaque chemin, que la
+    position (fichier, décalage) de sa dernière ligne ; la seconde recopie les
+    lignes retenues dans l'ordre des fichiers. La mémoire ne dépend donc que du
+    nombre de livres, pas de la taille des logs. Les lignes sans chemin (ou
+    illisibles) sont conservées telles quelles. Renvoie ``(lignes lues, lignes écrites)``.
+    """
+    sources = list(sources)
+    last_line: dict[str, tuple[int, int]] = {}
+    kept: set[tuple[int, int]] = set()
+    read = 0
+
+    for number, source in enumerate(sources):
+        for offset, line in _iter_lines(source):
+            read += 1
+            try:
+                key = json.loads(line).get("path")
+            except (ValueError, AttributeError):
+                key = None
+            if isinstance(key, str) and key:
+                last_line[key] = (number, offset)
+            else:
+                kept.add((number, offset))
+    kept.update(last_line.values())
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    temporary = output.with_name(output.name + ".tmp")
+    with open(temporary, "wb") as handle:
+        for number, source in enumerate(sources):
+            for offset, line in _iter_lines(source):
+                if (number, offset) in kept:
+                    handle.write(line if line.endswith(b"\n") else line + b"\n")
+    os.replace(temporary, output)
+    return read, len(kept)
+
+
+def _iter_lines(path: Path) -> Iterator[tuple[int, bytes]]:
+    """Yield ``(décalage, ligne)`` for every non-blank line of ``path``."""
+    offset = 0
+    with open(path, "rb") as handle:
+        for line in handle:
+            if line.strip():
+                yield offset, line
+            offset += len(line)
+
+
+def merge_manifests(sources: Iterable[Path], output: Path) -> int:
+    """Merge manifests into ``output`` (créé si besoin) ; return the number of entries."""
+    with Manifest(output) as merged:
+        for source in sources:
+            merged.merge(source)
+        return sum(merged.counts().values())
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Outils de répartition d'une bibliothèque entre plusieurs machines.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    merge = commands.add_parser("merge", help="Regroupe les logs et manifestes des différentes parts.")
+    merge.add_argument(
+        "--logs", type=Path, nargs="+", default=[], help="Logs JSONL des parts (ou résultats d'isbn_scan.py)."
+    )
+    merge.add_argument("--output", type=Path, help="Log JSONL fusionné.")
+    merge.add_argument("--manifests", type=Path, nargs="+", default=[], help="Manifestes SQLite des parts.")
+    merge.add_argument("--manifest-output", type=Path, help="Manifeste SQLite fusionné.")
+
+    which = commands.add_parser("which", help="Indique la part de chaque fichier.")
+    which.add_argument("--root", type=Path, required=True, help="Dossier parcouru par les agents.")
+    which.add_argument("--count", type=int, required=True, help="Nombre de parts.")
+    which.add_argument("paths", type=Path, nargs="+", help="Fichiers à situer.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    if args.command == "which":
+        for path in args.paths:
+            print(f"{shard_of(relative_key(path, args.root), args.count)}/{args.count}  {path}")
+        return
+
+    if args.logs and args.output is None or args.manifests and args.manifest_output is None:
+        print("--logs nécessite --output et --manifests nécessite --manifest-output.")
+        return
+    if args.logs:
+        read, written = merge_logs(args.logs, args.output)
+        print(f"Logs : {read} lignes lues dans {len(args.logs)} fichiers, {written} écrites dans {args.output}.")
+    if args.manifests:
+        count = merge_manifests(args.manifests, args.manifest_output)
+        print(f"Manifestes : {len(args.manifests)} fusionnés, {count} entrées dans {args.manifest_output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Per-stage timing of book processing.
+
+Chaque livre porte un dictionnaire ``étape -> secondes`` rempli avec
+``timed`` au fil du traitement (ouverture du ZIP, extraction du texte, OPF,
+scan d'ISBN, webhook, écriture du log). Les durées sont écrites dans le log
+JSONL (``timings_ms``) et agrégées par ``TimingStats`` pour le résumé de fin
+d'exécution : nombre, moyenne et percentiles p50/p95/p99 par étape.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from typing import Iterator, Mapping
+
+STAGE_ZIP_OPEN = "zip_open"
+STAGE_TEXT = "text"
+STAGE_OPF = "opf"
+STAGE_RAW_PAGES = "raw_pages"
+STAGE_ISBN_SCAN = "isbn_scan"
+STAGE_CATALOGUE = "catalogue"
+STAGE_CACHE = "cache"
+STAGE_WEBHOOK = "webhook"
+STAGE_LOG_WRITE = "log_write"
+
+# Ordre d'affichage du résumé (les étapes inconnues suivent, par ordre alphabétique).
+STAGES = (
+    STAGE_ZIP_OPEN,
+    STAGE_TEXT,
+    STAGE_OPF,
+    STAGE_RAW_PAGES,
+    STAGE_ISBN_SCAN,
+    STAGE_CATALOGUE,
+    STAGE_CACHE,
+    STAGE_WEBHOOK,
+    STAGE_LOG_WRITE,
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+@contextmanager
+def timed(timings: dict[str, float], stage: str) -> Iterator[None]:
+    """Add the duration of the ``with`` block to ``timings[stage]``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def to_milliseconds(timings: Mapping[str, float]) -> dict[str, float]:
+    """Return ``timings`` in milliseconds, rounded to the microsecond (champ ``timings_ms`` du log)."""
+    return {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()}
+
+
+def percentile(sorted_values: list[float], rank: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = max(0, math.ceil(rank / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class TimingStats:
+    """Aggregate per-stage durations over a run (thread-safe).
+
+    Les durées sont conservées en ``array('d')`` (8 octets par mesure) pour
+    calculer des percentiles exacts en fin d'exécution.
+    """
+
+    def __init__(self) -> None:
+        self._samples: dict[str, array] = {}
+        self._lock = threading.Lock()
+
+    def add(self, timings: Mapping[str, float]) -> None:
+        with self._lock:
+            for stage, seconds in timings.items():
+                self._samples.setdefault(stage, array("d")).append(seconds)
+
+    def __bool__(self) -> bool:
+        return bool(self._samples)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Return ``{étape: {count, total_s, mean_ms, p50_ms, p95_ms, p99_ms}}`` in display order."""
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items()}
+
+        ordered = [stage for stage in STAGES if stage in samples]
+        ordered += sorted(stage for stage in samples if stage not in STAGES)
+
+        summary: dict[str, dict[str, float]] = {}
+        for stage in ordered:
+            values = samples[stage]
+            total = math.fsum(values)
+            row = {
+                "count": len(values),
+                "total_s": round(total, 3),
+                "mean_ms": round(total / len(values) * 1000, 3),
+            }
+            for rank in PERCENTILES:
+                row[f"p{rank}_ms"] = round(percentile(values, rank) * 1000, 3)
+            summary[stage] = row
+
+        return summary
+
+    def format_lines(self) -> list[str]:
+        """Return the summary as aligned text lines (résumé de fin d'exécution)."""
+        header = f"  {'étape':<11} {'nb':>7} {'total s':>9} {'moy. ms':>9}" + "".join(
+            f" {f'p{rank} ms':>9}" for rank in PERCENTILES
+        )
+        lines = ["Durées par étape :", header]
+        for stage, row in self.summary().items():
+            lines.append(
+                f"  {stage:<11} {row['count']:>7} {row['total_s']:>9.2f} {row['mean_ms']:>9.2f}"
+                + "".join(f" {row[f'p{rank}_ms']:>9.2f}" for rank in PERCENTILES)
+            )
+        return lines
@@ -0,0 +1,289 @@
+"""
+Surveillance d'un dossier d'EPUB : nouveaux fichiers et fichiers modifiés.
+
+- Sous Linux, ``inotify`` (via ``ctypes``, sans dépendance) surveille chaque
+  sous-dossier ; les dossiers créés ou déplacés dans l'arborescence sont
+  ajoutés à la volée et les EPUB qu'ils contiennent signalés.
+- Sinon (autre système, limite ``fs.inotify.max_user_watches`` atteinte,
+  partage réseau dont les modifications viennent d'une autre machine),
+  le dossier est reparcouru toutes les ``poll_interval`` secondes et
+  comparé à l'instantané précédent (taille, date de modification).
+- Anti-rebond : un fichier n'est signalé qu'une fois sa taille et sa date
+  de modification stables pendant ``settle`` secondes, pour ne pas lire un
+  fichier en cours de copie.
+
+Usage typique :
+    watcher = FolderWatcher(Path("/data"))
+    for ready in watcher.changes(stop_event):
+        ...  # liste de (chemin, stat) prêts à être traités
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from library_walker import DEFAULT_LIST_THREADS, is_epub_name, walk_epubs
+
+BACKEND_INOTIFY = "inotify"
+BACKEND_POLLING = "polling"
+DEFAULT_SETTLE_SECONDS = 2.0
+DEFAULT_POLL_INTERVAL = 30.0
+# Délai maximal d'attente d'un événement, pour vérifier régulièrement l'arrêt demandé.
+STOP_CHECK_INTERVAL = 1.0
+
+# Constantes de <sys/inotify.h>.
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_ONLYDIR
+FILE_EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_BYTES = 64 * 1024
+
+Signature = tuple[int, int]
+
+
+class _Inotify:
+    """Minimal ctypes binding of the Linux inotify API."""
+
+    def __init__(self) -> None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            self._add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError) as exc:
+            raise OSError(errno.ENOSYS, f"inotify indisponible : {exc}") from exc
+
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, f"inotify_init1 : {os.strerror(code)}")
+        self.watches: dict[int, Path] = {}
+
+    def add_watch(self, directory: Path) -> None:
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+            if code == errno.ENOSPC:
+                raise OSError(code, "limite fs.inotify.max_user_watches atteinte")
+            if code in (errno.ENOENT, errno.ENOTDIR):
+                return  # dossier disparu entre le listage et l'ajout
+            raise OSError(code, f"inotify_add_watch({directory}) : {os.strerror(code)}")
+        self.watches[wd] = directory
+
+    def read(self, timeout: float) -> list[tuple[Optional[Path], int, str]]:
+        """Return ``(dossier, masque, nom)`` events, waiting at most ``timeout`` seconds."""
+        readable, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, _READ_BYTES)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((self.watches.get(wd), mask, name))
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+        return events
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class FolderWatcher:
+    """Report EPUB files created or modified below ``folder`` once they are stable.
+
+    Les fichiers présents au démarrage ne sont pas signalés. ``use_inotify``
+    à ``False`` force le mode par scrutation ; ``report`` reçoit les
+    avertissements (repli sur la scrutation, dossier non surveillé).
+    """
+
+    def __init__(
+        self,
+        folder: Path,
+        settle: float = DEFAULT_SETTLE_SECONDS,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        list_threads: int = DEFAULT_LIST_THREADS,
+        use_inotify: bool = True,
+        report: Callable[[str], None] = print,
+    ) -> None:
+        self.folder = folder
+        self.settle = max(0.0, settle)
+        self.poll_interval = max(0.1, poll_interval)
+        self.list_threads = list_threads
+        self.report = report
+        # Fichiers vus modifiés : signature (taille, mtime) et date du dernier changement.
+        self._pending: dict[Path, tuple[Signature, float]] = {}
+        self._inotify: Optional[_Inotify] = None
+        self._snapshot: dict[Path, Signature] = {}
+        self._next_poll = 0.0
+
+        if use_inotify:
+            try:
+                self._inotify = _Inotify()
+                self._watch_tree(folder)
+            except OSError as exc:
+                self.report(f"Surveillance inotify impossible ({exc}) : scrutation toutes les {poll_interval:g} s.")
+                self._close_inotify()
+
+        if self._inotify is None:
+            self._snapshot = self._scan()
+            self._next_poll = time.monotonic() + self.poll_interval
+
+    @property
+    def backend(self) -> str:
+        return BACKEND_INOTIFY if self._inotify is not None else BACKEND_POLLING
+
+    def __enter__(self) -> FolderWatcher:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._close_inotify()
+
+    def changes(self, stop: Optional[threading.Event] = None) -> Iterator[list[tuple[Path, os.stat_result]]]:
+        """Yield batches of ``(chemin, stat)`` ready to be processed, until ``stop`` is set."""
+        while stop is None or not stop.is_set():
+            timeout = self._timeout(time.monotonic())
+            if self._inotify is not None:
+                self._handle_events(self._inotify.read(timeout))
+            else:
+                if stop is not None:
+                    stop.wait(timeout)
+                else:
+                    time.sleep(timeout)
+                if time.monotonic() >= self._next_poll:
+                    self._poll()
+
+            ready = self._collect_ready(time.monotonic())
+            if ready:
+                yield ready
+
+    def touch(self, path: Path, stat_result: Optional[os.stat_result] = None) -> None:
+        """Note that ``path`` changed (l'anti-rebond repart de zéro si sa signature a changé)."""
+        if stat_result is None:
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                self._pending.pop(path, None)
+                return
+
+        self._note(path, (stat_result.st_size, stat_result.st_mtime_ns))
+
+    def _note(self, path: Path, signature: Signature) -> None:
+        previous = self._pending.get(path)
+        if previous is None or previous[0] != signature:
+            self._pending[path] = (signature, time.monotonic())
+
+    def _timeout(self, now: float) -> float:
+        deadlines = [STOP_CHECK_INTERVAL]
+        if self._pending:
+            deadlines.append(min(changed for _, changed in self._pending.values()) + self.settle - now)
+        if self._inotify is None:
+            deadlines.append(self._next_poll - now)
+        return max(0.0, min(deadlines))
+
+    def _collect_ready(self, now: float) -> list[tuple[Path, os.stat_result]]:
+        ready = []
+        for path, (signature, changed) in list(self._pending.items()):
+            if now - changed < self.settle:
+                continue
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                del self._pending[path]
+                continue
+            current = (stat_result.st_size, stat_result.st_mtime_ns)
+            if current != signature:
+                self._pending[path] = (current, now)
+                continue
+            del self._pending[path]
+            ready.append((path, stat_result))
+        ready.sort(key=lambda item: str(item[0]))
+        return ready
+
+    def _handle_events(self, events: list[tuple[Optional[Path], int, str]]) -> None:
+        touched: set[Path] = set()
+        for directory, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                # File d'événements du noyau saturée : on reparcourt tout.
+                self.report("File inotify saturée : nouveau parcours du dossier surveillé.")
+                try:
+                    self._watch_tree(self.folder)
+                except OSError as exc:
+                    self.report(f"Surveillance incomplète : {exc.strerror}.")
+                for path, stat_result in walk_epubs(self.folder, self.list_threads):
+                    self.touch(path, stat_result)
+                continue
+            if directory is None or not name:
+                continue
+
+            path = directory / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        self._watch_tree(path)
+                    except OSError as exc:
+                        self.report(f"Dossier non surveillé : {path} ({exc.strerror}).")
+                    # Fichiers arrivés avant que le dossier ne soit surveillé (ou déplacés avec lui).
+                    for epub_path, stat_result in walk_epubs(path, 1):
+                        self.touch(epub_path, stat_result)
+            elif mask & FILE_EVENTS and is_epub_name(name):
+                touched.add(path)
+
+        for path in touched:
+            self.touch(path)
+
+    def _watch_tree(self, root: Path) -> None:
+        """Watch ``root`` and its subdirectories (liens symboliques non suivis)."""
+        if self._inotify is None:
+            return
+        for dirpath, _, _ in os.walk(root):
+            self._inotify.add_watch(Path(dirpath))
+
+    def _scan(self) -> dict[Path, Signature]:
+        return {
+            path: (stat_result.st_size, stat_result.st_mtime_ns)
+            for path, stat_result in walk_epubs(self.folder, self.list_threads)
+        }
+
+    def _poll(self) -> None:
+        current = self._scan()
+        for path, signature in current.items():
+            if self._snapshot.get(path) != signature:
+                self._note(path, signature)
+        self._snapshot = current
+        self._next_poll = time.monotonic() + self.poll_interval
+
+    def _close_inotify(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
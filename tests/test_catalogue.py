@@ -0,0 +1,116 @@
+"""Tests du catalogue OpenLibrary local (résolution d'ISBN)."""
+
+import gzip
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from catalogue import (  # noqa: E402
+    LocalCatalogue,
+    isbn10_to_13,
+    isbn13_to_10,
+    similarity,
+    split_filename,
+)
+from openlibrary_import import DumpImporter  # noqa: E402
+
+
+def build_catalogue(path: Path, records: list[tuple[str, str, dict]]) -> Path:
+    """Import ``(type, clé, données)`` records into a catalogue at ``path``."""
+    dump = path.with_suffix(".txt.gz")
+    with gzip.open(dump, "wt", encoding="utf-8") as handle:
+        for kind, key, data in records:
+            handle.write(f"/type/{kind}\t{key}\t1\t2024\t{json.dumps(data)}\n")
+    DumpImporter(path, report=lambda message: None).run([dump])
+    return path
+
+
+class IsbnConversionTest(unittest.TestCase):
+    def test_roundtrip(self) -> None:
+        for isbn10, isbn13 in (("2070360024", "9782070360024"), ("207036822X", "9782070368228")):
+            with self.subTest(isbn10=isbn10):
+                self.assertEqual(isbn10_to_13(isbn10), isbn13)
+                self.assertEqual(isbn13_to_10(isbn13), isbn10)
+
+    def test_979_has_no_isbn10(self) -> None:
+        self.assertIsNone(isbn13_to_10("9791032305690"))
+
+
+class SimilarityTest(unittest.TestCase):
+    def test_matches_workflow_scoring(self) -> None:
+        self.assertEqual(similarity("la peste", "la peste"), 1.0)
+        self.assertEqual(similarity("", "la peste"), 0.0)
+        # 1 mot commun sur 3 distincts, distance d'édition 3 sur 8 caractères.
+        self.assertAlmostEqual(similarity("la peste", "la chute"), 0.6 / 3 + 0.4 * (1 - 3 / 8))
+
+    def test_filename_readings(self) -> None:
+        self.assertEqual(
+            split_filename("Camus, Albert - La Peste (1947) [FR].epub"),
+            [("La Peste", "Camus, Albert"), ("Camus, Albert", "La Peste")],
+        )
+        self.assertEqual(split_filename("la_peste.EPUB"), [("la peste", "")])
+
+
+class LocalCatalogueTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        db_path = build_catalogue(
+            Path(self.tmp.name) / "openlibrary.sqlite",
+            [
+                ("author", "/authors/OL1A", {"name": "Albert Camus"}),
+                ("work", "/works/OL1W", {"title": "L'Étranger", "authors": [{"author": {"key": "/authors/OL1A"}}]}),
+                # ISBN-10 seulement : doit être trouvé à partir de l'ISBN-13 du livre.
+                ("edition", "/books/OL1M", {"title": "L'Étranger", "works": [{"key": "/works/OL1W"}],
+                                            "isbn_10": ["2070360024"]}),
+                ("edition", "/books/OL2M", {"title": "L'etranger", "works": [{"key": "/works/OL1W"}],
+                                            "isbn_13": ["9782070360024"]}),
+                # ISBN réutilisé par deux livres différents : ambigu.
+                ("edition", "/books/OL3M", {"title": "Noces", "authors": [{"key": "/authors/OL1A"}],
+                                            "isbn_13": ["9782070368228"]}),
+                ("edition", "/books/OL4M", {"title": "La Chute", "authors": [{"key": "/authors/OL1A"}],
+                                            "isbn_13": ["9782070368228"]}),
+                ("author", "/authors/OL2A", {"name": "Marguerite Yourcenar"}),
+                ("edition", "/books/OL5M", {"title": "Mémoires d'Hadrien", "authors": [{"key": "/authors/OL2A"}]}),
+                ("edition", "/books/OL6M", {"title": "Le Premier Homme", "authors": [{"key": "/authors/OL1A"}]}),
+                ("edition", "/books/OL7M", {"title": "Le Premier Homme", "authors": [{"key": "/authors/OL2A"}]}),
+            ],
+        )
+        self.catalogue = LocalCatalogue(db_path)
+
+    def tearDown(self) -> None:
+        self.catalogue.close()
+        self.tmp.cleanup()
+
+    def test_unambiguous_isbn_resolves_with_work_authors(self) -> None:
+        entry = self.catalogue.resolve_isbn("9782070360024")
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.author, "Albert Camus")
+        self.assertEqual(len(self.catalogue.lookup_isbn("2070360024")), 2)
+
+    def test_ambiguous_or_unknown_isbn_is_not_resolved(self) -> None:
+        self.assertEqual(len(self.catalogue.lookup_isbn("9782070368228")), 2)
+        self.assertIsNone(self.catalogue.resolve_isbn("9782070368228"))
+        self.assertIsNone(self.catalogue.resolve_isbn("9780306406157"))
+
+    def test_search_ranks_accent_insensitive_candidates(self) -> None:
+        candidates = self.catalogue.search("MEMOIRES D'HADRIEN", "yourcenar marguerite")
+        self.assertEqual(candidates[0].title, "Mémoires d'Hadrien")
+        self.assertGreaterEqual(candidates[0].score, 0.9)
+        self.assertEqual(self.catalogue.search("Dictionnaire des synonymes"), [])
+
+    def test_resolve_title_requires_a_clear_winner(self) -> None:
+        self.assertEqual(self.catalogue.resolve_title("Memoires d Hadrien", "Yourcenar").title, "Mémoires d'Hadrien")
+        # Même titre pour deux auteurs et aucun auteur pour départager : ambigu.
+        self.assertIsNone(self.catalogue.resolve_title("Le premier homme"))
+        self.assertEqual(
+            self.catalogue.resolve_title("", filename="Camus, Albert - Le premier homme.epub").author,
+            "Albert Camus",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Tests du traitement concurrent (`--concurrency`) contre le webhook simulé."""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from typing import Iterator, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from test_epub_archive import build_epub  # noqa: E402
+
+from epub_metadata import (  # noqa: E402
+    PENDING_WINDOW_FACTOR,
+    Config,
+    _process_books_concurrently,
+    process_folder,
+)
+from n8n_stub import N8nStub, StubSettings  # noqa: E402
+
+BOOKS = 12
+# Latences très dispersées : les réponses arrivent dans le désordre.
+STUB_SETTINGS = StubSettings(latency=0.02, latency_dist="uniform", jitter=0.9, seed=7)
+
+
+class ConcurrencyTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.folder = self.root / "livres"
+        self.folder.mkdir()
+        self.names = [f"livre_{index:02d}.epub" for index in range(BOOKS)]
+        for name in self.names:
+            build_epub(self.folder / name, {"OEBPS/c.xhtml": f"<p>Chapitre premier de {name}.</p>"})
+        self.stub = N8nStub(STUB_SETTINGS).start()
+
+    def tearDown(self) -> None:
+        self.stub.stop()
+        self._tmp.cleanup()
+
+    def config(self) -> Config:
+        return Config(
+            webhook_url=self.stub.url,
+            verify_ssl=True,
+            timeout=5,
+            log_path=self.root / "log" / "n8n_response.json",
+            epub_root_label=str(self.root),
+            dest_path="",
+            retries=0,
+        )
+
+    def run_folder(
+        self, config: Config, limit: Optional[int] = None, stop: Optional[threading.Event] = None
+    ) -> list[str]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            process_folder(self.folder, config, limit=limit, concurrency=4, stop=stop)
+        with open(config.log_path, encoding="utf-8") as handle:
+            return [json.loads(line)["filename"] for line in handle]
+
+    def test_log_lines_follow_input_order(self) -> None:
+        self.assertEqual(self.run_folder(self.config()), self.names)
+        self.assertEqual(self.stub.stats.to_dict()["requests"], BOOKS)
+
+    def test_limit_is_honoured(self) -> None:
+        self.assertEqual(self.run_folder(self.config(), limit=3), self.names[:3])
+        self.assertEqual(self.stub.stats.to_dict()["requests"], 3)
+
+    def test_stop_lets_started_books_finish(self) -> None:
+        class StopAfter(threading.Event):
+            """Positionné après ``checks`` consultations (une par livre lancé)."""
+
+            def __init__(self, checks: int) -> None:
+                super().__init__()
+                self.checks = checks
+
+            def is_set(self) -> bool:
+                self.checks -= 1
+                return self.checks < 0 or super().is_set()
+
+        self.assertEqual(self.run_folder(self.config(), stop=StopAfter(5)), self.names[:5])
+        self.assertEqual(self.stub.stats.to_dict()["requests"], 5)
+
+    def test_pending_window_is_bounded(self) -> None:
+        concurrency = 2
+        finished: list[str] = []
+        in_flight: list[int] = []
+
+        def books() -> Iterator[tuple[Path, None]]:
+            for pulled, name in enumerate(self.names, start=1):
+                in_flight.append(pulled - len(finished))
+                yield self.folder / name, None
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            count = _process_books_concurrently(
+                books(), self.config(), lambda path, outcome, _: finished.append(path.name), False, concurrency
+            )
+
+        self.assertEqual(count, BOOKS)
+        self.assertEqual(finished, self.names)
+        self.assertGreater(max(in_flight), concurrency)
+        self.assertLessEqual(max(in_flight), concurrency * PENDING_WINDOW_FACTOR)
+
+
+if __name__ == "__main__":
+    unittest.main()
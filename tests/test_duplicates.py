@@ -0,0 +1,58 @@
+"""Tests de la détection des doublons exacts."""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from duplicates import find_duplicates, iter_epub_sizes  # noqa: E402
+from manifest import file_sha256  # noqa: E402
+
+
+class FindDuplicatesTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _write(self, name: str, content: bytes) -> Path:
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        return path
+
+    def test_groups_identical_files_in_walk_order(self) -> None:
+        a = self._write("a.epub", b"livre A")
+        b = self._write("b.epub", b"livre B")  # même taille, contenu différent
+        copy = self._write("sous/a.epub", b"livre A")
+        self._write("seul.epub", b"unique et plus long")
+
+        groups = find_duplicates([(a, 7), (b, 7), (copy, 7), (self.root / "seul.epub", 19)])
+
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0].paths, [a, copy])
+        self.assertEqual(groups[0].wasted_bytes, 7)
+
+    def test_only_size_collisions_are_hashed(self) -> None:
+        a = self._write("a.epub", b"1")
+        b = self._write("b.epub", b"22")
+        c = self._write("c.epub", b"33")
+        hashed: list[Path] = []
+
+        def spy(path: Path) -> str:
+            hashed.append(path)
+            return file_sha256(path)
+
+        groups = find_duplicates(iter_epub_sizes(self.root), hash_fn=spy)
+
+        self.assertEqual(sorted(hashed), [b, c])
+        self.assertEqual(groups, [])
+        self.assertNotIn(a, hashed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""Tests de l'archive EPUB partagée (`EpubArchive`)."""
+
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from epub_metadata import (  # noqa: E402
+    EpubArchive,
+    _extract_full_text,
+    extract_metadata_from_epub,
+    extract_raw_pages_from_epub,
+    extract_text_from_epub,
+)
+
+OPF = """<?xml version="1.0" encoding="utf-8"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="2.0">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:title>Le Comte de Monte-Cristo</dc:title>
+    <dc:creator>Alexandre Dumas</dc:creator>
+    <dc:identifier>urn:uuid:1234</dc:identifier>
+  </metadata>
+</package>
+"""
+
+
+def build_epub(path: Path, members: dict[str, str]) -> Path:
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("mimetype", "application/epub+zip")
+        zf.writestr("OEBPS/content.opf", OPF)
+        for name, content in members.items():
+            zf.writestr(name, content)
+    return path
+
+
+class EpubArchiveTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.epub = build_epub(
+            Path(self._tmp.name) / "livre.epub",
+            {
+                "OEBPS/chapter1.xhtml": "<html><body><p>Chapitre un</p></body></html>",
+                "OEBPS/copyright.xhtml": "<html><body><p>ISBN 978-2-07-036822-8</p></body></html>",
+            },
+        )
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_text_files_are_prioritized(self) -> None:
+        with EpubArchive(self.epub) as archive:
+            names = [info.filename for info in archive.text_files]
+        self.assertEqual(names, ["OEBPS/copyright.xhtml", "OEBPS/chapter1.xhtml"])
+
+    def test_shared_archive_matches_path_based_extraction(self) -> None:
+        with EpubArchive(self.epub) as archive:
+            self.assertEqual(extract_text_from_epub(archive), extract_text_from_epub(self.epub))
+            self.assertEqual(extract_raw_pages_from_epub(archive), extract_raw_pages_from_epub(self.epub))
+            self.assertEqual(_extract_full_text(archive), _extract_full_text(self.epub))
+            self.assertEqual(
+                extract_metadata_from_epub(archive).to_dict(),
+                extract_metadata_from_epub(self.epub).to_dict(),
+            )
+
+    def test_members_are_decompressed_once(self) -> None:
+        with EpubArchive(self.epub) as archive:
+            opened: list[str] = []
+            original_open = archive._zf.open
+
+            def counting_open(info, *args, **kwargs):
+                opened.append(info.filename)
+                return original_open(info, *args, **kwargs)
+
+            archive._zf.open = counting_open
+            extract_text_from_epub(archive)
+            extract_raw_pages_from_epub(archive)
+            _extract_full_text(archive)
+            extract_metadata_from_epub(archive)
+            extract_metadata_from_epub(archive)
+
+        self.assertEqual(sorted(opened), sorted(set(opened)))
+
+    def test_text_budget_stops_decompression(self) -> None:
+        chapter = "<html><body>" + "<p>Il était une fois un roi.</p>\n" * 50000 + "</body></html>"
+        big = build_epub(Path(self._tmp.name) / "gros.epub", {"OEBPS/chapter1.xhtml": chapter})
+
+        with EpubArchive(big) as archive:
+            read_sizes: list[int] = []
+            original_open = archive._zf.open
+
+            def counting_open(info, *args, **kwargs):
+                handle = original_open(info, *args, **kwargs)
+                original_read = handle.read
+
+                def counting_read(size=-1):
+                    data = original_read(size)
+                    read_sizes.append(len(data))
+                    return data
+
+                handle.read = counting_read
+                return handle
+
+            archive._zf.open = counting_open
+            text = extract_text_from_epub(archive, max_chars=100)
+
+        self.assertEqual(text, _extract_full_text(big)[:100].rstrip())
+        self.assertLess(sum(read_sizes), len(chapter.encode("utf-8")) // 10)
+
+    def test_invalid_file_yields_empty_results(self) -> None:
+        bogus = Path(self._tmp.name) / "bogus.epub"
+        bogus.write_bytes(b"not a zip")
+        self.assertEqual(extract_text_from_epub(bogus), "")
+        self.assertEqual(extract_raw_pages_from_epub(bogus), [])
+        self.assertEqual(extract_metadata_from_epub(bogus).title, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Tests de l'extracteur incrémental HTML -> texte."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from html_text import HtmlTextExtractor, html_to_text, iter_html_text  # noqa: E402
+
+PAGE = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE html>
+<html><head><title>Chapitre</title><style>p { margin: 0 }</style></head>
+<body><!-- page de copyright > ignorée -->
+<p>L&#8217;&eacute;t&eacute; &amp; l&apos;hiver</p>
+<script type="text/javascript">var page = "<p>non</p>";</script>
+<p>ISBN&nbsp;978-2-07-036822-8</p>a<b>b</b>c<br/>
+  3 &lt; 4 < 5
+</body></html>
+"""
+EXPECTED = "L’été & l'hiver ISBN 978-2-07-036822-8 a b c 3 < 4 < 5"
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    return [text[start : start + size] for start in range(0, len(text), size)]
+
+
+class HtmlTextTest(unittest.TestCase):
+    def test_skips_markup_and_decodes_entities(self) -> None:
+        self.assertEqual(html_to_text(PAGE), EXPECTED)
+        self.assertEqual(html_to_text("<head><title>t</title><body><p>texte</p>"), "texte")
+
+    def test_chunking_does_not_change_the_result(self) -> None:
+        for size in (1, 2, 3, 5, 8, 13, 64):
+            with self.subTest(size=size):
+                self.assertEqual("".join(iter_html_text(_chunks(PAGE, size))), EXPECTED)
+
+    def test_budget_stops_consuming_input(self) -> None:
+        consumed = []
+
+        def chunks():
+            for chunk in _chunks(PAGE, 16):
+                consumed.append(chunk)
+                yield chunk
+
+        self.assertEqual("".join(iter_html_text(chunks(), budget=10)), EXPECTED[:10])
+        self.assertLess(len(consumed), len(_chunks(PAGE, 16)))
+
+        extractor = HtmlTextExtractor(budget=3)
+        self.assertEqual(extractor.feed("<p>un deux</p>"), "un")
+        self.assertTrue(extractor.done)
+        self.assertEqual(extractor.feed("<p>trois</p>") + extractor.close(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Tests du scan d'ISBN en flux (`_scan_first_isbn`, `find_isbn_in_text`)."""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from test_epub_archive import build_epub  # noqa: E402
+
+from epub_metadata import (  # noqa: E402
+    ISBN_CANDIDATE_RE,
+    EpubArchive,
+    _extract_full_text,
+    _find_first_isbn,
+    _iter_isbn_candidates,
+    _scan_first_isbn,
+    find_isbn_in_text,
+)
+
+TEXT = "Copyright 2012. Tous droits réservés. ISBN : 978-2-07-036822-8 Dépôt légal : mai 2012."
+
+
+def split_every(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class StreamingCandidatesTest(unittest.TestCase):
+    def test_candidates_match_whole_text_for_any_split(self) -> None:
+        expected = ISBN_CANDIDATE_RE.findall(TEXT)
+        for size in range(1, len(TEXT) + 1):
+            with self.subTest(size=size):
+                self.assertEqual(list(_iter_isbn_candidates(split_every(TEXT, size))), expected)
+
+    def test_isbn_straddling_chunks_is_found(self) -> None:
+        self.assertEqual(_scan_first_isbn(["ISBN 978-2-07", "-036822-8 fin"]), "9782070368228")
+
+    def test_stream_stops_at_first_valid_isbn(self) -> None:
+        consumed: list[str] = []
+
+        def chunks():
+            for chunk in ["début ", "ISBN 2-07-036822-X ", "suite", " 978-2-07-036822-8 ", "fin"]:
+                consumed.append(chunk)
+                yield chunk
+
+        self.assertEqual(_scan_first_isbn(chunks()), "207036822X")
+        self.assertLess(len(consumed), 5)
+
+
+class FindIsbnInTextTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.epub = build_epub(
+            Path(self._tmp.name) / "livre.epub",
+            {
+                "OEBPS/chapter1.xhtml": "<p>Il était une fois 978-2-07</p>",
+                "OEBPS/chapter2.xhtml": "<p>-036822-8 et ensuite</p>",
+                "OEBPS/copyright.xhtml": f"<p>{TEXT}</p>",
+            },
+        )
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_matches_full_text_scan(self) -> None:
+        self.assertEqual(find_isbn_in_text(self.epub), _find_first_isbn([_extract_full_text(self.epub)]))
+
+    def test_streaming_scan_does_not_fill_the_cache(self) -> None:
+        with EpubArchive(self.epub) as archive:
+            self.assertEqual(find_isbn_in_text(archive), "9782070368228")
+            self.assertEqual(archive._text_cache, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
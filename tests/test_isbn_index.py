@@ -0,0 +1,60 @@
+"""Tests de l'index des ISBN produit par `isbn_scan` (`isbn_index`)."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from test_epub_archive import build_epub  # noqa: E402
+
+from isbn_index import SOURCE_NONE, SOURCE_TEXT, IsbnIndex, IsbnRecord, iter_records, repair_tail  # noqa: E402
+from isbn_scan import scan_epub  # noqa: E402
+
+
+class IsbnIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.folder = Path(self._tmp.name)
+        self.with_isbn = build_epub(self.folder / "isbn.epub", {"OEBPS/c.xhtml": "<p>ISBN 978-2-07-036822-8</p>"})
+        self.without = build_epub(self.folder / "rien.epub", {"OEBPS/c.xhtml": "<p>Rien</p>"})
+        self.output = self.folder / "isbn_scan.jsonl"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def write_records(self, *records: IsbnRecord, tail: str = "") -> None:
+        lines = [json.dumps(record.to_dict()) + "\n" for record in records]
+        self.output.write_text("".join(lines) + tail, encoding="utf-8")
+
+    def test_scanned_text_is_reused(self) -> None:
+        first, second = scan_epub(self.with_isbn), scan_epub(self.without)
+        self.assertEqual((first.source, first.isbns), (SOURCE_TEXT, ("9782070368228",)))
+        self.assertEqual(second.source, SOURCE_NONE)
+
+        self.write_records(first, second)
+        index = IsbnIndex.load(self.output)
+        self.assertEqual(index.text_isbn(self.with_isbn), "9782070368228")
+        self.assertEqual(index.text_isbn(self.without), "")
+        self.assertIsNone(index.text_isbn(self.folder / "inconnu.epub"))
+
+    def test_modified_files_are_not_trusted(self) -> None:
+        self.write_records(scan_epub(self.with_isbn))
+        stat_result = self.with_isbn.stat()
+        os.utime(self.with_isbn, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+        self.assertIsNone(IsbnIndex.load(self.output).lookup(self.with_isbn))
+
+    def test_partial_last_line_is_dropped(self) -> None:
+        self.write_records(scan_epub(self.with_isbn), tail='{"path": "/coup')
+        self.assertEqual(len(list(iter_records(self.output))), 1)
+
+        repair_tail(self.output)
+        self.assertTrue(self.output.read_text(encoding="utf-8").endswith("}\n"))
+        self.assertEqual(len(IsbnIndex.load(self.output)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
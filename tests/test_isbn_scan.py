@@ -0,0 +1,61 @@
+"""Tests du scan d'ISBN parallèle (`isbn_scan`)."""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from test_epub_archive import build_epub  # noqa: E402
+
+from isbn_index import SOURCE_ERROR, IsbnRecord  # noqa: E402
+from isbn_scan import ScanCounts, plan_chunks, scan_epub, scan_files  # noqa: E402
+
+
+class PlanChunksTest(unittest.TestCase):
+    def test_small_selections_get_smaller_chunks_and_fewer_workers(self) -> None:
+        self.assertEqual(plan_chunks(300_000, 32, 32), (32, 32))
+        self.assertEqual(plan_chunks(100, 8, 32), (8, 4))
+        self.assertEqual(plan_chunks(3, 32, 32), (3, 1))
+        self.assertEqual(plan_chunks(10, 0, 0), (1, 1))
+
+
+class ScanFilesTest(unittest.TestCase):
+    def test_totals_match_the_books(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            files = [
+                build_epub(folder / f"texte_{index}.epub", {"OEBPS/c.xhtml": "<p>ISBN 978-2-07-036822-8</p>"})
+                for index in range(5)
+            ]
+            files += [build_epub(folder / f"vide_{index}.epub", {"OEBPS/c.xhtml": "<p>Rien</p>"}) for index in range(4)]
+            files.append(folder / "absent.epub")
+
+            seen: list[int] = []
+            records: list[IsbnRecord] = []
+            counts = scan_files(
+                iter(files), workers=2, chunk_size=2, on_progress=lambda c: seen.append(c.done),
+                on_records=records.extend,
+            )
+
+        self.assertEqual(counts, ScanCounts(done=10, meta=0, text=5, none=4, errors=1))
+        self.assertEqual(seen[-1], 10)
+        self.assertEqual(seen, sorted(seen))
+        self.assertEqual([record.source for record in records].count(SOURCE_ERROR), 1)
+        self.assertEqual({record.path for record in records}, {str(path) for path in files})
+
+
+class ScanEpubTest(unittest.TestCase):
+    def test_unreadable_files_are_recorded_as_errors(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            (folder / "dossier.epub").mkdir()  # IsADirectoryError à l'ouverture
+            (folder / "tronque.epub").write_bytes(b"PK\x03\x04tronque")
+            for name in ("dossier.epub", "tronque.epub", "absent.epub"):
+                with self.subTest(name=name):
+                    self.assertEqual(scan_epub(folder / name).source, SOURCE_ERROR)
+
+
+if __name__ == "__main__":
+    unittest.main()
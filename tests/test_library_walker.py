@@ -0,0 +1,64 @@
+"""Tests du parcours en flux de la bibliothèque (`library_walker`)."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from library_walker import LibraryCounter, walk_epubs  # noqa: E402
+
+FILES = [
+    "a.epub",
+    "B.EPUB",
+    "notes.txt",
+    "auteur/z.Epub",
+    "auteur/serie/1.epub",
+    "auteur/serie/2.epub",
+    "autre/vide/.keep",
+    "autre/x.epub",
+]
+
+
+class LibraryWalkerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        for name in FILES:
+            path = self.root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"x" * len(name))
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def relative(self, threads: int) -> list[str]:
+        return [path.relative_to(self.root).as_posix() for path, _ in walk_epubs(self.root, threads)]
+
+    def test_depth_first_case_insensitive_walk(self) -> None:
+        expected = ["B.EPUB", "a.epub", "auteur/z.Epub", "auteur/serie/1.epub", "auteur/serie/2.epub", "autre/x.epub"]
+        for threads in (1, 2, 8):
+            with self.subTest(threads=threads):
+                self.assertEqual(self.relative(threads), expected)
+
+    def test_entries_carry_their_stat(self) -> None:
+        for path, stat_result in walk_epubs(self.root):
+            self.assertEqual(stat_result.st_size, len(path.relative_to(self.root).as_posix()))
+
+    def test_directory_symlinks_are_not_followed(self) -> None:
+        try:
+            os.symlink(self.root, self.root / "auteur" / "boucle")
+        except (OSError, NotImplementedError):
+            self.skipTest("liens symboliques indisponibles")
+        self.assertEqual(len(self.relative(4)), 6)
+
+    def test_background_counter(self) -> None:
+        counter = LibraryCounter(self.root, threads=2).start()
+        self.assertEqual(counter.wait(timeout=5), 6)
+        self.assertEqual(counter.total, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Tests du manifeste d'exécution incrémentale."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from manifest import STATUS_DONE, STATUS_FAILED, Manifest  # noqa: E402
+
+
+class ManifestTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.book = self.root / "livre.epub"
+        self.book.write_bytes(b"contenu")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _stat(self) -> tuple[int, int]:
+        st = self.book.stat()
+        return st.st_size, st.st_mtime_ns
+
+    def test_finished_book_is_skipped_until_it_changes(self) -> None:
+        size, mtime_ns = self._stat()
+        with Manifest(self.root / "manifest.sqlite") as manifest:
+            self.assertFalse(manifest.is_finished(self.book, size, mtime_ns))
+            manifest.record(self.book, size, mtime_ns, STATUS_DONE, isbn="9782070368228", result={"titre": "T"})
+            self.assertTrue(manifest.is_finished(self.book, size, mtime_ns))
+            self.assertFalse(manifest.is_finished(self.book, size + 1, mtime_ns))
+            self.assertFalse(manifest.is_finished(self.book, size, mtime_ns + 1))
+
+            entry = manifest.lookup(self.book)
+            self.assertEqual((entry.isbn, entry.titre, entry.attempts), ("9782070368228", "T", 1))
+
+    def test_failed_book_is_retried(self) -> None:
+        size, mtime_ns = self._stat()
+        with Manifest(self.root / "manifest.sqlite") as manifest:
+            manifest.record(self.book, size, mtime_ns, STATUS_FAILED, error="timeout")
+            self.assertFalse(manifest.is_finished(self.book, size, mtime_ns))
+            manifest.record(self.book, size, mtime_ns, STATUS_DONE, response={"titre": "T"})
+            entry = manifest.lookup(self.book)
+            self.assertEqual((entry.status, entry.attempts, entry.response), (STATUS_DONE, 2, {"titre": "T"}))
+            self.assertEqual(manifest.counts(), {STATUS_DONE: 1})
+
+    def test_content_hash_tolerates_touched_files(self) -> None:
+        size, mtime_ns = self._stat()
+        with Manifest(self.root / "manifest.sqlite", use_hash=True) as manifest:
+            manifest.record(self.book, size, mtime_ns, STATUS_DONE)
+            os.utime(self.book, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+            self.assertTrue(manifest.is_finished(self.book, *self._stat()))
+            self.assertEqual(manifest.lookup(self.book).mtime_ns, mtime_ns + 10**9)
+
+
+if __name__ == "__main__":
+    unittest.main()
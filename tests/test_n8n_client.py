@@ -0,0 +1,189 @@
+"""Tests du client webhook (nouvelles tentatives, disjoncteur, répartition entre instances)."""
+
+import json
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from n8n_client import BalancedN8nClient, CircuitBreaker, ClientSettings, N8nClient, split_urls  # noqa: E402
+from n8n_stub import N8nStub, StubSettings  # noqa: E402
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Répond avec les statuts de ``server.script`` puis 200."""
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.calls += 1
+        status = self.server.script.pop(0) if self.server.script else 200
+        body = json.dumps({"titre": "T"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+class N8nClientTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+        self.server.script = []
+        self.server.calls = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/webhook"
+        self.sleeps: list[float] = []
+        self.messages: list[str] = []
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _client(self, **settings: object) -> N8nClient:
+        return N8nClient(
+            self.url,
+            ClientSettings(timeout=5, **settings),
+            report=self.messages.append,
+            sleep=self.sleeps.append,
+        )
+
+    def test_transient_errors_are_retried(self) -> None:
+        self.server.script = [503, 502]
+        resp = self._client(retries=3).post_json({"filename": "a.epub"})
+        self.assertEqual(resp.json(), {"titre": "T"})
+        self.assertEqual(self.server.calls, 3)
+        self.assertEqual(len(self.sleeps), 2)
+
+    def test_permanent_errors_are_not_retried(self) -> None:
+        self.server.script = [400]
+        with self.assertRaises(requests.HTTPError):
+            self._client(retries=3).post_json({})
+        self.assertEqual(self.server.calls, 1)
+
+    def test_gives_up_after_max_retries(self) -> None:
+        self.server.script = [503] * 5
+        with self.assertRaises(requests.HTTPError):
+            self._client(retries=2, breaker_threshold=0).post_json({})
+        self.assertEqual(self.server.calls, 3)
+
+    def test_timeout_can_be_overridden_per_request(self) -> None:
+        with N8nStub(StubSettings(latency=0.3)) as stub:
+            client = N8nClient(stub.url, ClientSettings(timeout=0.1, retries=0), report=self.messages.append)
+            with self.assertRaises(requests.Timeout):
+                client.post_json({"books": []})
+            self.assertEqual(client.post_json({"books": []}, timeout=5).status_code, 200)
+            client.close()
+
+    def test_read_timeout_is_not_retried_by_default(self) -> None:
+        for retry_read_timeout, expected in ((False, 1), (True, 3)):
+            settings = ClientSettings(timeout=0.05, retries=2, backoff=0.0, retry_read_timeout=retry_read_timeout)
+            with self.subTest(retry_read_timeout=retry_read_timeout), N8nStub(StubSettings(latency=0.3)) as stub:
+                client = N8nClient(stub.url, settings, report=self.messages.append, sleep=self.sleeps.append)
+                with self.assertRaises(requests.ReadTimeout):
+                    client.post_json({"filename": "a.epub"})
+                client.close()
+                self.assertEqual(stub.stats.to_dict()["requests"], expected)
+
+    def test_backoff_is_bounded(self) -> None:
+        client = self._client(backoff=1.0, backoff_max=4.0)
+        exc = requests.ConnectionError()
+        for attempt in range(10):
+            self.assertLessEqual(client._retry_delay(attempt, exc), 4.0)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_after_threshold_and_closes_on_success(self) -> None:
+        now = [0.0]
+        breaker = CircuitBreaker(threshold=2, cooldown=10, report=lambda message: None, clock=lambda: now[0])
+
+        breaker.record_failure()
+        self.assertFalse(breaker.is_open)
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+
+        now[0] = 11.0
+        breaker.acquire()  # requête d'essai autorisée après refroidissement
+        breaker.record_success()
+        self.assertFalse(breaker.is_open)
+
+    def test_failed_probe_reopens(self) -> None:
+        now = [0.0]
+        breaker = CircuitBreaker(threshold=1, cooldown=10, report=lambda message: None, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 11.0
+        breaker.acquire()
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+
+
+class BalancedN8nClientTest(unittest.TestCase):
+    def _client(self, stubs: list[N8nStub], **settings: object) -> BalancedN8nClient:
+        return BalancedN8nClient(
+            [stub.url for stub in stubs],
+            ClientSettings(timeout=5, backoff=0.0, **settings),
+            report=lambda _: None,
+            sleep=lambda _: None,
+        )
+
+    def test_split_urls(self) -> None:
+        self.assertEqual(split_urls(" http://a/webhook , http://b/webhook,"), ["http://a/webhook", "http://b/webhook"])
+
+    def test_faster_instance_takes_more_requests(self) -> None:
+        with N8nStub(StubSettings(latency=0.005)) as fast, N8nStub(StubSettings(latency=0.05)) as slow:
+            client = self._client([slow, fast])
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                list(pool.map(lambda _: client.post_json({"filename": "a.epub"}), range(40)))
+            client.close()
+
+            fast_count, slow_count = fast.stats.to_dict()["requests"], slow.stats.to_dict()["requests"]
+            self.assertEqual(fast_count + slow_count, 40)
+            self.assertGreater(slow_count, 0)
+            self.assertGreater(fast_count, slow_count)
+            self.assertEqual([row.requests for row in client.stats()], [slow_count, fast_count])
+
+    def test_failing_instance_is_ejected_and_requests_fail_over(self) -> None:
+        with N8nStub(StubSettings(error_rate=1.0)) as broken, N8nStub() as healthy:
+            client = self._client([broken, healthy], retries=2, breaker_threshold=2, breaker_cooldown=60)
+            for _ in range(10):
+                self.assertEqual(client.post_json({"filename": "a.epub"}).status_code, 200)
+            client.close()
+
+            self.assertEqual(broken.stats.to_dict()["requests"], 2)
+            self.assertEqual(healthy.stats.to_dict()["requests"], 10)
+            broken_stats = client.stats()[0]
+            self.assertEqual((broken_stats.errors, broken_stats.ejections), (2, 1))
+            self.assertIn(broken.url, "\n".join(client.format_lines()))
+
+    def test_server_errors_are_not_replayed_but_count_against_the_instance(self) -> None:
+        with N8nStub(StubSettings(error_rate=1.0, error_status=500)) as broken, N8nStub() as healthy:
+            client = self._client([broken, healthy], retries=2, breaker_threshold=1, breaker_cooldown=60)
+            with self.assertRaises(requests.HTTPError):
+                client.post_json({"filename": "a.epub"})
+            self.assertEqual(client.post_json({"filename": "b.epub"}).status_code, 200)
+            client.close()
+            self.assertEqual((broken.stats.to_dict()["requests"], healthy.stats.to_dict()["requests"]), (1, 1))
+
+    def test_read_timeout_is_not_replayed_but_counts_against_the_instance(self) -> None:
+        with N8nStub(StubSettings(latency=0.3)) as slow, N8nStub() as healthy:
+            client = self._client([slow, healthy], retries=2, breaker_threshold=1, breaker_cooldown=60)
+            client.endpoints[0].client.settings = replace(client.endpoints[0].client.settings, timeout=0.05)
+            with self.assertRaises(requests.ReadTimeout):
+                client.post_json({"filename": "a.epub"})
+            self.assertEqual(client.post_json({"filename": "b.epub"}).status_code, 200)
+            client.close()
+            self.assertEqual((slow.stats.to_dict()["requests"], healthy.stats.to_dict()["requests"]), (1, 1))
+            self.assertEqual(client.stats()[0].ejections, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
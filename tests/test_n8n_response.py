@@ -0,0 +1,47 @@
+"""Tests de la normalisation des réponses n8n (unitaire et batch)."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from epub_metadata import _normalize_n8n_batch_response, _normalize_n8n_response  # noqa: E402
+
+
+class NormalizeResponseTest(unittest.TestCase):
+    def test_single_response_shapes(self) -> None:
+        expected = {"titre": "Titre", "auteur": "Auteur"}
+        for data in (
+            {"title": "Titre", "creator": "Auteur"},
+            {"output": {"titre": "Titre", "auteur": "Auteur"}},
+            [{"title": "Titre", "author": "Auteur"}],
+        ):
+            with self.subTest(data=data):
+                normalized = _normalize_n8n_response(data)
+                self.assertEqual({key: normalized[key] for key in expected}, expected)
+
+    def test_batch_response_is_mapped_by_batch_id(self) -> None:
+        data = [
+            {"filename": "b.epub", "batch_id": 1, "title": "B"},
+            {"filename": "a.epub", "output": {"batch_id": 0, "titre": "A"}},
+        ]
+        mapped = _normalize_n8n_batch_response(data, 3)
+        self.assertEqual(mapped, [{"titre": "A"}, {"titre": "B"}, None])
+
+    def test_batch_items_without_batch_id_are_matched_in_order(self) -> None:
+        data = {"results": [{"batch_id": "1", "title": "B"}, {"title": "A"}, {"title": "C"}]}
+        mapped = _normalize_n8n_batch_response(data, 3)
+        self.assertEqual([item["titre"] for item in mapped], ["A", "B", "C"])
+
+    def test_same_filename_in_one_batch_keeps_each_answer(self) -> None:
+        data = [
+            {"filename": "x.epub", "batch_id": 1, "title": "Second"},
+            {"filename": "x.epub", "batch_id": 0, "title": "Premier"},
+        ]
+        mapped = _normalize_n8n_batch_response(data, 2)
+        self.assertEqual([item["titre"] for item in mapped], ["Premier", "Second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
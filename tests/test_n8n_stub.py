@@ -0,0 +1,66 @@
+"""Tests du webhook n8n simulé (`n8n_stub`)."""
+
+import random
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from epub_metadata import _normalize_n8n_batch_response, _normalize_n8n_response  # noqa: E402
+from n8n_client import ClientSettings, N8nClient  # noqa: E402
+from n8n_stub import N8nStub, StubSettings, sample_latency  # noqa: E402
+
+PAYLOAD = {"filename": "la_peste.epub", "isbn": "", "text": "...", "metadata": {"title": "La Peste"}}
+
+
+class N8nStubTest(unittest.TestCase):
+    def test_every_shape_is_understood_by_the_client(self) -> None:
+        for shape in ("dict", "output", "list"):
+            with self.subTest(shape=shape), N8nStub(StubSettings(shape=shape)) as stub:
+                single = requests.post(stub.url, json=PAYLOAD, timeout=5).json()
+                self.assertEqual(_normalize_n8n_response(single)["titre"], "La Peste")
+
+                books = [{**PAYLOAD, "batch_id": 0}, {"filename": "l_etranger.epub", "batch_id": 1}]
+                batch = requests.post(stub.batch_url, json={"books": books}, timeout=5).json()
+                mapped = _normalize_n8n_batch_response(batch, 2)
+                self.assertEqual([item["titre"] for item in mapped], ["La Peste", "l etranger"])
+                self.assertEqual(stub.stats.to_dict()["books"], 3)
+
+    def test_concurrency_limit_queues_or_rejects(self) -> None:
+        for reject in (False, True):
+            settings = StubSettings(latency=0.05, concurrency=2, reject_when_busy=reject)
+            with self.subTest(reject=reject), N8nStub(settings) as stub:
+                with ThreadPoolExecutor(max_workers=6) as pool:
+                    statuses = list(pool.map(lambda _: requests.post(stub.url, json=PAYLOAD).status_code, range(6)))
+
+                stats = stub.stats.to_dict()
+                self.assertLessEqual(stats["max_in_flight"], 2)
+                self.assertEqual(statuses.count(503), stats["rejected"])
+                self.assertEqual(stats["rejected"] > 0, reject)
+
+    def test_errors_are_retried_by_the_client(self) -> None:
+        with N8nStub(StubSettings(error_rate=1.0)) as stub:
+            delays: list[float] = []
+            client = N8nClient(stub.url, ClientSettings(retries=2, backoff=0.0), report=lambda _: None,
+                               sleep=delays.append)
+            with self.assertRaises(requests.HTTPError):
+                client.post_json(PAYLOAD)
+            client.close()
+            self.assertEqual((stub.stats.to_dict()["errors"], len(delays)), (3, 2))
+
+    def test_latency_distributions_are_non_negative(self) -> None:
+        rng = random.Random(1)
+        for dist in ("constant", "uniform", "normal", "lognormal", "exponential"):
+            with self.subTest(dist=dist):
+                values = [sample_latency(StubSettings(latency=0.1, latency_dist=dist, jitter=2.0), rng)
+                          for _ in range(200)]
+                self.assertTrue(all(value >= 0 for value in values))
+                self.assertGreater(sum(values) / len(values), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Tests de l'import des dumps OpenLibrary."""
+
+import gzip
+import json
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from openlibrary_import import SCHEMA_VERSION, DumpImporter  # noqa: E402
+
+
+def _dump_line(kind: str, key: str, data: dict) -> str:
+    return f"{kind}\t{key}\t1\t2024-01-01T00:00:00\t{json.dumps(data)}\n"
+
+
+class DumpImporterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.dump = self.root / "ol_dump.txt.gz"
+        with gzip.open(self.dump, "wt", encoding="utf-8") as handle:
+            handle.write(_dump_line("/type/author", "/authors/OL1A", {"name": "Albert Camus"}))
+            handle.write(
+                _dump_line(
+                    "/type/work",
+                    "/works/OL1W",
+                    {"title": "L'Étranger", "authors": [{"author": {"key": "/authors/OL1A"}}]},
+                )
+            )
+            handle.write(
+                _dump_line(
+                    "/type/edition",
+                    "/books/OL1M",
+                    {
+                        "title": "L'Étranger",
+                        "works": [{"key": "/works/OL1W"}],
+                        "isbn_10": ["2-07-036002-4"],
+                        "isbn_13": ["978-2-07-036002-4", "9782070360024"],
+                        "publishers": ["Gallimard"],
+                    },
+                )
+            )
+            handle.write(_dump_line("/type/redirect", "/books/OL2M", {"location": "/books/OL1M"}))
+            handle.write("/type/edition\t/books/OL3M\t1\t2024\t{pas du json\n")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_imports_tables_and_replaces_database(self) -> None:
+        db_path = self.root / "openlibrary_dumps.sqlite"
+        sqlite3.connect(str(db_path)).close()  # base vide créée par sqlite-init.sh
+
+        stats = DumpImporter(db_path, batch_size=2, report=lambda message: None).run([self.dump])
+
+        self.assertEqual(stats.lines, 5)
+        self.assertEqual(stats.invalid, 1)
+        self.assertFalse(db_path.with_name(f"{db_path.name}.importing").exists())
+
+        conn = sqlite3.connect(str(db_path))
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+        self.assertEqual(conn.execute("SELECT edition_key FROM isbn13").fetchall(), [("/books/OL1M",)])
+        self.assertEqual(conn.execute("SELECT isbn FROM isbn10").fetchall(), [("2070360024",)])
+        edition = conn.execute("SELECT work_key, publishers FROM editions").fetchone()
+        self.assertEqual(edition, ("/works/OL1W", "Gallimard"))
+        self.assertEqual(conn.execute("SELECT author_keys FROM works").fetchone(), ("/authors/OL1A",))
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""Tests du pipeline à étages (`StagedPipeline`)."""
+
+import random
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pipeline import StagedPipeline  # noqa: E402
+
+
+def slow_io(item: str, extracted: str) -> str:
+    time.sleep(random.uniform(0, 0.01))
+    if item == "boom":
+        raise ValueError("échec E/S")
+    return extracted + "!"
+
+
+class StagedPipelineTest(unittest.TestCase):
+    def test_results_are_written_in_source_order(self) -> None:
+        items = [f"livre{n}" for n in range(40)]
+        written: list[str] = []
+
+        pipeline = StagedPipeline(
+            extract_fn=str.upper,
+            io_fn=slow_io,
+            write_fn=lambda item, result, error: written.append(result),
+            extract_workers=2,
+            io_workers=4,
+            queue_size=3,
+        )
+        stats = pipeline.run(items)
+
+        self.assertEqual(written, [item.upper() + "!" for item in items])
+        self.assertEqual((stats.submitted, stats.written, stats.errors), (40, 40, 0))
+
+    def test_stage_errors_reach_the_writer(self) -> None:
+        written: list[tuple[str, object]] = []
+
+        pipeline = StagedPipeline(
+            extract_fn=str.upper,
+            io_fn=slow_io,
+            write_fn=lambda item, result, error: written.append((item, result if error is None else str(error))),
+            io_workers=2,
+        )
+        stats = pipeline.run(["a", "boom", "b"])
+
+        self.assertEqual(written, [("a", "A!"), ("boom", "échec E/S"), ("b", "B!")])
+        self.assertEqual(stats.errors, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Tests du cache de réponses n8n."""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from response_cache import ResponseCache, identification_key  # noqa: E402
+
+
+class IdentificationKeyTest(unittest.TestCase):
+    def test_accents_case_and_punctuation_are_ignored(self) -> None:
+        self.assertEqual(
+            identification_key("", "Les Misérables", "Victor HUGO", "Tome I. Fantine"),
+            identification_key("", "les miserables", "Victor Hugo", "tome i  fantine"),
+        )
+
+    def test_text_is_ignored_when_isbn_is_known(self) -> None:
+        self.assertEqual(
+            identification_key("9782070360024", "L'Étranger", "Camus", "Couverture éditeur A"),
+            identification_key("9782070360024", "L'Étranger", "Camus", "Autre couverture"),
+        )
+
+    def test_text_distinguishes_books_without_isbn(self) -> None:
+        self.assertNotEqual(
+            identification_key("", "", "", "Premier livre"),
+            identification_key("", "", "", "Second livre"),
+        )
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "cache.sqlite"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_roundtrip_and_counters(self) -> None:
+        cache = ResponseCache(self.db_path)
+        self.assertIsNone(cache.get("k"))
+        cache.put("k", {"titre": "Fantine", "auteur": "Hugo"})
+        self.assertEqual(cache.get("k"), {"titre": "Fantine", "auteur": "Hugo"})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.close()
+
+        reopened = ResponseCache(self.db_path)
+        self.assertEqual(len(reopened), 1)
+        reopened.close()
+
+    def test_expired_entries_are_dropped(self) -> None:
+        cache = ResponseCache(self.db_path, ttl=60)
+        with mock.patch("response_cache.time.time", return_value=1000.0):
+            cache.put("k", {"titre": "T"})
+        with mock.patch("response_cache.time.time", return_value=1030.0):
+            self.assertIsNotNone(cache.get("k"))
+        with mock.patch("response_cache.time.time", return_value=1100.0):
+            self.assertIsNone(cache.get("k"))
+        self.assertEqual(len(cache), 0)
+        cache.close()
+
+    def test_least_recently_used_entries_are_evicted(self) -> None:
+        cache = ResponseCache(self.db_path, max_entries=2)
+        for now, key in ((1.0, "a"), (2.0, "b")):
+            with mock.patch("response_cache.time.time", return_value=now):
+                cache.put(key, {"titre": key})
+        with mock.patch("response_cache.time.time", return_value=3.0):
+            cache.get("a")
+        with mock.patch("response_cache.time.time", return_value=4.0):
+            cache.put("c", {"titre": "c"})
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Tests de l'index SQLite du log des résultats."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from result_index import ResultIndex  # noqa: E402
+
+
+def _line(path: str, titre: str = "T", auteur: str = "A", isbn: str = "") -> str:
+    record = {"filename": Path(path).name, "path": path, "titre": titre, "auteur": auteur, "isbn": isbn}
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+class ResultIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.log = self.root / "n8n_response.json"
+        self.index = ResultIndex(self.root / "index.sqlite")
+
+    def tearDown(self) -> None:
+        self.index.close()
+        self.tmp.cleanup()
+
+    def _append(self, text: str, path: Optional[Path] = None) -> None:
+        with open(path or self.log, "a", encoding="utf-8") as handle:
+            handle.write(text)
+
+    def test_ingest_reads_only_new_complete_lines(self) -> None:
+        self._append(_line("/b/un.epub") + _line("/b/deux.epub")[:20])
+        self.assertEqual(self.index.ingest(self.log).records, 1)
+
+        self._append(_line("/b/deux.epub")[20:] + _line("/b/un.epub", titre="Corrigé"))
+        stats = self.index.ingest(self.log)
+        self.assertEqual(stats.records, 2)
+        self.assertEqual(self.index.ingest(self.log).records, 0)
+
+        (record,) = self.index.find(filename="un.epub")
+        self.assertEqual(record["titre"], "Corrigé")
+        self.assertEqual(self.index.stats()["livres"], 2)
+
+    def test_rotated_file_is_not_read_twice(self) -> None:
+        self._append(_line("/b/un.epub"))
+        self.index.ingest(self.log)
+
+        os.replace(self.log, self.log.with_name("n8n_response.json.20260101-000000"))
+        self._append(_line("/b/deux.epub"))
+
+        self.assertEqual(self.index.ingest(self.log).records, 1)
+        self.assertTrue(self.index.has_result(Path("/b/un.epub")))
+        self.assertTrue(self.index.has_result(Path("/b/deux.epub")))
+
+    def test_find_and_stats(self) -> None:
+        self._append(
+            _line("/b/un.epub", auteur="inconnu")
+            + _line("/b/deux.epub", isbn="9782070360024")
+            + _line("/b/trois.epub", auteur="Victor Hugo")
+        )
+        self.index.ingest(self.log)
+
+        self.assertEqual([r["path"] for r in self.index.find(auteur="INCONNU")], ["/b/un.epub"])
+        self.assertEqual(len(self.index.find(like=True, auteur="%hugo%")), 1)
+        stats = self.index.stats()
+        self.assertEqual((stats["auteur_inconnu"], stats["avec_isbn"]), (1, 1))
+        with self.assertRaises(ValueError):
+            self.index.find(explication="x")
+
+
+if __name__ == "__main__":
+    unittest.main()
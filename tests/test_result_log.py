@@ -0,0 +1,69 @@
+"""Tests du journal JSONL des résultats (profils, blobs, rotation)."""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from result_log import BLOB_KEY, ResultLog, expand_record  # noqa: E402
+
+
+def _record(text: str) -> dict:
+    return {
+        "filename": "a.epub",
+        "titre": "T",
+        "payload": {"isbn": "9782070360024", "text": text, "pages_raw": ["<p>" + text + "</p>"]},
+    }
+
+
+class ResultLogTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "n8n_response.json"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _lines(self) -> list[dict]:
+        return [json.loads(line) for line in self.path.read_text(encoding="utf-8").splitlines()]
+
+    def test_compact_profile_stores_large_parts_once(self) -> None:
+        record = _record("x" * 5000)
+        with ResultLog(self.path, profile="compact", blob_min_bytes=1024) as log:
+            log.write(record)
+            log.write(record)
+
+        first, second = self._lines()
+        self.assertIn(BLOB_KEY, first["payload"]["text"])
+        self.assertEqual(first["payload"]["isbn"], "9782070360024")
+        self.assertEqual(first, second)
+        self.assertEqual(len(list((Path(self.tmp.name) / "blobs").rglob("*.json.gz"))), 2)
+        self.assertEqual(expand_record(first, Path(self.tmp.name) / "blobs"), record)
+
+    def test_minimal_profile_drops_payload(self) -> None:
+        with ResultLog(self.path, profile="minimal") as log:
+            log.write(_record("x"))
+
+        (line,) = self._lines()
+        self.assertNotIn("payload", line)
+        self.assertEqual(line["isbn"], "9782070360024")
+
+    def test_rotates_by_size(self) -> None:
+        with ResultLog(self.path, profile="full", max_bytes=300) as log:
+            for _ in range(4):
+                log.write(_record("y" * 100))
+
+        rotated = sorted(self.path.parent.glob("n8n_response.json.*"))
+        self.assertEqual(len(rotated), 3)
+        self.assertEqual(len(self._lines()), 1)
+
+    def test_unknown_profile_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            ResultLog(self.path, profile="verbeux")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Tests de la répartition d'une bibliothèque entre plusieurs machines (`sharding`)."""
+
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from manifest import STATUS_DONE, STATUS_FAILED, Manifest  # noqa: E402
+from sharding import Shard, merge_logs, merge_manifests, parse_shard, shard_of, shard_path  # noqa: E402
+
+
+class ShardTest(unittest.TestCase):
+    def test_parts_are_disjoint_and_cover_the_library(self) -> None:
+        root = Path("/bibliotheque")
+        paths = [root / f"auteur{i % 7}" / f"livre{i}.epub" for i in range(400)]
+        for count in (1, 3, 8):
+            with self.subTest(count=count):
+                owners = [[index for index in range(1, count + 1) if Shard(index, count).contains(path, root)]
+                          for path in paths]
+                self.assertTrue(all(len(owner) == 1 for owner in owners))
+                if count > 1:
+                    self.assertEqual({owner[0] for owner in owners}, set(range(1, count + 1)))
+
+    def test_assignment_only_depends_on_the_relative_path(self) -> None:
+        shard = Shard(2, 5)
+        for name in ("a.epub", "serie/tome 1.epub", "é/ü.epub"):
+            self.assertEqual(
+                shard.contains(Path("/mnt/nas") / name, Path("/mnt/nas")),
+                shard.contains(Path("/data") / name, Path("/data")),
+            )
+        self.assertEqual(shard_of("serie/tome 1.epub", 5), shard_of("serie/tome 1.epub", 5))
+
+    def test_parse_shard(self) -> None:
+        self.assertEqual(parse_shard(" 2/4 "), Shard(2, 4))
+        for value in ("0/4", "5/4", "1/0", "2", "a/b", "1/2/3"):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_shard_path(self) -> None:
+        self.assertEqual(
+            shard_path(Path("log/n8n_response.json"), Shard(2, 4)),
+            Path("log/n8n_response.shard2of4.json"),
+        )
+
+
+class MergeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_merge_logs_keeps_the_last_line_per_path(self) -> None:
+        first = self.root / "log.shard1of2.json"
+        second = self.root / "log.shard2of2.json"
+        first.write_text(
+            json.dumps({"path": "a.epub", "titre": "ancien"}) + "\n" + json.dumps({"path": "b.epub"}) + "\n"
+        )
+        second.write_text(json.dumps({"path": "a.epub", "titre": "nouveau"}) + "\nligne illisible")
+
+        output = self.root / "fusion" / "log.json"
+        self.assertEqual(merge_logs([first, second], output), (4, 3))
+        lines = output.read_text().splitlines()
+        self.assertEqual(lines[-1], "ligne illisible")
+        records = [json.loads(line) for line in lines[:-1]]
+        self.assertEqual([(record["path"], record.get("titre")) for record in records],
+                         [("b.epub", None), ("a.epub", "nouveau")])
+
+    def test_merge_manifests_keeps_the_newest_entry(self) -> None:
+        book = self.root / "livre.epub"
+        other = self.root / "autre.epub"
+        for path in (book, other):
+            path.write_bytes(b"contenu")
+
+        with Manifest(self.root / "m1.sqlite") as first:
+            first.record(book, 7, 1, STATUS_FAILED, error="délai dépassé")
+            first.record(other, 7, 1, STATUS_DONE)
+        time.sleep(0.01)
+        with Manifest(self.root / "m2.sqlite") as second:
+            second.record(book, 7, 1, STATUS_DONE, result={"titre": "T"})
+
+        merged_path = self.root / "fusion.sqlite"
+        sources = [self.root / "m2.sqlite", self.root / "m1.sqlite"]
+        self.assertEqual(merge_manifests(sources, merged_path), 2)
+        with Manifest(merged_path) as merged:
+            self.assertEqual((merged.lookup(book).status, merged.lookup(book).titre), (STATUS_DONE, "T"))
+            self.assertTrue(merged.is_finished(other, 7, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
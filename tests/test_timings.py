@@ -0,0 +1,43 @@
+"""Tests des durées par étape et de leur résumé."""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from timings import STAGE_TEXT, STAGE_WEBHOOK, TimingStats, percentile, timed, to_milliseconds  # noqa: E402
+
+
+class TimingsTest(unittest.TestCase):
+    def test_timed_accumulates_per_stage(self) -> None:
+        timings: dict[str, float] = {}
+        for _ in range(2):
+            with timed(timings, STAGE_TEXT):
+                pass
+        self.assertEqual(list(timings), [STAGE_TEXT])
+        self.assertGreaterEqual(timings[STAGE_TEXT], 0.0)
+        self.assertEqual(to_milliseconds({STAGE_TEXT: 0.0123456}), {STAGE_TEXT: 12.346})
+
+    def test_nearest_rank_percentile(self) -> None:
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile([3.0], 95), 3.0)
+
+    def test_summary_orders_known_stages_first(self) -> None:
+        stats = TimingStats()
+        self.assertFalse(stats)
+        for milliseconds in range(1, 11):
+            stats.add({"autre": 0.001, STAGE_WEBHOOK: milliseconds / 1000, STAGE_TEXT: 0.002})
+
+        summary = stats.summary()
+        self.assertEqual(list(summary), [STAGE_TEXT, STAGE_WEBHOOK, "autre"])
+        self.assertEqual(summary[STAGE_WEBHOOK]["count"], 10)
+        self.assertAlmostEqual(summary[STAGE_WEBHOOK]["mean_ms"], 5.5)
+        self.assertEqual(summary[STAGE_WEBHOOK]["p95_ms"], 10.0)
+        self.assertEqual(len(stats.format_lines()), 2 + len(summary))
+
+
+if __name__ == "__main__":
+    unittest.main()
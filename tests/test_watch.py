@@ -0,0 +1,66 @@
+"""Tests de la surveillance de dossier (`watch.FolderWatcher`)."""
+
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from watch import BACKEND_POLLING, FolderWatcher  # noqa: E402
+
+
+class FolderWatcherTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        (self.root / "ancien.epub").write_bytes(b"deja la")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def collect(self, watcher: FolderWatcher, drop: Callable[[], None], duration: float) -> list[tuple[str, int]]:
+        stop = threading.Event()
+        timer = threading.Timer(duration, stop.set)
+        dropper = threading.Thread(target=drop)
+        seen: list[tuple[str, int]] = []
+
+        timer.start()
+        dropper.start()
+        with watcher:
+            for ready in watcher.changes(stop):
+                seen.extend((path.relative_to(self.root).as_posix(), stat.st_size) for path, stat in ready)
+        dropper.join()
+        timer.cancel()
+        return seen
+
+    def drop_files(self) -> None:
+        time.sleep(0.1)
+        (self.root / "notes.txt").write_text("ignoré")
+        (self.root / "serie" / "tome").mkdir(parents=True)
+        with open(self.root / "serie" / "tome" / "Tome1.EPUB", "wb") as handle:
+            handle.write(b"debut")
+            handle.flush()
+            time.sleep(0.15)
+            handle.write(b" et fin")
+
+    def test_new_files_are_reported_once_stable(self) -> None:
+        for use_inotify in (True, False):
+            with self.subTest(use_inotify=use_inotify):
+                watcher = FolderWatcher(self.root, settle=0.3, poll_interval=0.05, use_inotify=use_inotify,
+                                        report=lambda _: None)
+                if not use_inotify:
+                    self.assertEqual(watcher.backend, BACKEND_POLLING)
+                seen = self.collect(watcher, self.drop_files, duration=1.5)
+                self.assertEqual(seen, [("serie/tome/Tome1.EPUB", 12)])
+                (self.root / "serie" / "tome" / "Tome1.EPUB").unlink()
+                (self.root / "notes.txt").unlink()
+                (self.root / "serie" / "tome").rmdir()
+                (self.root / "serie").rmdir()
+
+
+if __name__ == "__main__":
+    unittest.main()